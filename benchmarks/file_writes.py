@@ -0,0 +1,62 @@
+"""
+Сравнение способов записать пачку логов в файл (см. FileDependencyWrapper):
+
+1. Каждый лог - отдельным вызовом .write() со сбросом буфера (как файловый обработчик пишет по умолчанию).
+2. Пачка склеивается в одну строку байт и записывается одним вызовом .write().
+3. Каждый лог копируется в файл, отображенный в память (см. MmapFileWrapper).
+
+Запуск:
+python benchmarks/file_writes.py
+"""
+
+import os
+import sys
+import timeit
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from polog.handlers.file.file_dependency_wrapper import FileDependencyWrapper
+from polog.handlers.file.mmap_file_wrapper import MmapFileWrapper
+
+
+NUMBER = 200
+BATCH_SIZE = 1000
+LINE = b'[2022-01-01 12:00:00.000000] |    1    | SUCCESS |  AUTO  | where: benchmarks.file_writes.main() | time of work: 0.00012300 sec.\n'
+
+def main():
+    lines = [LINE] * BATCH_SIZE
+    with tempfile.TemporaryDirectory() as directory:
+        for atomic_append in (False, True):
+            path = os.path.join(directory, f'atomic_{atomic_append}.log')
+            wrapper = FileDependencyWrapper([path], lock_type='thread', atomic_append=atomic_append)
+
+            def one_by_one():
+                for line in lines:
+                    wrapper.write(line)
+                    wrapper.flush()
+
+            def joined():
+                wrapper.write(b''.join(lines))
+                wrapper.flush()
+
+            print(f'atomic_append={atomic_append}, {BATCH_SIZE} lines per batch:')
+            for name, function in (('one by one', one_by_one), ('joined', joined)):
+                result = min(timeit.repeat(function, number=NUMBER, repeat=3))
+                print(f'  {name:<12} {result / NUMBER * 1000000:9.2f} us per batch')
+            wrapper.close()
+
+        path = os.path.join(directory, 'mmap.log')
+        wrapper = MmapFileWrapper([path], 'thread', len(LINE) * BATCH_SIZE * NUMBER * 4)
+
+        def mmap_one_by_one():
+            for line in lines:
+                wrapper.write(line)
+
+        print(f'mmap, {BATCH_SIZE} lines per batch:')
+        result = min(timeit.repeat(mmap_one_by_one, number=NUMBER, repeat=3))
+        print(f'  {"one by one":<12} {result / NUMBER * 1000000:9.2f} us per batch')
+        wrapper.close()
+
+if __name__ == '__main__':
+    main()
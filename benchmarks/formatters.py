@@ -0,0 +1,62 @@
+"""
+Сравнение скорости стандартного форматтера файлового обработчика (BaseFormatter) и форматтера по шаблону (TemplateFormatter).
+
+Шаблон подобран так, чтобы давать строку того же вида, что и стандартный форматтер. Кэш отформатированных строк в объектах логов (см. LogItem.get_rendered()) здесь не участвует: форматтерам передаются обычные словари.
+
+Запуск:
+python benchmarks/formatters.py
+"""
+
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from polog.handlers.file.base_formatter import BaseFormatter
+from polog.handlers.file.template_formatter import TemplateFormatter
+from polog.utils.json_vars import vars_to_dict, get_item
+
+
+NUMBER = 50000
+TEMPLATE = '[{time}] | {level:^7} | {success:^7} | {auto:^6}[[ | "{message}"]] | where: {function}[[ | time of work: {time_of_work} sec.]][[ | input variables: {input_variables}]][[ | result: {result}]]'
+
+def get_logs():
+    """
+    Типичные логи: вызов функции без ошибки и ручной лог с сообщением.
+    """
+    return {
+        'auto': {
+            'level': 1,
+            'auto': True,
+            'success': True,
+            'time': time.time(),
+            'module': 'benchmarks.formatters',
+            'function': 'get_logs',
+            'time_of_work': 0.000123,
+            'input_variables': vars_to_dict(1, 'lol', user_id=12345),
+            'result': get_item([1, 2, 3]),
+        },
+        'manual': {
+            'level': 1,
+            'auto': False,
+            'time': time.time(),
+            'message': 'hello',
+        },
+    }
+
+def main():
+    base = BaseFormatter('\n')
+    template = TemplateFormatter(TEMPLATE)
+    for name, log in get_logs().items():
+        print(f'{name}:')
+        print(f'  base:     {base.get_formatted_string(log)!r}')
+        print(f'  template: {template(log)!r}')
+        base_time = min(timeit.repeat(lambda: base.get_formatted_string(log), number=NUMBER, repeat=3))
+        template_time = min(timeit.repeat(lambda: template(log), number=NUMBER, repeat=3))
+        print(f'  BaseFormatter:     {base_time / NUMBER * 1000000:6.2f} us per log')
+        print(f'  TemplateFormatter: {template_time / NUMBER * 1000000:6.2f} us per log, x{base_time / template_time:.2f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Сравнение скорости сериализации логов разными JSON-модулями (см. настройку 'json_module').
+
+Для каждого доступного модуля измеряется, сколько времени уходит на то, чтобы сериализовать типичный набор полей лога с ошибкой (аргументы функции, локальные переменные и трейсбек) и записать результат в файл:
+1. "text" - по-старому: получаем строку и пишем ее в файл, открытый в текстовом режиме (кодирование в UTF-8 происходит внутри файлового объекта).
+2. "bytes" - получаем байты (см. JSONBackend.dumps_bytes()) и пишем их в файл, открытый в бинарном режиме.
+
+Запуск:
+python benchmarks/json_backends.py
+"""
+
+import os
+import sys
+import json
+import timeit
+import traceback
+import importlib
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from polog.core.utils.json_backend import get_json_backend
+from polog.utils.json_vars import vars_to_dict
+
+
+NUMBER = 20000
+
+def get_payload():
+    """
+    Типичное содержимое лога об ошибке.
+    """
+    try:
+        raise ValueError('kek')
+    except ValueError:
+        trace = traceback.format_tb(sys.exc_info()[2])
+    return {
+        'level': 2,
+        'auto': True,
+        'success': False,
+        'module': 'benchmarks.json_backends',
+        'function': 'get_payload',
+        'exception_type': 'ValueError',
+        'exception_message': 'kek',
+        'input_variables': vars_to_dict(1, 'lol', [1, 2, 3], user_id=12345, name='Вася', flag=True),
+        'local_variables': vars_to_dict(a=1, b='kek' * 10, c={'x': 1, 'y': [1, 2]}),
+        'traceback': trace,
+        'time_of_work': 0.000123,
+    }
+
+def measure(module, mode, payload, directory):
+    backend = get_json_backend(module)
+    path = os.path.join(directory, f'{module.__name__}_{mode}.log')
+    if mode == 'text':
+        file = open(path, 'a', encoding='utf-8')
+        write = lambda: file.write(backend.dumps(payload) + '\n')
+    else:
+        file = open(path, 'ab')
+        write = lambda: file.write(backend.dumps_bytes(payload) + b'\n')
+    try:
+        return min(timeit.repeat(write, number=NUMBER, repeat=3))
+    finally:
+        file.close()
+
+def main():
+    payload = get_payload()
+    modules = []
+    for name in ('json', 'ujson', 'orjson'):
+        try:
+            modules.append(importlib.import_module(name))
+        except ImportError:
+            print(f'{name}: not installed, skipped')
+    with tempfile.TemporaryDirectory() as directory:
+        baseline = None
+        for module in modules:
+            for mode in ('text', 'bytes'):
+                seconds = measure(module, mode, payload, directory)
+                if baseline is None:
+                    baseline = seconds
+                per_log = seconds / NUMBER * 1000000
+                print(f'{module.__name__:>7} {mode:>5}: {per_log:8.2f} us per log, x{baseline / seconds:.2f}')
+
+if __name__ == '__main__':
+    main()
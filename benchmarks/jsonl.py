@@ -0,0 +1,96 @@
+"""
+Сравнение файлового обработчика с текстовым форматтером по умолчанию (BaseFormatter) и обработчика, который пишет логи в формате JSON Lines (см. jsonl_file_writer и JSONFormatter).
+
+Для каждого варианта измеряется, сколько времени уходит на форматирование и запись одного лога (с буферизацией, как это обычно настраивается для больших потоков логов), и сколько байт в среднем занимает один лог в файле. JSON Lines измеряется с каждым доступным модулем сериализации (см. настройку 'json_module'). Кэш отформатированных строк в объектах логов (см. LogItem.get_rendered()) здесь не участвует: обработчикам передаются обычные словари.
+
+Запуск:
+python benchmarks/jsonl.py
+"""
+
+import os
+import sys
+import time
+import timeit
+import importlib
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from polog import file_writer, jsonl_file_writer
+from polog.core.stores.settings.settings_store import SettingsStore
+from polog.utils.json_vars import vars_to_dict, get_item
+
+
+NUMBER = 50000
+BUFFER_SIZE = 64 * 1024
+
+def get_logs():
+    """
+    Типичные логи: вызов функции без ошибки, ручной лог с сообщением и ошибка с переменными.
+    """
+    return {
+        'auto': {
+            'level': 1,
+            'auto': True,
+            'success': True,
+            'time': time.time(),
+            'module': 'benchmarks.jsonl',
+            'function': 'get_logs',
+            'time_of_work': 0.000123,
+            'input_variables': vars_to_dict(1, 'lol', user_id=12345),
+            'result': get_item([1, 2, 3]),
+        },
+        'manual': {
+            'level': 1,
+            'auto': False,
+            'time': time.time(),
+            'message': 'hello',
+        },
+        'error': {
+            'level': 2,
+            'auto': True,
+            'success': False,
+            'time': time.time(),
+            'module': 'benchmarks.jsonl',
+            'function': 'get_logs',
+            'time_of_work': 0.000123,
+            'exception_type': 'ValueError',
+            'exception_message': 'kek',
+            'input_variables': vars_to_dict(1, 'lol', [1, 2, 3], user_id=12345, name='Вася', flag=True),
+        },
+    }
+
+def measure(handler_class, log, path):
+    """
+    Возвращаем время записи одного лога в микросекундах и средний размер лога в файле в байтах.
+    """
+    handler = handler_class(path, buffer_size=BUFFER_SIZE)
+    write = lambda: handler.do(handler.get_content(log))
+    try:
+        seconds = min(timeit.repeat(write, number=NUMBER, repeat=3))
+    finally:
+        handler.file.close()
+    return seconds / NUMBER * 1000000, os.stat(path).st_size / (NUMBER * 3)
+
+def main():
+    modules = []
+    for name in ('json', 'ujson', 'orjson'):
+        try:
+            modules.append(importlib.import_module(name))
+        except ImportError:
+            print(f'{name}: not installed, skipped')
+    store = SettingsStore()
+    default_module = store['json_module']
+    with tempfile.TemporaryDirectory() as directory:
+        for name, log in get_logs().items():
+            print(f'{name}:')
+            base_time, base_size = measure(file_writer, log, os.path.join(directory, f'{name}.log'))
+            print(f'  {"text":>12}: {base_time:6.2f} us per log, {base_size:6.1f} bytes per log')
+            for module in modules:
+                store['json_module'] = module
+                json_time, json_size = measure(jsonl_file_writer, log, os.path.join(directory, f'{name}_{module.__name__}.jsonl'))
+                print(f'  {"jsonl " + module.__name__:>12}: {json_time:6.2f} us per log, {json_size:6.1f} bytes per log, x{base_time / json_time:.2f}')
+            store['json_module'] = default_module
+
+if __name__ == '__main__':
+    main()
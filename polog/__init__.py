@@ -9,4 +9,9 @@ from polog.unlog import unlog
 from polog.utils.json_vars import json_vars
 from polog.field import field
 from polog.handlers.file.writer import file_writer
+from polog.handlers.file.routing_writer import routing_file_writer
+from polog.handlers.file.jsonl_writer import jsonl_file_writer
+from polog.handlers.file.template_formatter import TemplateFormatter
+from polog.handlers.file.json_formatter import JSONFormatter
+from polog.handlers.file.segment_reader import SegmentReader
 from polog.handlers.smtp.sender import SMTP_sender
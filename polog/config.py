@@ -6,6 +6,7 @@ from polog.core.utils.name_manager import NameManager
 from polog.core.stores.handlers import global_handlers
 from polog.data_structures.trees.named_tree.projector import TreeProjector
 from polog.core.stores.fields import in_place_fields, engine_fields
+from polog.core.stores.serializers import Serializers
 from polog.loggers.auto.function_logger import flog
 from polog.loggers.handle.handle_log import handle_log
 from polog.loggers.handle.message import message
@@ -226,3 +227,24 @@ class config:
         result = {**cls.get_in_place_fields(*names)}
         result.update(cls.get_engine_fields(*names))
         return result
+
+    @staticmethod
+    def set_serializer(_type, serializer):
+        """
+        Регистрируем сериализатор для переменных заданного типа (и его наследников), попадающих в логи: аргументов функций, возвращаемых значений и локальных переменных.
+
+        Сериализатор - функция, принимающая один объект и возвращающая его представление из типов, допустимых в JSON. Например, модель ORM можно логировать по первичному ключу:
+
+        >>> config.set_serializer(User, lambda user: user.id)
+
+        Ранее зарегистрированный для этого же типа сериализатор (в т. ч. встроенный) будет перезаписан.
+        """
+        Serializers.set(_type, serializer)
+
+    @staticmethod
+    def delete_serializer(*types):
+        """
+        Удаляем сериализаторы, зарегистрированные для перечисленных типов. См. метод .set_serializer().
+        """
+        for _type in types:
+            Serializers.delete(_type)
@@ -0,0 +1,204 @@
+import os
+import time
+import atexit
+from threading import Lock, Thread, Event
+
+from polog.core.stores.settings.settings_store import SettingsStore
+from polog.core.stores.levels import Levels
+from polog.core.engine.engine import Engine
+from polog.core.log_item import LogItem
+from polog.core.utils.read_only_singleton import ReadOnlySingleton
+from polog.core.utils.exception_escaping import exception_escaping
+from polog.core.utils.time_limit import time_limit
+from polog.core.aggregation.function_statistics import FunctionStatistics
+from polog.core.aggregation.prometheus import prometheus_text, PrometheusEndpoint
+
+
+class Aggregator(ReadOnlySingleton):
+    """
+    Накопитель статистики для функций, задекорированных в режиме агрегации (aggregate=True).
+
+    В этом режиме успешные вызовы функций не порождают отдельных логов. Вместо этого длительность каждого вызова записывается в гистограмму, а раз в интервал (настройка 'aggregation_interval') для каждой функции, которую за этот интервал вызывали, в движок отправляется один сводный лог: количество вызовов, количество ошибок, среднее, медиана, 90-й и 99-й перцентили и максимум длительности.
+    Таким образом на горячих путях, где функция вызывается тысячи раз в секунду, стоимость логирования сводится к нескольким арифметическим операциям под блокировкой.
+
+    Кроме того, накопленная статистика может экспортироваться в текстовом формате Prometheus - в файл (настройка 'aggregation_prometheus_file') и/или через локальный HTTP-сервер (настройка 'aggregation_prometheus_port').
+
+    Фоновый поток, выгружающий статистику, запускается лениво - при первом учтенном вызове. Тогда же запускается и HTTP-сервер, чтобы метрики можно было собирать сразу, не дожидаясь окончания первого интервала. При завершении программы статистика за последний неполный интервал также выгружается.
+    """
+
+    lock = Lock()
+
+    def __init__(self):
+        with self.lock:
+            if not hasattr(self, 'inited'):
+                self.settings = SettingsStore()
+                self.engine = Engine()
+                self.statistics = {}
+                self.started = False
+                self.finished = False
+                self.stop_event = Event()
+                self.flush_lock = Lock()
+                self.endpoint = None
+                self.endpoint_lock = Lock()
+                self.inited = True
+
+    def record(self, args_dict, time_of_work, success, handlers, level, in_place_fields, engine_fields):
+        """
+        Учитываем один вызов задекорированной функции.
+
+        args_dict - словарь с базовыми полями лога, см. FunctionLogger.get_base_args_dict(). Статистика группируется по модулю, классу, имени функции и сообщению.
+        time_of_work - длительность вызова в секундах.
+        success - True, если функция отработала без исключения.
+        handlers, level, in_place_fields, engine_fields - параметры декоратора, они будут использованы для сводных логов.
+        """
+        key = (args_dict.get('module'), args_dict.get('class'), args_dict.get('function'), args_dict.get('message'))
+        statistics = self.statistics.get(key)
+        if statistics is None:
+            statistics = self.register(key, args_dict, handlers, level, in_place_fields, engine_fields)
+        statistics.record(time_of_work, success)
+
+    def register(self, key, args_dict, handlers, level, in_place_fields, engine_fields):
+        """
+        Создаем объект статистики для новой функции. При первом вызове также запускается фоновый поток выгрузки.
+        """
+        with self.lock:
+            statistics = self.statistics.get(key)
+            if statistics is None:
+                labels = {name: args_dict[name] for name in ('module', 'class', 'function', 'message') if name in args_dict}
+                statistics = FunctionStatistics(labels, handlers, level, in_place_fields, engine_fields)
+                self.statistics[key] = statistics
+            if not self.started:
+                self.start()
+            return statistics
+
+    def start(self):
+        """
+        Запуск фонового потока выгрузки и HTTP-сервера с метриками (если он включен в настройках), а также регистрация финальной выгрузки при завершении работы программы.
+        """
+        self.started = True
+        self.update_endpoint()
+        self.engine.add_exit_callback(self.final_flush)
+        self.atexit_register()
+        self.thread = Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def run(self):
+        """
+        Цикл фонового потока. Длительность интервала считывается из настроек на каждой итерации, поэтому ее можно менять на ходу.
+        """
+        while not self.stop_event.wait(self.settings['aggregation_interval']):
+            self.flush()
+
+    @exception_escaping
+    def flush(self):
+        """
+        Выгрузка статистики за прошедший интервал: сводные логи отправляются в движок, метрики в формате Prometheus - в файл и на HTTP-сервер (если это включено в настройках).
+        """
+        with self.flush_lock:
+            for statistics in list(self.statistics.values()):
+                calls, errors, histogram = statistics.pop_interval()
+                if calls:
+                    self.write_summary(statistics, calls, errors, histogram)
+            self.export()
+
+    def final_flush(self):
+        """
+        Финальная выгрузка при завершении работы программы. Срабатывает не более одного раза.
+        """
+        with self.lock:
+            if self.finished:
+                return
+            self.finished = True
+        self.stop_event.set()
+        self.flush()
+
+    def write_summary(self, statistics, calls, errors, histogram):
+        """
+        Формирование сводного лога за интервал и его отправка в движок.
+        """
+        if statistics.level is not None:
+            level = Levels.get(statistics.level)
+        else:
+            level = self.settings['default_level']
+        if level < self.settings['level']:
+            return
+
+        data = {**statistics.labels}
+        data['auto'] = True
+        data['aggregated'] = True
+        data['time'] = time.time()
+        data['level'] = level
+        data['success'] = not errors
+        data['calls'] = calls
+        data['errors'] = errors
+        data['time_of_work'] = histogram.sum
+        data['latency_mean'] = histogram.mean()
+        data['latency_p50'] = histogram.quantile(0.5)
+        data['latency_p90'] = histogram.quantile(0.9)
+        data['latency_p99'] = histogram.quantile(0.99)
+        data['latency_max'] = histogram.max
+        service_name = self.settings['service_name']
+        if service_name is not None:
+            data['service_name'] = service_name
+
+        log = LogItem()
+        log.set_data(data)
+        log.set_handlers(statistics.handlers)
+        log.set_extra_fields(statistics.engine_fields)
+        log.extract_extra_fields_from(statistics.in_place_fields)
+        self.engine.write(log)
+
+    def prometheus_text(self):
+        """
+        Накопленная за все время работы программы статистика в текстовом формате Prometheus.
+        """
+        return prometheus_text(list(self.statistics.values()), service_name=self.settings['service_name'])
+
+    def export(self):
+        """
+        Экспорт метрик в файл и (пере)запуск HTTP-сервера в соответствии с текущими настройками.
+        """
+        path = self.settings['aggregation_prometheus_file']
+        if path is not None:
+            self.write_prometheus_file(path)
+        self.update_endpoint()
+
+    @exception_escaping
+    def update_endpoint(self):
+        """
+        (Пере)запуск или остановка HTTP-сервера с метриками в соответствии с текущим значением настройки 'aggregation_prometheus_port'.
+
+        Вызывается при запуске агрегации, при каждой выгрузке статистики и при изменении настройки (см. polog.core.stores.settings.actions.update_prometheus_endpoint). Сервер отдает накопленную статистику на момент запроса, поэтому для него не нужно ждать окончания интервала.
+        """
+        with self.endpoint_lock:
+            port = self.settings['aggregation_prometheus_port']
+            if self.endpoint is not None and self.endpoint.port != port:
+                self.endpoint.stop()
+                self.endpoint = None
+            if port is not None and self.endpoint is None:
+                self.endpoint = PrometheusEndpoint(port, self.prometheus_text)
+
+    def write_prometheus_file(self, path):
+        """
+        Атомарная запись метрик в файл: сначала во временный файл рядом, затем переименование. Так сборщик метрик никогда не прочитает файл, записанный наполовину.
+        """
+        temporary_path = f'{path}.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            file.write(self.prometheus_text())
+        os.replace(temporary_path, path)
+
+    def atexit_register(self):
+        """
+        Регистрация финальной выгрузки при завершении работы программы.
+
+        Если движок к этому моменту еще не был запущен, он запустится при записи сводных логов, поэтому после выгрузки нужно дождаться, пока движок их запишет.
+        Если движок был запущен раньше, он сам вызовет финальную выгрузку перед своей остановкой (см. Engine.add_exit_callback()).
+        """
+        @atexit.register
+        @exception_escaping
+        @time_limit(lambda: self.settings['max_delay_before_exit'])
+        # Учет данной функции при расчете покрытия тестами отключен, поскольку для его проверки используется отдельный процесс, который, к сожалению, не учитывается сборщиком статистики.
+        def checker(): # pragma: no cover
+            self.final_flush()
+            self.engine.exit()
@@ -0,0 +1,70 @@
+from threading import Lock
+
+from polog.core.aggregation.histogram import LatencyHistogram
+
+
+class FunctionStatistics:
+    """
+    Накопленная статистика вызовов одной задекорированной функции.
+
+    Хранится в двух экземплярах:
+    1. За текущий интервал. Она сбрасывается при каждой выгрузке сводного лога (см. .pop_interval()).
+    2. Накопительная, за все время работы программы. Используется при экспорте метрик в формате Prometheus, где счетчики должны только расти.
+    """
+    def __init__(self, labels, handlers, level, in_place_fields, engine_fields):
+        """
+        labels - словарь с полями, описывающими функцию: 'module', 'class', 'function' и, возможно, 'message'. Они будут скопированы в каждый сводный лог.
+        handlers - обработчики, в которые будут отправляться сводные логи.
+        level - уровень логирования, переданный в декоратор (или None).
+        in_place_fields, engine_fields - дополнительные извлекаемые поля декоратора.
+        """
+        self.labels = labels
+        self.handlers = handlers
+        self.level = level
+        self.in_place_fields = in_place_fields
+        self.engine_fields = engine_fields
+        self.lock = Lock()
+        self.calls = 0
+        self.errors = 0
+        self.histogram = LatencyHistogram()
+        self.total_calls = 0
+        self.total_errors = 0
+        self.total_histogram = LatencyHistogram()
+
+    def record(self, time_of_work, success):
+        """
+        Учитываем один вызов функции.
+        """
+        with self.lock:
+            self.calls += 1
+            if not success:
+                self.errors += 1
+            self.histogram.add(time_of_work)
+
+    def pop_interval(self):
+        """
+        Забираем статистику за текущий интервал и начинаем новый.
+        Забранные данные добавляются к накопительной статистике.
+
+        Возвращается кортеж: (количество вызовов, количество ошибок, гистограмма длительностей).
+        """
+        with self.lock:
+            result = (self.calls, self.errors, self.histogram)
+            self.total_calls += self.calls
+            self.total_errors += self.errors
+            self.total_histogram.merge(self.histogram)
+            self.calls = 0
+            self.errors = 0
+            self.histogram = LatencyHistogram()
+        return result
+
+    def totals(self):
+        """
+        Накопительная статистика за все время, с учетом еще не выгруженного интервала.
+
+        Возвращается кортеж: (количество вызовов, количество ошибок, гистограмма длительностей).
+        """
+        with self.lock:
+            histogram = self.total_histogram.copy()
+            histogram.merge(self.histogram)
+            return (self.total_calls + self.calls, self.total_errors + self.errors, histogram)
@@ -0,0 +1,115 @@
+from bisect import bisect_left
+
+
+class LatencyHistogram:
+    """
+    Гистограмма длительностей вызовов функций с фиксированным набором корзин.
+
+    Запись одного значения стоит одного бинарного поиска по границам корзин и нескольких сложений, а объем занимаемой памяти не зависит от количества записанных значений.
+    Квантили оцениваются приближенно, с линейной интерполяцией внутри корзины. Для целей мониторинга такой точности достаточно.
+    """
+    # Верхние границы корзин в секундах. Последняя корзина (+Inf) подразумевается и отдельно не указывается.
+    DEFAULT_BOUNDS = (
+        0.00001,
+        0.000025,
+        0.00005,
+        0.0001,
+        0.00025,
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        10.0,
+        30.0,
+        60.0,
+    )
+
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        """
+        Записываем в гистограмму одно значение (в секундах).
+        """
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """
+        Добавляем к текущей гистограмме содержимое другой гистограммы с теми же границами корзин.
+        """
+        if self.bounds != other.bounds:
+            raise ValueError('Only histograms with the same bucket bounds can be merged.')
+        for index, number in enumerate(other.buckets):
+            self.buckets[index] += number
+        self.count += other.count
+        self.sum += other.sum
+        if other.max > self.max:
+            self.max = other.max
+
+    def copy(self):
+        """
+        Получаем независимую копию гистограммы.
+        """
+        result = type(self)(self.bounds)
+        result.merge(self)
+        return result
+
+    def mean(self):
+        """
+        Среднее значение. Для пустой гистограммы - None.
+        """
+        if not self.count:
+            return None
+        return self.sum / self.count
+
+    def quantile(self, q):
+        """
+        Оценка квантиля q (число от 0 до 1). Для пустой гистограммы возвращается None.
+
+        Внутри корзины значения считаются распределенными равномерно. Для последней, бесконечной, корзины в качестве верхней границы берется максимальное записанное значение.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError('The quantile must be a number from 0 to 1.')
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, number in enumerate(self.buckets):
+            if number and seen + number >= rank:
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                upper = min(upper, self.max)
+                lower = min(lower, upper)
+                return lower + (upper - lower) * ((rank - seen) / number)
+            seen += number
+        return self.max # pragma: no cover
+
+    def cumulative_buckets(self):
+        """
+        Возвращаем список пар (верхняя граница корзины, количество значений не больше этой границы).
+        Последняя пара соответствует бесконечной корзине, ее граница обозначена как float('inf').
+        Такое представление используется, например, в формате экспорта Prometheus.
+        """
+        result = []
+        accumulated = 0
+        for bound, number in zip((*self.bounds, float('inf')), self.buckets):
+            accumulated += number
+            result.append((bound, accumulated))
+        return result
@@ -0,0 +1,93 @@
+from threading import Thread
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+def escape_label_value(value):
+    """
+    Экранирование значения метки по правилам текстового формата Prometheus.
+    """
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def format_bound(bound):
+    """
+    Текстовое представление верхней границы корзины гистограммы.
+    """
+    if bound == float('inf'):
+        return '+Inf'
+    return repr(float(bound))
+
+def prometheus_text(statistics, service_name=None):
+    """
+    Формируем текст в формате Prometheus (https://prometheus.io/docs/instrumenting/exposition_formats/) из накопленной статистики функций.
+
+    statistics - итерабельный объект с экземплярами FunctionStatistics.
+    service_name - имя сервиса, если оно задано. Добавляется в метки всех метрик.
+
+    Набор меток каждой серии совпадает с ключом, по которому группируется статистика (модуль, класс, функция и сообщение), - иначе у одной функции с разными сообщениями получились бы разные серии с одинаковыми метками. Метки с пустыми значениями не выводятся.
+    """
+    calls = ['# HELP polog_function_calls_total Number of calls of decorated functions.', '# TYPE polog_function_calls_total counter']
+    errors = ['# HELP polog_function_errors_total Number of calls of decorated functions that raised an exception.', '# TYPE polog_function_errors_total counter']
+    latency = ['# HELP polog_function_latency_seconds Duration of calls of decorated functions.', '# TYPE polog_function_latency_seconds histogram']
+
+    for one in statistics:
+        total_calls, total_errors, histogram = one.totals()
+        labels = {'service': service_name, 'module': one.labels.get('module'), 'class': one.labels.get('class'), 'function': one.labels.get('function'), 'message': one.labels.get('message')}
+        labels = ','.join(f'{key}="{escape_label_value(value)}"' for key, value in labels.items() if value is not None)
+        calls.append(f'polog_function_calls_total{{{labels}}} {total_calls}')
+        errors.append(f'polog_function_errors_total{{{labels}}} {total_errors}')
+        separator = ',' if labels else ''
+        for bound, number in histogram.cumulative_buckets():
+            latency.append(f'polog_function_latency_seconds_bucket{{{labels}{separator}le="{format_bound(bound)}"}} {number}')
+        latency.append(f'polog_function_latency_seconds_sum{{{labels}}} {repr(histogram.sum)}')
+        latency.append(f'polog_function_latency_seconds_count{{{labels}}} {histogram.count}')
+
+    return '\n'.join(calls + errors + latency) + '\n'
+
+
+class PrometheusEndpoint:
+    """
+    Локальный HTTP-сервер, отдающий метрики в текстовом формате Prometheus по любому GET-запросу.
+
+    Сервер работает в отдельном потоке-демоне и не влияет на завершение программы.
+    """
+    def __init__(self, port, get_text, host='127.0.0.1'):
+        """
+        port - номер порта.
+        get_text - функция без аргументов, возвращающая актуальный текст с метриками.
+        host - адрес, на котором сервер принимает соединения. По умолчанию - только локальные.
+        """
+        self.port = port
+        self.server = ThreadingHTTPServer((host, port), self.get_request_handler_class(get_text))
+        self.server.daemon_threads = True
+        self.thread = Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """
+        Остановка сервера и освобождение порта.
+        """
+        self.server.shutdown()
+        self.server.server_close()
+
+    @staticmethod
+    def get_request_handler_class(get_text):
+        """
+        Создаем класс обработчика запросов, замкнутый на функцию, возвращающую текст с метриками.
+        """
+        class MetricsRequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = get_text().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                """
+                Отключаем вывод информации о каждом запросе в stderr.
+                """
+                pass
+
+        return MetricsRequestHandler
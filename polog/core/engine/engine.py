@@ -38,6 +38,10 @@ class Engine(ReadOnlySingleton):
                 self.inited = True
                 self.serial_number = 0
                 self.active = False
+                self.exit_callbacks = []
+                self.stop_callbacks = []
+                self.exited = False
+                self.exit_lock = Lock()
 
     def __second_init__(self):
         """
@@ -94,10 +98,20 @@ class Engine(ReadOnlySingleton):
         self.increment_serial_number()
         self.active = True
 
-    @exception_escaping
     def stop(self):
         """
         Остановка движка.
+
+        После остановки, когда все переданные в движок логи уже обработаны, вызываются функции, зарегистрированные через .add_stop_callback().
+        """
+        self.stop_real_engine()
+        for callback in list(self.stop_callbacks):
+            exception_escaping(callback)()
+
+    @exception_escaping
+    def stop_real_engine(self):
+        """
+        Остановка текущего экземпляра "настоящего" движка.
         """
         self.real_engine.stop()
         self.active = False
@@ -135,5 +149,45 @@ class Engine(ReadOnlySingleton):
         @time_limit(lambda: self.settings['max_delay_before_exit'])
         # Учет данной функции при расчете покрытия тестами отключен, поскольку для его проверки используется отдельный процесс, который, к сожалению, не учитывается сборщиком статистики.
         def checker(): # pragma: no cover
-            self.block()
-            self.stop()
+            self.exit()
+
+    def add_exit_callback(self, callback):
+        """
+        Регистрация функции без аргументов, которая будет вызвана при завершении работы программы, до остановки движка.
+
+        Это нужно тем частям Polog, которые копят данные в памяти и при завершении работы должны успеть отправить их в движок (например, накопителю статистики, см. polog.core.aggregation). После остановки движка сделать это уже невозможно.
+        """
+        self.exit_callbacks.append(callback)
+
+    def add_stop_callback(self, callback):
+        """
+        Регистрация функции без аргументов, которая будет вызываться каждый раз после остановки движка (при перезагрузке и при завершении работы программы), когда все переданные в движок логи уже обработаны.
+
+        Это нужно обработчикам, которые копят записанные логи в памяти (например, файловому обработчику в режиме буферизации, см. polog.handlers.file.buffered_file_wrapper): в этот момент они должны сбросить накопленное.
+        """
+        self.stop_callbacks.append(callback)
+
+    def remove_stop_callback(self, callback):
+        """
+        Отмена регистрации функции, переданной ранее в .add_stop_callback(). Если такой функции нет среди зарегистрированных, ничего не происходит.
+
+        Обработчики, которые создаются и закрываются во время работы программы (например, файлы обработчика с маршрутизацией, см. routing_file_writer), должны убирать свои функции при закрытии, иначе список будет расти бесконечно.
+        """
+        try:
+            self.stop_callbacks.remove(callback)
+        except ValueError:
+            pass
+
+    def exit(self):
+        """
+        Процедура завершения работы: вызов зарегистрированных функций (см. .add_exit_callback()), после чего - блокировка и остановка движка.
+        Срабатывает не более одного раза, повторные вызовы игнорируются.
+        """
+        with self.exit_lock:
+            if self.exited:
+                return
+            self.exited = True
+        for callback in self.exit_callbacks:
+            exception_escaping(callback)()
+        self.block()
+        self.stop()
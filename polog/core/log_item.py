@@ -2,6 +2,8 @@ from dataclasses import dataclass
 
 from polog.errors import RewritingLogError
 from polog.core.utils.exception_escaping import exception_escaping
+from polog.core.utils.timestamp_to_datetime import timestamp_to_datetime
+from polog.core.utils.to_json import to_json
 
 
 @dataclass
@@ -17,7 +19,19 @@ class LogItem:
     Логи передаются в обработчики и уже там каким-то образом обрабатываются, например сохраняются в файл или отправляются на сторонний сервер. При этом коллекция обработчиков хранится в самом логе. Это нужно, поскольку с логами, полученными из разных мест программы, могут работать разные наборы обработчиков.
     """
 
-    __slots__ = ('_function_input_data', '_handlers', 'fields', 'extra_fields')
+    __slots__ = ('_function_input_data', '_handlers', 'fields', 'extra_fields', '_converted', '_rendered')
+
+    # Поля, которые хранятся в логе в "сыром", дешевом для создания виде, и преобразуются в удобный для чтения вид только при первом обращении к ним.
+    # Ключи - названия полей, значения - функции-конвертеры, принимающие сырое значение и возвращающие преобразованное. Результат преобразования кэшируется в самом логе.
+    # Например, поле 'time' хранится как число секунд с начала эпохи, а объект datetime создается, только если какой-то обработчик действительно его запросил. Обработчикам, которым достаточно сырого значения, следует использовать метод .get_raw().
+    # Переменные функции, возвращаемое значение и трейсбек хранятся как структуры (словари и списки). Строка JSON из них получается только при первом обращении через .get() или [] и дальше переиспользуется всеми обработчиками этого лога. Обработчики, которые выводят эти поля не в JSON (например, в виде текста), могут брать структуру через .get_raw() и не тратить время на сериализацию и обратный разбор JSON.
+    _lazy_converters = {
+        'time': timestamp_to_datetime,
+        'input_variables': to_json,
+        'local_variables': to_json,
+        'result': to_json,
+        'traceback': to_json,
+    }
 
     def __new__(cls, **kwargs):
         """
@@ -38,9 +52,12 @@ class LogItem:
         Возвращаем содержимое полей по ключу.
         """
         try:
-            return self.fields[key]
+            value = self.fields[key]
         except AttributeError:
             raise KeyError(key)
+        if key in self._lazy_converters:
+            return self._convert(key, value)
+        return value
 
     def __setitem__(self, key, value):
         """
@@ -63,7 +80,7 @@ class LogItem:
         content = []
         if not hasattr(self, 'fields') or not self.fields:
             return f'<log item #{id(self)} (empty)>'
-        for field_name, value in self.fields.items():
+        for field_name, value in self.items():
             if isinstance(value, str):
                 value = f'"{value}"'
             item = f'{field_name} = {value}'
@@ -236,9 +253,10 @@ class LogItem:
         Получаем коллекцию, содержащую кортежи, в каждом из которых первый элемент - название поля лога, второй - значение этого поля.
         """
         try:
-            return self.fields.items()
+            fields = self.fields
         except AttributeError:
             return ()
+        return [(key, self._convert(key, value) if key in self._lazy_converters else value) for key, value in fields.items()]
 
     def keys(self):
         """
@@ -253,10 +271,9 @@ class LogItem:
         """
         Получаем коллекцию значений всех полей лога.
         """
-        try:
-            return self.fields.values()
-        except AttributeError:
+        if not hasattr(self, 'fields'):
             return ()
+        return [value for key, value in self.items()]
 
     @property
     def function_input_data(self):
@@ -272,11 +289,53 @@ class LogItem:
         """
         Получаем значение поля лога по его названию. Метод работает аналогично одноименному у словаря.
         """
+        try:
+            return self[key]
+        except KeyError:
+            return {}.get(key, *default)
+
+    def get_raw(self, key, *default):
+        """
+        Аналог метода .get(), но значения полей возвращаются в том виде, в котором они хранятся в логе, без ленивых преобразований (см. LogItem._lazy_converters).
+        Например, для поля 'time' здесь вернется число секунд с начала эпохи, а не объект datetime.
+        """
         try:
             return self.fields.get(key, *default)
         except AttributeError:
             return {}.get(key, *default)
 
+    def _convert(self, key, value):
+        """
+        Ленивое преобразование значения поля с кэшированием результата.
+        """
+        try:
+            converted = self._converted
+        except AttributeError:
+            converted = self._converted = {}
+        try:
+            return converted[key]
+        except KeyError:
+            result = converted[key] = self._lazy_converters[key](value)
+            return result
+
+    def get_rendered(self, key, renderer):
+        """
+        Получаем представление лога (например, отформатированную строку или сериализованный JSON), созданное функцией renderer. Результат кэшируется в самом логе под ключом key.
+
+        Это нужно, когда лог уходит в несколько обработчиков, которые представляют его одинаково: все они используют один и тот же ключ, и renderer вызывается только один раз. Ключ должен описывать все, от чего зависит результат (см., например, BaseFormatter.get_cache_key()).
+
+        renderer - функция, принимающая объект лога и возвращающая его представление. Если она подняла исключение, оно пробрасывается дальше, а в кэш ничего не сохраняется.
+        """
+        try:
+            rendered = self._rendered
+        except AttributeError:
+            rendered = self._rendered = {}
+        try:
+            return rendered[key]
+        except KeyError:
+            result = rendered[key] = renderer(self)
+            return result
+
     def set_data(self, data):
         """
         Сохраняем словарь с данными в объекте лога.
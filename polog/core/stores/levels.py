@@ -9,6 +9,8 @@ class Levels:
     # Наоборот, числа - ключи, названия уровней - значения.
     # Размер словаря не обязан совпадать с размером levels, т. к. пользователь может дать одному уровню 2 разных имени, и здесь из них будет фигурировать только последнее.
     levels_reverse = {}
+    # Номер версии соответствий. Увеличивается при каждом изменении, чтобы те, кто кэширует названия уровней (например, форматтеры), могли понять, что кэш устарел.
+    version = 0
 
     @classmethod
     def set(cls, name, value):
@@ -21,6 +23,7 @@ class Levels:
             raise ValueError('The level value can only be an integer.')
         cls.levels[name] = value
         cls.levels_reverse[value] = name
+        cls.version += 1
 
     @classmethod
     def get(cls, key):
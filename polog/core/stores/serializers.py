@@ -0,0 +1,81 @@
+from threading import Lock
+
+
+class Serializers:
+    """
+    Реестр сериализаторов для переменных, попадающих в логи (аргументов функций, возвращаемых значений и локальных переменных).
+
+    Сериализатор - это функция, принимающая один объект и возвращающая его представление из типов, допустимых в JSON (str, int, float, bool, None, list, dict). Сериализаторы привязываются к типам.
+    Поиск сериализатора для конкретного типа идет по его MRO: если для самого типа сериализатор не зарегистрирован, берется сериализатор ближайшего родителя. Результат поиска кэшируется, поэтому для каждого типа проход по MRO выполняется только один раз - до следующего изменения реестра.
+    Кроме того, можно зарегистрировать сериализаторы для типов, которые определяются не наследованием, а каким-то признаком (например, датаклассы). Они проверяются, если по MRO ничего не нашлось.
+    """
+    # Ключи - типы, значения - кортежи вида (сериализатор, название типа). Название типа может быть None, тогда в лог попадет название реального типа объекта.
+    serializers = {}
+    # Список кортежей вида (функция-признак, сериализатор). Функция-признак принимает тип и возвращает bool.
+    predicates = []
+    # Кэш результатов поиска по MRO.
+    cache = {}
+    lock = Lock()
+
+    @classmethod
+    def set(cls, _type, serializer, type_name=None):
+        """
+        Регистрируем сериализатор для типа. Ранее зарегистрированный для того же типа сериализатор перезаписывается.
+        """
+        if not isinstance(_type, type):
+            raise ValueError(f'A serializer can only be registered for a type. You passed "{_type}".')
+        if not callable(serializer):
+            raise ValueError(f'The serializer must be a callable object. You passed "{serializer}".')
+        with cls.lock:
+            cls.serializers[_type] = (serializer, type_name)
+            cls.cache = {}
+
+    @classmethod
+    def set_for_predicate(cls, predicate, serializer):
+        """
+        Регистрируем сериализатор для всех типов, для которых функция predicate возвращает True.
+        """
+        with cls.lock:
+            cls.predicates.append((predicate, serializer))
+            cls.cache = {}
+
+    @classmethod
+    def delete(cls, _type):
+        """
+        Удаляем сериализатор, зарегистрированный для типа. Если его не было, поднимается KeyError.
+        """
+        with cls.lock:
+            if _type not in cls.serializers:
+                raise KeyError(f'No serializer is registered for type "{_type}".')
+            del cls.serializers[_type]
+            cls.cache = {}
+
+    @classmethod
+    def get(cls, _type):
+        """
+        Получаем кортеж (сериализатор, название типа) для типа. Если подходящего сериализатора нет, возвращается (None, None).
+        """
+        try:
+            return cls.cache[_type]
+        except KeyError:
+            result = cls.resolve(_type)
+            cls.cache[_type] = result
+            return result
+
+    @classmethod
+    def resolve(cls, _type):
+        """
+        Поиск сериализатора по MRO типа, а затем - по функциям-признакам.
+        """
+        serializers = cls.serializers
+        for parent in _type.__mro__:
+            result = serializers.get(parent)
+            if result is not None:
+                return result
+        for predicate, serializer in cls.predicates:
+            try:
+                if predicate(_type):
+                    return (serializer, None)
+            except Exception:
+                pass
+        return (None, None)
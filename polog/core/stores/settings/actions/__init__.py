@@ -2,3 +2,4 @@ from polog.core.stores.settings.actions.reload_engine import reload_engine
 from polog.core.stores.settings.actions.fields_intersection import fields_intersection_action
 from polog.core.stores.settings.actions.set_log_as_built_in import set_log_as_built_in
 from polog.core.stores.settings.actions.integration_with_logging import integration_with_logging, from_logging_filter_to_polog
+from polog.core.stores.settings.actions.update_prometheus_endpoint import update_prometheus_endpoint
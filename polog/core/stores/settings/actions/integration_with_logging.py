@@ -1,8 +1,7 @@
 import logging
-import traceback
-from datetime import datetime
 
 from polog.core.stores.settings.actions.decorator import is_action
+from polog.core.utils.raw_traceback import RawTraceback
 
 
 def from_logging_filter_to_polog(record):
@@ -16,7 +15,7 @@ def from_logging_filter_to_polog(record):
     store = SettingsStore()
     data = {}
 
-    data['time'] = datetime.fromtimestamp(record.created)
+    data['time'] = record.created
     if record.msg:
         data['message'] = record.getMessage()
     data['level'] = record.levelno
@@ -31,7 +30,7 @@ def from_logging_filter_to_polog(record):
     data['path_to_code'] = record.pathname
     if record.exc_info is not None:
         data['exception_type'] = record.exc_info[0].__name__
-        data['traceback'] = store['json_module'].dumps(traceback.format_tb(record.exc_info[2]))
+        data['traceback'] = RawTraceback.from_traceback(record.exc_info[2])
         data['exception_message'] = str(record.exc_info[1])
     data['thread'] = f'{record.threadName} ({record.thread})'
     data['process'] = f'{record.processName} ({record.process})'
@@ -0,0 +1,15 @@
+from polog.core.stores.settings.actions.decorator import is_action
+
+
+@is_action
+def update_prometheus_endpoint(old_value, new_value, store):
+    """
+    (Пере)запуск или остановка HTTP-сервера с метриками режима агрегации при изменении номера порта.
+
+    Если агрегация еще не началась, ничего не происходит: сервер запустится вместе с ней (см. Aggregator.start()).
+    Импорт внутри функции используется для обхода циклических импортов.
+    """
+    from polog.core.aggregation.aggregator import Aggregator
+    aggregator = Aggregator()
+    if aggregator.started:
+        aggregator.update_endpoint()
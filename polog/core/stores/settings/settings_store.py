@@ -7,7 +7,7 @@ from polog.core.stores.settings.setting_point import SettingPoint
 from polog.core.stores.levels import Levels
 from polog.core.engine.real_engines.fabric import real_engine_fabric
 
-from polog.core.stores.settings.actions import reload_engine, fields_intersection_action, set_log_as_built_in, integration_with_logging
+from polog.core.stores.settings.actions import reload_engine, fields_intersection_action, set_log_as_built_in, integration_with_logging, update_prometheus_endpoint
 
 
 class SettingsStore(ReadOnlySingleton):
@@ -235,6 +235,77 @@ class SettingsStore(ReadOnlySingleton):
                 'the value must be boolean': lambda x: isinstance(x, bool),
             },
         ),
+        'max_variable_length': SettingPoint(
+            10000,
+            proves={
+                'the value can only be an integer or a None': lambda x: x is None or (isinstance(x, int) and not isinstance(x, bool)),
+                'the value must be greater than zero': lambda x: x is None or x > 0,
+            },
+        ),
+        'max_variables': SettingPoint(
+            100,
+            proves={
+                'the value can only be an integer or a None': lambda x: x is None or (isinstance(x, int) and not isinstance(x, bool)),
+                'the value must be greater than or equal to zero': lambda x: x is None or x >= 0,
+            },
+        ),
+        'max_container_length': SettingPoint(
+            1000,
+            proves={
+                'the value can only be an integer or a None': lambda x: x is None or (isinstance(x, int) and not isinstance(x, bool)),
+                'the value must be greater than or equal to zero': lambda x: x is None or x >= 0,
+            },
+        ),
+        'slower_than': SettingPoint(
+            None,
+            proves={
+                'the value can only be a number (int or float) or a None': lambda x: x is None or ((isinstance(x, int) or isinstance(x, float)) and not isinstance(x, bool)),
+                'the value must be greater than or equal to zero': lambda x: x is None or x >= 0,
+            },
+        ),
+        'slower_than_by_levels': SettingPoint(
+            {},
+            proves={
+                'the value must be a dictionary': lambda x: isinstance(x, dict),
+                'the keys must be logging levels (a string or an integer greater than or equal to zero)': lambda x: all((isinstance(key, int) and key >= 0) or isinstance(key, str) for key in x),
+                'the values must be numbers (int or float) greater than or equal to zero': lambda x: all((isinstance(value, int) or isinstance(value, float)) and not isinstance(value, bool) and value >= 0 for value in x.values()),
+            },
+            converter=lambda x: {Levels.get(key): value for key, value in x.items()},
+        ),
+        'stuck_after': SettingPoint(
+            None,
+            proves={
+                'the value can only be a number (int or float) or a None': lambda x: x is None or ((isinstance(x, int) or isinstance(x, float)) and not isinstance(x, bool)),
+                'the value must be greater than zero': lambda x: x is None or x > 0,
+            },
+        ),
+        'aggregate': SettingPoint(
+            False,
+            proves={
+                'the value must be boolean': lambda x: isinstance(x, bool),
+            },
+        ),
+        'aggregation_interval': SettingPoint(
+            60,
+            proves={
+                'the value must be a number (int or float)': lambda x: (isinstance(x, int) or isinstance(x, float)) and not isinstance(x, bool),
+                'the value must be greater than zero': lambda x: x > 0,
+            },
+        ),
+        'aggregation_prometheus_file': SettingPoint(
+            None,
+            proves={
+                'the value can only be a string or a None': lambda x: isinstance(x, str) or isinstance(x, type(None)),
+            },
+        ),
+        'aggregation_prometheus_port': SettingPoint(
+            None,
+            proves={
+                'the value can only be an integer or a None': lambda x: x is None or (isinstance(x, int) and not isinstance(x, bool)),
+                'the value must be a port number (from 1 to 65535)': lambda x: x is None or 0 < x < 65536,
+            },
+            action=update_prometheus_endpoint,
+        ),
 
     }
     points_are_informed = False
@@ -0,0 +1,126 @@
+import time
+import tracemalloc
+from threading import Lock
+
+
+class CallProfiler:
+    """
+    Замер ресурсов, потраченных на один вызов задекорированной функции. Используется декоратором логирования с флагом profile=True.
+
+    Заполняет в словаре с данными лога следующие поля:
+    1. 'cpu_time' - процессорное время (в секундах), потраченное текущим потоком (см. time.thread_time_ns()). В отличие от 'time_of_work', сюда не входит время ожидания ввода-вывода, сна, блокировок и т. д.
+    2. 'memory_allocated' и 'memory_peak' - только если включено отслеживание памяти через модуль tracemalloc (tracemalloc.start()). Первое - на сколько байт изменился объем памяти, занятой объектами Python, за время вызова. Второе - на сколько байт в пике этот объем превышал исходный. Модуль tracemalloc считает память глобально, поэтому при параллельной работе нескольких потоков сюда попадают и их аллокации.
+    3. Для корутин - 'running_time' и 'awaiting_time': сколько секунд корутина реально исполнялась, а сколько - ждала в await. Процессорное время для корутин считается только по отрезкам ее собственного исполнения, без других задач, работающих в том же потоке.
+    """
+
+    __slots__ = ('fields', 'start', 'cpu_start', 'running', 'running_cpu', 'memory_start', 'memory_peak', 'is_coroutine')
+
+    # Замеры памяти, которые идут прямо сейчас (см. .start_memory_tracing()), и блокировка для работы с ними.
+    active = set()
+    active_lock = Lock()
+
+    def __init__(self, fields):
+        """
+        fields - словарь с данными лога, куда по окончании замера будут записаны поля.
+        """
+        self.fields = fields
+        self.is_coroutine = False
+        self.running = 0
+        self.running_cpu = 0
+        self.memory_start = None
+        if tracemalloc.is_tracing():
+            self.start_memory_tracing()
+        self.cpu_start = time.thread_time_ns()
+        self.start = time.perf_counter_ns()
+
+    def start_memory_tracing(self):
+        """
+        Начало замера памяти.
+
+        Модуль tracemalloc хранит один пиковый объем памяти на весь процесс, и узнать пик за время вызова можно, только сбросив его в начале вызова (tracemalloc.reset_peak()). Но замеры могут быть вложенными (профилируемая функция вызывает другую профилируемую функцию) или идти параллельно в разных потоках, и сброс в начале одного замера стер бы пик, уже набранный другими. Поэтому перед каждым сбросом текущий пик запоминается во всех замерах, которые идут прямо сейчас (атрибут memory_peak), а в конце замера берется максимум из запомненного и того, что набралось после последнего сброса.
+        """
+        with self.active_lock:
+            current, peak = tracemalloc.get_traced_memory()
+            for profiler in self.active:
+                profiler.memory_peak = max(profiler.memory_peak, peak)
+            self.memory_start = current
+            self.memory_peak = current
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            self.active.add(self)
+
+    def stop_memory_tracing(self):
+        """
+        Окончание замера памяти и запись полей в словарь с данными лога.
+        """
+        with self.active_lock:
+            self.active.discard(self)
+            if not tracemalloc.is_tracing():
+                return
+            current, peak = tracemalloc.get_traced_memory()
+        self.fields['memory_allocated'] = current - self.memory_start
+        self.fields['memory_peak'] = max(self.memory_peak, peak) - self.memory_start
+
+    def wrap(self, coroutine):
+        """
+        Оборачиваем объект корутины, чтобы замерять время каждого отрезка ее исполнения.
+        Для корутин стенное и процессорное время накапливаются по шагам (см. ProfiledCoroutine), а не считаются как разность показаний в начале и в конце вызова.
+        """
+        self.is_coroutine = True
+        return ProfiledCoroutine(coroutine, self)
+
+    def stop(self):
+        """
+        Окончание замера и запись полей в словарь с данными лога.
+        """
+        finish = time.perf_counter_ns()
+        if self.is_coroutine:
+            self.fields['cpu_time'] = self.running_cpu / 1000000000
+            self.fields['running_time'] = self.running / 1000000000
+            self.fields['awaiting_time'] = max(finish - self.start - self.running, 0) / 1000000000
+        else:
+            self.fields['cpu_time'] = (time.thread_time_ns() - self.cpu_start) / 1000000000
+        if self.memory_start is not None:
+            self.stop_memory_tracing()
+
+
+class ProfiledCoroutine:
+    """
+    Обертка над корутиной, которая сама "прокручивает" ее по шагам (так же, как это делает событийный цикл) и замеряет стенное и процессорное время каждого шага.
+
+    Суммарное время шагов - это время, которое корутина реально исполнялась. Все остальное время вызова она ждала завершения того, что было в await.
+    """
+
+    __slots__ = ('coroutine', 'profiler')
+
+    def __init__(self, coroutine, profiler):
+        self.coroutine = coroutine
+        self.profiler = profiler
+
+    def __await__(self):
+        coroutine = self.coroutine
+        profiler = self.profiler
+        value = None
+        error = None
+        while True:
+            step_start = time.perf_counter_ns()
+            cpu_step_start = time.thread_time_ns()
+            try:
+                if error is None:
+                    yielded = coroutine.send(value)
+                else:
+                    yielded = coroutine.throw(error)
+            except StopIteration as e:
+                return e.value
+            finally:
+                profiler.running += time.perf_counter_ns() - step_start
+                profiler.running_cpu += time.thread_time_ns() - cpu_step_start
+                error = None
+            try:
+                value = yield yielded
+            except GeneratorExit:
+                coroutine.close()
+                raise
+            except BaseException as e:
+                value = None
+                error = e
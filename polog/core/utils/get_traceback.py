@@ -1,29 +1,36 @@
 import sys
-import traceback
 
 from polog.core.stores.settings.settings_store import SettingsStore
-from polog.utils.json_vars import json_vars
+from polog.utils.json_vars import json_vars, vars_to_dict
+from polog.core.utils.raw_traceback import RawTraceback
+from polog.core.utils.json_backend import get_json_backend
 
 
 store = SettingsStore()
 
-def get_traceback(cut_string_at_begin=0):
+def get_traceback(cut_string_at_begin=0, serialize=True):
     """
-    Получаем последний фрейм трейсбека в виде списка строк и сразу сериализуем этот список в json.
+    Получаем последний фрейм трейсбека в виде списка строк и сериализуем этот список в json.
+
+    Если serialize=False, возвращается "сырой" трейсбек (см. RawTraceback): строки из него собираются лениво. В таком виде трейсбек хранится внутри объектов лога (см. LogItem).
     """
     try:
-        json = store['json_module']
-        trace = sys.exc_info()[2]
-        trace_list = traceback.format_tb(trace)
-        trace_list = trace_list[cut_string_at_begin:]
-        trace_json = json.dumps(trace_list)
-        return trace_json
+        trace = RawTraceback.from_traceback(sys.exc_info()[2], cut_string_at_begin)
+    except Exception:
+        trace = RawTraceback(())
+    if not serialize:
+        return trace
+    json = get_json_backend(store['json_module'])
+    try:
+        return json.dumps(trace.format())
     except Exception:
         return json.dumps([])
 
-def get_locals_from_traceback():
+def get_locals_from_traceback(serialize=True):
     """
     Забираем из последнего фрейма трейсбека локальные переменные и упаковываем их в json.
+
+    Если serialize=False, возвращается словарь (см. polog.utils.json_vars.vars_to_dict()), а не строка.
     """
     trace = sys.exc_info()[2]
     try:
@@ -31,6 +38,8 @@ def get_locals_from_traceback():
             local_variables = trace.tb_next.tb_frame.f_locals
         except:
             local_variables = trace.tb_frame.f_locals
+        if not serialize:
+            return vars_to_dict(**local_variables)
         local_variables_json = json_vars(**local_variables)
         return local_variables_json
     except Exception as e:
@@ -0,0 +1,71 @@
+import json
+from functools import lru_cache
+
+
+class JSONBackend:
+    """
+    Прослойка совместимости между Polog и модулем, указанным в настройке 'json_module'.
+
+    Внутри Polog JSON используется в двух видах: как строка (например, значения полей лога, доступные через LogItem.get()) и как байты (то, что в итоге пишется в файл). Быстрые сериализаторы ведут себя по-разному: например, orjson.dumps() сразу возвращает байты в UTF-8, а json.dumps() и ujson.dumps() - строку. Чтобы остальному коду не приходилось об этом думать, здесь есть оба варианта сериализации:
+    1. .dumps() - всегда возвращает строку.
+    2. .dumps_bytes() - всегда возвращает байты в кодировке UTF-8. Для сериализаторов, которые сами возвращают байты, лишнего преобразования не происходит, и на всем пути до записи в файл данные так и остаются байтами.
+
+    Сигнатуры функций dumps() у разных библиотек тоже отличаются, поэтому сериализатор вызывается только с одним позиционным аргументом. Кроме того, быстрые сериализаторы часто умеют меньше стандартного модуля: например, orjson не работает с целыми числами длиннее 64 бит. Если сериализатор поднял исключение, объект сериализуется стандартным модулем json, а объекты, которых нет в JSON (где бы они ни были вложены), при этом приводятся к строке через str(). Так лог не теряется из-за одного неудачного значения.
+    """
+
+    __slots__ = ('module', 'loads', 'bytes_native', 'fast_dumps')
+
+    def __init__(self, module):
+        self.module = module
+        self.loads = module.loads
+        self.fast_dumps = module.dumps
+        self.bytes_native = self.is_bytes_native(module)
+
+    @staticmethod
+    def is_bytes_native(module):
+        """
+        Проверяем, возвращает ли функция dumps() модуля байты вместо строки.
+        """
+        try:
+            return isinstance(module.dumps([]), (bytes, bytearray, memoryview))
+        except Exception:
+            return False
+
+    def dumps(self, value):
+        """
+        Сериализуем объект в строку с JSON.
+        """
+        try:
+            result = self.fast_dumps(value)
+        except Exception:
+            return self.fallback_dumps(value)
+        if self.bytes_native:
+            return bytes(result).decode('utf-8')
+        return result
+
+    def dumps_bytes(self, value):
+        """
+        Сериализуем объект в байты с JSON в кодировке UTF-8.
+        """
+        try:
+            result = self.fast_dumps(value)
+        except Exception:
+            return self.fallback_dumps(value).encode('utf-8')
+        if self.bytes_native:
+            return bytes(result)
+        return result.encode('utf-8')
+
+    @staticmethod
+    def fallback_dumps(value):
+        """
+        Сериализация стандартным модулем json, если основной сериализатор не справился. Объекты, которых нет в JSON, приводятся к строке.
+        """
+        return json.dumps(value, default=str)
+
+
+@lru_cache(maxsize=None)
+def get_json_backend(module):
+    """
+    Получаем прослойку (см. JSONBackend) для модуля сериализации. Для каждого модуля она создается только один раз.
+    """
+    return JSONBackend(module)
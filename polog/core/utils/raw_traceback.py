@@ -0,0 +1,92 @@
+import linecache
+from functools import lru_cache
+
+
+class RawTraceback:
+    """
+    "Сырой" трейсбек: последовательность пар (объект кода, номер строки) - от внешнего фрейма к внутреннему.
+
+    Снять такой трейсбек в месте возникновения исключения дешево: это просто проход по цепочке объектов traceback без чтения исходников и сборки строк. Текст трейсбека (как его возвращает traceback.format_tb()) собирается лениво, при первом обращении - как правило, уже в потоке движка, а не в потоке, где произошло исключение.
+    Готовый текст кэшируется (см. extract_frames() и format_frames()) по всей последовательности пар. Поэтому, если одно и то же исключение из одного и того же места логируется много раз подряд (например, при повторных попытках обратиться к недоступному сервису), форматирование стоит одного поиска в словаре.
+    """
+
+    __slots__ = ('frames',)
+
+    def __init__(self, frames):
+        """
+        frames - итерируемый объект с парами (объект кода, номер строки).
+        """
+        self.frames = tuple(frames)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __eq__(self, other):
+        if isinstance(other, RawTraceback):
+            return self.frames == other.frames
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.frames)
+
+    def __repr__(self):
+        return f'RawTraceback({self.format()})'
+
+    @classmethod
+    def from_traceback(cls, traceback_instance, cut_string_at_begin=0):
+        """
+        Снимаем сырой трейсбек с объекта traceback (например, третьего элемента кортежа из sys.exc_info()).
+
+        cut_string_at_begin - сколько внешних фреймов отбросить.
+        """
+        frames = []
+        while traceback_instance is not None:
+            frames.append((traceback_instance.tb_frame.f_code, traceback_instance.tb_lineno))
+            traceback_instance = traceback_instance.tb_next
+        return cls(frames[cut_string_at_begin:])
+
+    @classmethod
+    def from_frames(cls, frames):
+        """
+        Снимаем сырой трейсбек со списка пар (фрейм, номер строки), как их возвращают traceback.walk_stack() и traceback.walk_tb(). Фреймы должны идти от внешнего к внутреннему.
+        """
+        return cls((frame.f_code, lineno) for frame, lineno in frames)
+
+    def extract(self):
+        """
+        Получаем кортеж из четверок (путь к файлу, номер строки, название функции, строка исходного кода) - по одной на каждый фрейм.
+        """
+        return extract_frames(self.frames)
+
+    def format(self):
+        """
+        Получаем список строк - такой же, какой вернула бы функция traceback.format_tb() (за исключением подсветки позиции в строке символами '^').
+        """
+        return list(format_frames(self.frames))
+
+
+@lru_cache(maxsize=1024)
+def extract_frames(frames):
+    """
+    Для каждой пары (объект кода, номер строки) достаем строку исходного кода через linecache.
+    """
+    result = []
+    for code, lineno in frames:
+        filename = code.co_filename
+        linecache.checkcache(filename)
+        line = linecache.getline(filename, lineno).strip() if lineno is not None else ''
+        result.append((filename, lineno, code.co_name, line))
+    return tuple(result)
+
+@lru_cache(maxsize=1024)
+def format_frames(frames):
+    """
+    Собираем строки трейсбека в формате traceback.format_tb().
+    """
+    result = []
+    for filename, lineno, name, line in extract_frames(frames):
+        item = f'  File "{filename}", line {lineno}, in {name}\n'
+        if line:
+            item += f'    {line}\n'
+        result.append(item)
+    return tuple(result)
@@ -0,0 +1,12 @@
+from datetime import datetime
+
+
+def timestamp_to_datetime(value):
+    """
+    Преобразуем метку времени (число секунд с начала эпохи, как его возвращает time.time()) в объект datetime.
+
+    Если передано что-то другое (например, пользователь сам передал в ручной логгер готовый объект datetime), значение возвращается как есть.
+    """
+    if (isinstance(value, float) or isinstance(value, int)) and not isinstance(value, bool):
+        return datetime.fromtimestamp(value)
+    return value
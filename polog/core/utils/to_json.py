@@ -0,0 +1,17 @@
+from polog.core.utils.raw_traceback import RawTraceback
+from polog.core.utils.json_backend import get_json_backend
+
+
+def to_json(value):
+    """
+    Сериализуем в JSON значение поля лога, которое хранится внутри лога в виде структуры (словаря или списка), например переменные функции или трейсбек.
+
+    Строки возвращаются как есть: это либо уже готовый JSON, либо произвольный текст, переданный пользователем в ручной логгер.
+    "Сырой" трейсбек (см. RawTraceback) сначала превращается в список строк.
+    """
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, RawTraceback):
+        value = value.format()
+    from polog.core.stores.settings.settings_store import SettingsStore
+    return get_json_backend(SettingsStore()['json_module']).dumps(value)
@@ -0,0 +1,169 @@
+import sys
+import time
+import traceback
+from itertools import count
+from threading import Lock, Thread, Event, get_ident
+
+from polog.core.stores.settings.settings_store import SettingsStore
+from polog.core.engine.engine import Engine
+from polog.core.log_item import LogItem
+from polog.core.utils.read_only_singleton import ReadOnlySingleton
+from polog.core.utils.exception_escaping import exception_escaping
+from polog.core.utils.get_errors_level import get_errors_level
+from polog.core.utils.raw_traceback import RawTraceback
+
+
+class InFlightCall:
+    """
+    Запись о вызове задекорированной функции, который еще не завершился.
+    """
+
+    __slots__ = ('args_dict', 'thread_id', 'coroutine', 'start', 'deadline', 'stuck_after', 'errors_level', 'level', 'handlers', 'in_place_fields', 'engine_fields')
+
+    def __init__(self, args_dict, thread_id, coroutine, stuck_after, errors_level, level, handlers, in_place_fields, engine_fields):
+        self.args_dict = args_dict
+        self.thread_id = thread_id
+        self.coroutine = coroutine
+        self.start = time.perf_counter()
+        self.stuck_after = stuck_after
+        self.deadline = self.start + stuck_after
+        self.errors_level = errors_level
+        self.level = level
+        self.handlers = handlers
+        self.in_place_fields = in_place_fields
+        self.engine_fields = engine_fields
+
+
+class Watchdog(ReadOnlySingleton):
+    """
+    Сторож, следящий за "зависшими" вызовами задекорированных функций.
+
+    Обертки декоратора регистрируют здесь каждый вызов, для которого задан порог stuck_after, и снимают регистрацию по его завершении. И то и другое - одна операция со словарем.
+    Фоновый поток периодически (раз в CHECK_INTERVAL секунд) просматривает незавершенные вызовы. Если какой-то из них длится дольше порога, снимается "снимок" его стека и в движок отправляется лог с этим стеком (в поле 'traceback', в том же формате, что и для исключений) и временем, прошедшим с начала вызова (в поле 'time_of_work'). Для каждого вызова такой лог пишется не более одного раза.
+
+    Для обычных функций стек берется у потока, в котором идет вызов (через sys._current_frames()). Для корутин стек потока бесполезен - там будет событийный цикл, поэтому стек собирается по цепочке корутин, ожидающих друг друга через await.
+    """
+
+    CHECK_INTERVAL = 0.05
+
+    lock = Lock()
+
+    def __init__(self):
+        with self.lock:
+            if not hasattr(self, 'inited'):
+                self.settings = SettingsStore()
+                self.engine = Engine()
+                self.calls = {}
+                self.reported = set()
+                self.counter = count()
+                self.started = False
+                self.stop_event = Event()
+                self.inited = True
+
+    def register(self, args_dict, stuck_after, errors_level, level, handlers, in_place_fields, engine_fields, coroutine=None, thread_id=None):
+        """
+        Регистрация начавшегося вызова. Возвращается токен, который нужно передать в .unregister() по завершении вызова.
+
+        coroutine - объект корутины, если задекорирована корутинная функция.
+        thread_id - идентификатор потока (см. threading.get_ident()), в котором идет вызов. По умолчанию - текущий поток.
+        """
+        if not self.started:
+            self.start()
+        token = next(self.counter)
+        if thread_id is None:
+            thread_id = get_ident()
+        self.calls[token] = InFlightCall(args_dict, thread_id, coroutine, stuck_after, errors_level, level, handlers, in_place_fields, engine_fields)
+        return token
+
+    def unregister(self, token):
+        """
+        Снятие регистрации завершившегося вызова.
+        """
+        self.calls.pop(token, None)
+
+    def start(self):
+        """
+        Ленивый запуск фонового потока.
+        """
+        with self.lock:
+            if self.started:
+                return
+            self.thread = Thread(target=self.run)
+            self.thread.daemon = True
+            self.thread.start()
+            self.started = True
+
+    def run(self):
+        """
+        Цикл фонового потока.
+        """
+        while not self.stop_event.wait(self.CHECK_INTERVAL):
+            self.check()
+
+    @exception_escaping
+    def check(self):
+        """
+        Однократный просмотр незавершенных вызовов и запись логов о тех, что длятся дольше порога.
+        """
+        now = time.perf_counter()
+        overdue = [(token, call) for token, call in self.calls.copy().items() if call.deadline <= now and token not in self.reported]
+        if not overdue:
+            self.reported.intersection_update(self.calls)
+            return
+        frames = sys._current_frames()
+        for token, call in overdue:
+            if token not in self.calls:
+                continue
+            self.reported.add(token)
+            stack = self.get_stack(call, frames)
+            self.write_log(call, stack, now - call.start)
+        self.reported.intersection_update(self.calls)
+
+    def get_stack(self, call, frames):
+        """
+        Получаем стек вызова в виде "сырого" трейсбека (см. RawTraceback). Строки из него собираются лениво, в том же формате, что возвращает traceback.format_stack().
+        """
+        if call.coroutine is not None:
+            return RawTraceback.from_frames(self.walk_coroutine(call.coroutine))
+        frame = frames.get(call.thread_id)
+        if frame is None:
+            return RawTraceback(())
+        return RawTraceback.from_frames(reversed(list(traceback.walk_stack(frame))))
+
+    @staticmethod
+    def walk_coroutine(coroutine):
+        """
+        Проходим по цепочке корутин, ожидающих друг друга через await, и возвращаем пары (фрейм, номер строки) - от внешней корутины к самой внутренней.
+        """
+        while coroutine is not None:
+            frame = getattr(coroutine, 'cr_frame', None) or getattr(coroutine, 'gi_frame', None)
+            if frame is None:
+                break
+            yield frame, frame.f_lineno
+            coroutine = getattr(coroutine, 'cr_await', None) or getattr(coroutine, 'gi_yieldfrom', None)
+
+    def write_log(self, call, stack, elapsed):
+        """
+        Отправка в движок лога о зависшем вызове.
+        """
+        level = get_errors_level(call.errors_level, call.level)
+        if level < self.settings['level']:
+            return
+
+        data = {name: call.args_dict[name] for name in ('module', 'class', 'function', 'message') if name in call.args_dict}
+        data['auto'] = True
+        data['stuck'] = True
+        data['time'] = time.time()
+        data['level'] = level
+        data['time_of_work'] = elapsed
+        data['traceback'] = stack
+        service_name = self.settings['service_name']
+        if service_name is not None:
+            data['service_name'] = service_name
+
+        log = LogItem()
+        log.set_data(data)
+        log.set_handlers(call.handlers)
+        log.set_extra_fields(call.engine_fields)
+        log.extract_extra_fields_from(call.in_place_fields)
+        self.engine.write(log)
@@ -36,6 +36,7 @@ class BaseFormatter:
         """
         self.FIELD_HANDLERS = self.get_base_field_handlers()
         self.ALIGN_NORMS = self.get_align_norms()
+        self.CACHE_KEY = self.get_cache_key()
 
     def get_formatted_string(self, log):
         """
@@ -43,15 +44,25 @@ class BaseFormatter:
         Здесь происходит вызов вторичной инициализации объекта, после чего происходит запись лога и метод становится не нужным.
         """
         self.__init_on_run__()
-        result = self._get_formatted_string(log)
-        self.get_formatted_string = self._get_formatted_string
-        return result
+        self.get_formatted_string = self._get_cached_formatted_string
+        return self.get_formatted_string(log)
 
-    def _get_formatted_string(self, log):
+    def _get_cached_formatted_string(self, log):
         """
         Начиная со второго вызова метода get_formatted_string(), будет сразу вызван данный метод, т. к. он заменит собою get_formatted_string().
 
-        Форматирование лога происходит в 3 этапа:
+        Один и тот же лог часто уходит в несколько обработчиков с одинаково настроенными форматтерами (например, в консоль и в пару файлов). Чтобы не форматировать его несколько раз, готовая строка сохраняется в самом логе (см. LogItem.get_rendered()) под ключом, описывающим настройки форматтера (см. .get_cache_key()). Все форматтеры с теми же настройками возьмут уже готовую строку.
+        Если вместо объекта лога передан обычный словарь, кэширование не используется.
+        """
+        try:
+            get_rendered = log.get_rendered
+        except AttributeError:
+            return self._get_formatted_string(log)
+        return get_rendered(self.CACHE_KEY, self._get_formatted_string)
+
+    def _get_formatted_string(self, log):
+        """
+        Непосредственное форматирование лога, без кэширования. Происходит в 3 этапа:
 
         1. Формирование словаря с подстроками.
         2. Форматирование подстрок по ширине.
@@ -84,6 +95,14 @@ class BaseFormatter:
         }
         return result
 
+    def get_cache_key(self):
+        """
+        Часть второго этапа инициализации. Получаем ключ, под которым отформатированная строка кэшируется в объекте лога.
+
+        Ключ описывает все, от чего зависит результат форматирования: класс форматтера, разделитель, обработчики полей и правила выравнивания. У двух форматтеров с одинаковыми настройками ключи совпадают.
+        """
+        return (type(self), self.separator, tuple(self.FIELD_HANDLERS.items()), tuple(self.ALIGN_NORMS.items()))
+
     def get_align_norms(self):
         """
         Часть второго этапа инициализации. Возвращаем словарь с правилами выравнивания для отдельных полей.
@@ -129,9 +148,10 @@ class BaseFormatter:
         """
         Добавляем в словарь с данными поля, отсутствующие в self.FIELD_HANDLERS.
         """
-        for field_name, value in log.items():
+        for field_name in log:
             if field_name not in base:
                 if field_name not in self.FORBIDDEN_EXTRA_FIELDS:
+                    value = log[field_name]
                     if value is not None:
                         if isinstance(value, str):
                             base[field_name] = f'{field_name}: "{value}"'
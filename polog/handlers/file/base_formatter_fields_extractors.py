@@ -1,8 +1,10 @@
 import inspect
 import importlib
+from datetime import datetime
 
 from polog.core.stores.levels import Levels
 from polog.core.stores.settings.settings_store import SettingsStore
+from polog.core.utils.raw_traceback import RawTraceback
 
 
 class BaseFormatterFieldsExtractors:
@@ -14,27 +16,58 @@ class BaseFormatterFieldsExtractors:
 
     settings = SettingsStore()
 
-    @staticmethod
-    def time(log):
+    # Кэш для поля time: кортеж (целое число секунд с начала эпохи, строка с датой и временем с точностью до секунды).
+    time_cache = (None, None)
+    # Кэш для поля level: кортеж (версия соответствий уровней и их названий (см. Levels.version), копия словаря с названиями уровней).
+    level_names_cache = (None, {})
+    # Кэш для поля function: ключи - кортежи (название сервиса, модуль, класс, функция), значения - готовые строки.
+    locations_cache = {}
+    # Ограничение на размер кэша мест в коде. В ручные логи можно передать произвольные строки, поэтому кэш не должен расти бесконечно.
+    MAX_LOCATIONS_CACHE_SIZE = 10000
+
+    @classmethod
+    def time(cls, log):
         """
         Выводим дату и время в квадратных скобках.
+
+        Внутри лога время хранится как число секунд с начала эпохи (см. LogItem.get_raw()). При большом потоке логов подряд идет много логов с одной и той же секундой, поэтому строка с датой и временем до секунд кэшируется, а для каждого лога к ней только дописывается дробная часть. Результат такой же, как у str(datetime).
         """
-        time = log.get("time")
+        time = cls.get_raw(log, 'time')
         if time is None:
             return '[----time not specified----]'
+        if (isinstance(time, float) or isinstance(time, int)) and not isinstance(time, bool) and time >= 0:
+            second = int(time)
+            microsecond = round((time - second) * 1000000)
+            if microsecond < 1000000:
+                cached_second, prefix = cls.time_cache
+                if cached_second != second:
+                    prefix = str(datetime.fromtimestamp(second))
+                    cls.time_cache = (second, prefix)
+                if microsecond:
+                    return f'[{prefix}.{microsecond:06d}]'
+                return f'[{prefix}]'
+            time = datetime.fromtimestamp(time)
         return f'[{time}]'
 
-    @staticmethod
-    def level(log):
+    @classmethod
+    def level(cls, log):
         """
         Выводим уровень лога. Если присвоено название - выводим его, иначе число.
 
         Важно: если одному уровню логирования присвоено несколько имен, выводится последнее из них.
+
+        Названия уровней берутся из копии словаря соответствий, которая обновляется, только когда соответствия меняются (см. Levels.version).
         """
         level = log.get('level')
         if level is None:
             return 'UNKNOWN'
-        result = Levels.get_level_name(level)
+        version, names = cls.level_names_cache
+        if version != Levels.version:
+            names = dict(Levels.levels_reverse)
+            cls.level_names_cache = (Levels.version, names)
+        result = names.get(level)
+        if result is None:
+            result = str(level)
         return result
 
     @staticmethod
@@ -82,12 +115,32 @@ class BaseFormatterFieldsExtractors:
 
         Ручные логи, где не указывалось место действия, будут отображены в усеченном виде, например:
         "where: service_name.?"
+
+        Мест в коде, откуда пишутся логи, обычно немного, поэтому готовые строки кэшируются по набору из 4-х полей.
         """
         function_name = log.get('function')
         class_name = log.get('class')
         module_name = log.get('module')
-        service_name = SettingsStore()['service_name']
+        service_name = cls.settings['service_name']
 
+        key = (service_name, module_name, class_name, function_name)
+        try:
+            return cls.locations_cache[key]
+        except KeyError:
+            pass
+        except TypeError:
+            return cls.get_location(service_name, module_name, class_name, function_name)
+        result = cls.get_location(service_name, module_name, class_name, function_name)
+        if len(cls.locations_cache) >= cls.MAX_LOCATIONS_CACHE_SIZE:
+            cls.locations_cache = {}
+        cls.locations_cache[key] = result
+        return result
+
+    @staticmethod
+    def get_location(service_name, module_name, class_name, function_name):
+        """
+        Собираем строку с местом в коде для поля function (без кэширования).
+        """
         if function_name is not None:
             result = '.'.join([x for x in (service_name, module_name, class_name, function_name) if x is not None])
             return f'where: {result}()'
@@ -97,21 +150,41 @@ class BaseFormatterFieldsExtractors:
             return f'where: {result}.?'
         return 'where: ?'
 
+    @staticmethod
+    def get_raw(log, field_name):
+        """
+        Получаем "сырое" значение поля лога, без ленивой сериализации (см. LogItem.get_raw()). Вместо лога может быть передан обычный словарь.
+        """
+        try:
+            return log.get_raw(field_name)
+        except AttributeError:
+            return log.get(field_name)
+
+    @classmethod
+    def load(cls, value):
+        """
+        Получаем структуру из "сырого" значения поля лога (см. LogItem.get_raw()).
+
+        Поля с переменными и трейсбеком хранятся в логе в виде уже готовых структур, и тогда они возвращаются как есть, без сериализации в JSON и обратного разбора. Если же в поле лежит строка (например, JSON, переданный пользователем в ручной логгер), она разбирается как JSON.
+        """
+        if isinstance(value, str):
+            return cls.settings['json_module'].loads(value)
+        return value
+
     @classmethod
     def result(cls, log):
         """
         Возвращается строка с возвращаемым значением функции в человекочитаемом виде.
-        Ожидается, что исходное значение - строка с JSON-объектом, у которого 2 ключа: 'type' и 'value'.
+        Ожидается, что исходное значение - словарь (или строка с JSON-объектом), у которого 2 ключа: 'type' и 'value'.
 
         Пример результата:
         'result: 1 (int), "hello" (str), <AnotherClass object> (AnotherClass)'
         """
-        json = cls.settings['json_module']
         if 'result' in log:
-            variables = log.get('result')
-            if isinstance(variables, str):
+            variables = cls.get_raw(log, 'result')
+            if isinstance(variables, (str, dict)):
                 try:
-                    variables = json.loads(variables)
+                    variables = cls.load(variables)
                     variables = cls.json_variable_to_human_readable_text(variables)
                     return  f"result: {variables}"
                 except ValueError:
@@ -133,10 +206,17 @@ class BaseFormatterFieldsExtractors:
 
         Значения строковых пременных дополнительно оборачиваются в двойные кавычки:
         {'value': 'hello', 'type': 'str'} -> '"hello" (str)'
+
+        Если значение было обрезано при сериализации (см. polog.utils.json_vars), это тоже отражается:
+        {'value': 'hel', 'type': 'str', 'truncated': True, 'length': 5} -> '"hel..." (str, truncated, 5 chars)'
         """
         value = json_dict.get('value')
         _type = json_dict.get('type')
+        if json_dict.get('truncated'):
+            value = f'{value}...'
         value = f'"{value}"' if _type == 'str' else value
+        if json_dict.get('truncated'):
+            _type = f"{_type}, truncated, {json_dict.get('length')} chars"
         result = f'{value} ({_type})'
         return result
 
@@ -145,7 +225,7 @@ class BaseFormatterFieldsExtractors:
         """
         Преобразуем перечисление аргументов функции из формата JSON в человекочитаемый вид.
 
-        На вход получаем строку с документом в формате JSON следующей структуры:
+        На вход получаем словарь (или строку с документом в формате JSON) следующей структуры:
         {'args': [{'value': 1, 'type': 'int'}, ...], 'kwargs': {'var_name_1': {'value': 3, 'type': 'int'}, ...}}
 
         На выходе будет строка вида:
@@ -153,15 +233,15 @@ class BaseFormatterFieldsExtractors:
 
         Допускается отсутствие блоков 'args' или 'kwargs' в исходном JSON-документе.
         """
-        json = cls.settings['json_module']
         if json_text is None:
             return None
         if not json_text:
             return None
-        json_dict = json.loads(json_text)
+        json_dict = cls.load(json_text)
         args = json_dict.get('args')
         kwargs = json_dict.get('kwargs')
-        if args is None and kwargs is None:
+        omitted = json_dict.get('omitted_args', 0) + json_dict.get('omitted_kwargs', 0)
+        if args is None and kwargs is None and not omitted:
             return None
         result = []
         if args is not None:
@@ -170,6 +250,8 @@ class BaseFormatterFieldsExtractors:
         if kwargs is not None:
             kwargs = ', '.join([f'{x} = {cls.json_variable_to_human_readable_text(y)}' for x, y in kwargs.items()])
             result.append(kwargs)
+        if omitted:
+            result.append(f'... ({omitted} more omitted)')
         result = ', '.join(result)
         return result
 
@@ -178,7 +260,7 @@ class BaseFormatterFieldsExtractors:
         """
         Преобразуем в человекочитаемый вид строку JSON с аргументами функции.
         """
-        variables = log.get('input_variables')
+        variables = cls.get_raw(log, 'input_variables')
         result = cls.json_variables_to_text(variables)
         if result is None:
             return result
@@ -192,7 +274,7 @@ class BaseFormatterFieldsExtractors:
 
         Возможен пользовательский ввод! Соблюдение ожидаемого формата документа JSON гарантируется только в случае автоматических логов.
         """
-        variables = log.get('local_variables')
+        variables = cls.get_raw(log, 'local_variables')
         if variables is None:
             return None
         try:
@@ -233,24 +315,28 @@ class BaseFormatterFieldsExtractors:
     @classmethod
     def traceback(cls, log):
         """
-        Преобразуем трейсбек, строки которого записаны в JSON-список, в человекочитаемый вид.
+        Преобразуем трейсбек, записанный списком строк (или JSON-список), в человекочитаемый вид.
+
+        "Сырой" трейсбек (см. RawTraceback) выводится напрямую из закэшированного разбора фреймов, без сборки строк в формате traceback.format_tb() и их обратного разбора.
         """
-        json = cls.settings['json_module']
-        traceback = log.get('traceback')
+        traceback = cls.get_raw(log, 'traceback')
         if traceback is not None:
             if not traceback:
                 return 'no traceback'
-            traceback = json.loads(traceback)
-            if not traceback:
+            if isinstance(traceback, RawTraceback):
+                result = [f'{line} ("{path}", line {line_num}, in {where})' for path, line_num, where, line in traceback.extract()]
+            else:
+                traceback = cls.load(traceback)
+                result = []
+                for line in traceback:
+                    splitted_line = line.split()
+                    path = splitted_line[1]
+                    line_num = splitted_line[3]
+                    where = splitted_line[5]
+                    message = ' '.join(splitted_line[6:])
+                    result.append(f'{message} ({path} line {line_num} in {where})')
+            if not result:
                 return 'no traceback'
-            result = []
-            for line in traceback:
-                splitted_line = line.split()
-                path = splitted_line[1]
-                line_num = splitted_line[3]
-                where = splitted_line[5]
-                message = ' '.join(splitted_line[6:])
-                result.append(f'{message} ({path} line {line_num} in {where})')
             full_traceback = '; '.join(result)
             full_traceback = f'traceback: {full_traceback}'
             return full_traceback
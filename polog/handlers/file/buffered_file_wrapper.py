@@ -0,0 +1,198 @@
+import time
+import atexit
+import weakref
+from functools import partial
+from threading import Lock, Thread, Event
+
+from polog.core.engine.engine import Engine
+from polog.core.utils.exception_escaping import exception_escaping
+
+
+class BufferedFileWrapper:
+    """
+    Обертка над FileDependencyWrapper, которая копит записываемые логи в памяти и сбрасывает их в файл пачками ("групповая запись").
+
+    Без буферизации файловый обработчик после каждой строки вызывает flush() под блокировкой (см. FileDependencyWrapper.flush()). Если же просто отключить принудительный сброс буфера, неизвестно, когда логи фактически окажутся в файле. Здесь сброс происходит по двум условиям, в зависимости от того, что наступит раньше:
+    1. В буфере накопилось не меньше buffer_size байт. Тогда сброс происходит сразу, в потоке, который записывает лог.
+    2. С последнего сброса прошло flush_interval секунд. Это проверяет фоновый поток, чтобы логи не "застревали" в памяти, когда их мало.
+
+    Кроме того, после каждого сброса можно вызывать os.fsync(), чтобы данные гарантированно дошли до диска, а не остались в кэше ОС. Это управляется параметром fsync:
+    1. 'never' - никогда (по умолчанию).
+    2. 'flush' - после каждого сброса.
+    3. Число - не чаще, чем раз в указанное количество секунд.
+
+    Перед остановкой движка (см. Engine.add_stop_callback()) и при завершении программы буфер сбрасывается.
+    Все прочие атрибуты и методы проксируются к исходной обертке. Перед ротацией (см. .move_file()) буфер тоже сбрасывается, чтобы накопленные логи попали в старый файл, а не в новый.
+    """
+
+    FSYNC_POLICIES = ('never', 'flush')
+    # Максимальный размер одной записи в режиме атомарной дозаписи (см. FileDependencyWrapper.write_atomic()).
+    ATOMIC_BATCH_LIMIT = 1024 * 1024
+
+    def __init__(self, file, buffer_size, flush_interval, fsync='never'):
+        """
+        file - объект FileDependencyWrapper (или с аналогичным интерфейсом).
+        buffer_size (int) - сколько байт нужно накопить, чтобы буфер был сброшен немедленно.
+        flush_interval (int или float) - максимальное время в секундах, которое лог может провести в буфере.
+        fsync ('never', 'flush', int или float) - политика вызова os.fsync(), см. описание класса.
+        """
+        self.wrapped_file = file
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.fsync_policy = fsync
+        self.buffer = []
+        self.buffered_size = 0
+        self.last_fsync = time.monotonic()
+        self.buffer_lock = Lock()
+        self.stop_event = Event()
+        self.flusher = None
+
+        reference = weakref.ref(self)
+        self.stop_callback = partial(self.flush_by_reference, reference)
+        Engine().add_stop_callback(self.stop_callback)
+        atexit.register(self.stop_callback)
+
+    def __getattr__(self, name):
+        """
+        Все, что не переопределено здесь, берем у исходной обертки.
+        """
+        return getattr(self.wrapped_file, name)
+
+    def write(self, log_string):
+        """
+        Добавляем лог в буфер. Если буфер переполнился, сбрасываем его.
+
+        Строки для файлов, открытых в бинарном режиме, кодируются в UTF-8 сразу, так что размер буфера считается в байтах.
+        """
+        if getattr(self.wrapped_file, 'binary', False):
+            if isinstance(log_string, str):
+                log_string = log_string.encode('utf-8')
+        elif not isinstance(log_string, str):
+            log_string = bytes(log_string).decode('utf-8')
+        with self.buffer_lock:
+            self.buffer.append(log_string)
+            self.buffered_size += len(log_string)
+            if self.buffered_size >= self.buffer_size:
+                self.drain()
+        if self.flusher is None:
+            self.start_flusher()
+
+    def flush(self):
+        """
+        Сброс буфера в файл.
+        """
+        with self.buffer_lock:
+            self.drain()
+
+    def drain(self):
+        """
+        Записываем в файл все, что накопилось в буфере. Если обертка файла умеет записывать список логов без склеивания (например, см. CompressedFileWrapper.write_lines()), буфер передается ей как есть, иначе логи склеиваются и записываются одним вызовом .write(). В режиме атомарной дозаписи буфер может быть разбит на несколько пачек (см. .get_batches()). Вызывать только под блокировкой буфера.
+        """
+        if self.buffer:
+            buffer = self.buffer
+            self.buffer = []
+            self.buffered_size = 0
+            write_lines = getattr(self.wrapped_file, 'write_lines', None)
+            for batch in self.get_batches(buffer):
+                if write_lines is not None:
+                    write_lines(batch)
+                else:
+                    self.wrapped_file.write(batch[0][:0].join(batch))
+            self.wrapped_file.flush()
+            if self.fsync_policy == 'flush':
+                self.fsync()
+        if self.fsync_policy not in self.FSYNC_POLICIES and time.monotonic() - self.last_fsync >= self.fsync_policy:
+            self.fsync()
+
+    def get_batches(self, buffer):
+        """
+        Делим накопленные логи на пачки для записи.
+
+        Обычно пачка одна - весь буфер. Но в режиме атомарной дозаписи размер одной записи ограничен ATOMIC_BATCH_LIMIT байтами, чтобы каждая пачка записывалась одним системным вызовом, который ОС выполнит целиком. Отдельные логи при этом никогда не разрываются: лог, который сам по себе больше лимита, образует отдельную пачку.
+        """
+        if not getattr(self.wrapped_file, 'atomic_append', False):
+            return [buffer]
+        result = []
+        batch = []
+        batch_size = 0
+        for item in buffer:
+            if batch and batch_size + len(item) > self.ATOMIC_BATCH_LIMIT:
+                result.append(batch)
+                batch = []
+                batch_size = 0
+            batch.append(item)
+            batch_size += len(item)
+        result.append(batch)
+        return result
+
+    @exception_escaping
+    def fsync(self):
+        """
+        Просим ОС записать данные файла на диск.
+        """
+        self.last_fsync = time.monotonic()
+        self.wrapped_file.fsync()
+
+    def get_size(self):
+        """
+        Размер файла с учетом того, что еще лежит в буфере.
+
+        Если логи сжимаются по мере записи (см. CompressedFileWrapper), содержимое буфера не учитывается: по его размеру нельзя сказать, сколько места он займет в файле после сжатия.
+        """
+        if getattr(self.wrapped_file, 'compressed', False):
+            return self.wrapped_file.get_size()
+        return self.wrapped_file.get_size() + self.buffered_size
+
+    def move_file(self, path_to_copy):
+        """
+        Перед перемещением файла (т. е. ротацией) сбрасываем в него буфер.
+        """
+        with self.buffer_lock:
+            self.drain()
+            return self.wrapped_file.move_file(path_to_copy)
+
+    def close(self):
+        """
+        Сбрасываем буфер, останавливаем фоновый поток и закрываем файл.
+
+        Функции сброса буфера, зарегистрированные в движке и в модуле atexit, после этого больше не нужны и убираются, чтобы не копиться, когда обертки создаются и закрываются много раз (например, в обработчике с маршрутизацией, см. routing_file_writer).
+        """
+        self.stop_event.set()
+        Engine().remove_stop_callback(self.stop_callback)
+        atexit.unregister(self.stop_callback)
+        self.flush()
+        self.wrapped_file.close()
+
+    def start_flusher(self):
+        """
+        Ленивый запуск фонового потока, сбрасывающего буфер по таймеру.
+        """
+        with self.buffer_lock:
+            if self.flusher is not None:
+                return
+            self.flusher = Thread(target=self.run_flusher, args=(weakref.ref(self), self.stop_event, self.flush_interval))
+            self.flusher.daemon = True
+            self.flusher.start()
+
+    @staticmethod
+    def run_flusher(reference, stop_event, interval):
+        """
+        Цикл фонового потока.
+
+        Поток держит только слабую ссылку на обертку, чтобы не мешать сборщику мусора ее удалить. Когда это произойдет, поток завершится.
+        """
+        while not stop_event.wait(interval):
+            wrapper = reference()
+            if wrapper is None:
+                return
+            exception_escaping(wrapper.flush)()
+            del wrapper
+
+    @staticmethod
+    def flush_by_reference(reference):
+        """
+        Сброс буфера по слабой ссылке на обертку. Используется в коллбеках движка и модуля atexit.
+        """
+        wrapper = reference()
+        if wrapper is not None:
+            exception_escaping(wrapper.flush)()
@@ -0,0 +1,98 @@
+import gzip
+import lzma
+from threading import Lock
+from functools import partial
+
+
+class CompressedFileWrapper:
+    """
+    Обертка над FileDependencyWrapper, которая сжимает логи по мере записи (см. аргумент stream_compression у file_writer).
+
+    Записываемые логи копятся в памяти, а при каждом сбросе (см. .flush()) сжимаются и записываются в файл одним куском - законченным сжатым потоком (для gzip - "членом" (member), для lzma - потоком формата xz). Форматы gzip и xz допускают склейку нескольких таких потоков в одном файле: любые программы для чтения (zcat, xzcat, модули gzip и lzma) читают ее как один поток. Каждый сброс - это "точка синхронизации": все, что было записано до нее, можно прочитать, даже если программа после этого упала. Продолжать запись в такой файл после перезапуска тоже можно - новые потоки просто дописываются в конец.
+
+    Точки синхронизации не сделаны через режим Z_SYNC_FLUSH библиотеки zlib, хотя он и сохранял бы словарь сжатия между ними. Во-первых, у модуля lzma такого режима нет. Во-вторых, незаконченный поток, оставшийся в файле после падения программы, модуль gzip читать отказывается, а дописать в такой файл что-то еще после перезапуска уже нельзя. Потеря в степени сжатия при этом невелика, если между сбросами накапливаются хотя бы десятки килобайт логов: окно сжатия у gzip и так всего 32 килобайта.
+
+    Сжатие бесполезно, если сбрасывать данные после каждой строки, поэтому файловый обработчик в этом режиме всегда включает буферизацию (см. BufferedFileWrapper): точки синхронизации ставятся при каждом сбросе буфера.
+    Размер файла (см. .get_size()) - это размер уже сжатых данных, так что правила ротации по размеру учитывают именно место на диске.
+    Все прочие атрибуты и методы проксируются к исходной обертке.
+    """
+
+    # Название метода сжатия: (функция, которая сжимает байты в законченный поток, расширение сжатого файла).
+    METHODS = {
+        'gzip': (partial(gzip.compress, compresslevel=6, mtime=0), '.gz'),
+        'lzma': (partial(lzma.compress, format=lzma.FORMAT_XZ, preset=1), '.xz'),
+    }
+    # Размер буфера в байтах, если пользователь не указал свой (см. file_writer).
+    DEFAULT_BUFFER_SIZE = 256 * 1024
+    # Признак, по которому BufferedFileWrapper понимает, что данные в файле сжаты (см. BufferedFileWrapper.get_size()).
+    compressed = True
+
+    def __init__(self, file, method):
+        """
+        file - объект FileDependencyWrapper (или с аналогичным интерфейсом). Файл должен быть открыт в бинарном режиме.
+        method - название метода сжатия, один из ключей словаря METHODS.
+        """
+        if method not in self.METHODS:
+            raise ValueError(f'Unknown stream compression method "{method}". Available methods: {", ".join(self.METHODS)}.')
+        if not getattr(file, 'binary', False):
+            raise ValueError('Compressed logs can only be written to a file opened in binary mode. Pass the path to the file.')
+        self.wrapped_file = file
+        self.method = method
+        self.compress, self.extension = self.METHODS[method]
+        self.pending = []
+        self.pending_lock = Lock()
+
+    def __getattr__(self, name):
+        """
+        Все, что не переопределено здесь, берем у исходной обертки.
+        """
+        return getattr(self.wrapped_file, name)
+
+    def write(self, log_string):
+        """
+        Откладываем лог до ближайшей точки синхронизации.
+        """
+        if isinstance(log_string, str):
+            log_string = log_string.encode('utf-8')
+        with self.pending_lock:
+            self.pending.append(log_string)
+
+    def write_lines(self, lines):
+        """
+        Откладываем сразу несколько логов (см. BufferedFileWrapper).
+        """
+        lines = [x.encode('utf-8') if isinstance(x, str) else x for x in lines]
+        with self.pending_lock:
+            self.pending.extend(lines)
+
+    def flush(self):
+        """
+        Точка синхронизации: сжимаем все отложенные логи в законченный поток и записываем его в файл одним вызовом.
+        """
+        with self.pending_lock:
+            if not self.pending:
+                return
+            data = b''.join(self.pending)
+            self.pending = []
+            self.wrapped_file.write(self.compress(data))
+            self.wrapped_file.flush()
+
+    def get_size(self):
+        """
+        Размер уже сжатых данных в файле. Логи, которые еще не сжаты, не учитываются.
+        """
+        return self.wrapped_file.get_size()
+
+    def move_file(self, path_to_copy):
+        """
+        Перед ротацией записываем все отложенное в старый файл.
+        """
+        self.flush()
+        return self.wrapped_file.move_file(path_to_copy)
+
+    def close(self):
+        """
+        Записываем все отложенное и закрываем файл.
+        """
+        self.flush()
+        self.wrapped_file.close()
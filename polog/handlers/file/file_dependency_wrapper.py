@@ -1,5 +1,7 @@
 import os
 import sys
+import time
+import errno
 import shutil
 import pathlib
 
@@ -9,9 +11,21 @@ from polog.handlers.file.locks.double_lock import DoubleLock
 class FileDependencyWrapper:
     """
     Обертка для системных функций по работе с файлами.
+
+    Размер файла (см. .get_size()) нужен правилам ротации и запрашивается перед записью каждого лога. Чтобы не делать на каждую запись системный вызов os.stat(), обертка сама считает записанные байты. Со значением из файловой системы счетчик сверяется только время от времени:
+    1. При открытии / переоткрытии файла (в т. ч. после ротации).
+    2. Каждые SIZE_SYNC_WRITES записей. Это страховка на случай, если файл изменил кто-то еще (например, обрезал его).
+    3. Если включена файловая блокировка (т. е. предполагается, что в файл пишут несколько процессов) - еще и не реже, чем раз в SIZE_SYNC_INTERVAL секунд. Записи других процессов счетчик не видит, поэтому размер в этом случае может "отставать" от реального, но не больше, чем на объем, записанный за этот интервал.
+
+    Если включен режим атомарной дозаписи (atomic_append=True), файл открывается без буферизации на стороне Python, с флагом O_APPEND, и каждая запись - это ровно один системный вызов write(), без каких-либо блокировок (см. .write_atomic()). Блокировки в этом режиме используются только при ротации.
+
+    При каждой такой сверке проверяется также, что по пути к файлу лежит все тот же файл (с тем же номером inode), который у нас открыт. Если это не так - значит, файл ротировал другой процесс (см. .move_file()), и его нужно переоткрыть. Если включена файловая блокировка, такая сверка происходит и при записи (не реже, чем раз в SIZE_SYNC_INTERVAL секунд), даже если размер файла никто не запрашивает (например, когда нет правила ротации по размеру). До этого момента логи продолжают писаться в старый (уже ротированный) файл. Поэтому ротированный файл нельзя сжимать или удалять сразу после ротации - это происходит только после того, как его отпустят все процессы (см. Rotator.wait_for_writers()).
     """
 
-    def __init__(self, file, lock_type):
+    SIZE_SYNC_WRITES = 1000
+    SIZE_SYNC_INTERVAL = 1.0
+
+    def __init__(self, file, lock_type, atomic_append=False):
         """
         На вход подается путь к файлу, файловый объект, либо ничего.
 
@@ -20,9 +34,16 @@ class FileDependencyWrapper:
         В третьем - использовать stdout.
 
         file - список с аргументами от пользователя. Он валиден, если пуст, либо содержит 1 элемент - файловый объект или строку с путем к файлу.
+        atomic_append - включить режим атомарной дозаписи (см. описание класса). Доступен, только если передан путь к файлу.
         """
+        self.atomic_append = atomic_append
         self.file, self.filename = self.get_file_object(file)
+        if atomic_append and self.filename is None:
+            raise ValueError('The atomic append mode is only available when logs are written to a file by its path.')
+        self.binary = self.is_binary(self.file)
         self.lock = DoubleLock(self.filename, lock_type)
+        self.shared = 'file' in self.lock.types
+        self.remember_file_state()
 
     def is_file_object(self, file):
         """
@@ -56,19 +77,78 @@ class FileDependencyWrapper:
         if not self.is_file_object(maybe_filename):
             if not isinstance(maybe_filename, str):
                 raise ValueError('A file object or string with the file name is expected.')
-            file = open(maybe_filename, 'a', encoding='utf-8')
+            file = self.open_file(maybe_filename)
             filename = maybe_filename
         else:
             file = maybe_filename
             filename = None
         return file, filename
 
+    @staticmethod
+    def is_binary(file):
+        """
+        Проверяем, открыт ли файл в бинарном режиме.
+
+        Файлы, которые открываем мы сами (когда пользователь передал путь к файлу), всегда открываются в бинарном режиме. Файловые объекты от пользователя (как и sys.stdout) могут быть какими угодно, для них режим определяется по атрибуту mode.
+        """
+        return 'b' in getattr(file, 'mode', '')
+
     def write(self, log_string):
         """
-        Запись строки в файл.
+        Запись лога в файл.
+
+        log_string может быть как строкой, так и байтами (например, если форматтер сразу сериализует лог в JSON быстрым сериализатором, возвращающим байты). Если тип данных не соответствует режиму файла, перед записью они перекодируются в UTF-8 или из нее. Так байты, полученные от сериализатора, без каких-либо преобразований доходят до файла, открытого в бинарном режиме.
         """
+        if self.binary:
+            if isinstance(log_string, str):
+                log_string = log_string.encode('utf-8')
+        elif not isinstance(log_string, str):
+            log_string = bytes(log_string).decode('utf-8')
+        if self.shared and time.monotonic() >= self.next_size_sync:
+            self.sync_size()
+        if self.atomic_append:
+            self.write_atomic(log_string)
+            return
         with self.lock:
             self.file.write(log_string)
+            if self.filename is not None:
+                self.size += len(log_string)
+                self.writes_since_size_sync += 1
+
+    def write_atomic(self, data):
+        """
+        Запись в режиме атомарной дозаписи: один системный вызов write() на весь переданный кусок данных, без блокировок.
+
+        Для файла, открытого с флагом O_APPEND, ядро само перемещает позицию записи в конец файла и пишет данные, не допуская перемешивания с записями других процессов и потоков. Это гарантируется для обычных файлов на локальных файловых системах в Linux и других *NIX (при условии, что запись не прервана, скажем, из-за нехватки места на диске). На сетевых файловых системах (например, NFS) и в Windows такой гарантии нет - там нужно использовать файловую блокировку.
+        Если ОС записала только часть данных, остаток дописывается следующим вызовом - в этом случае данные не теряются, но атомарность не гарантируется.
+        Счетчик размера файла обновляется тоже без блокировки, поэтому при записи из нескольких потоков он может немного расходиться с реальным размером - до очередной сверки (см. .sync_size()).
+
+        Ссылка на файловый объект сохраняется в локальной переменной: если в это время другой поток ротирует файл, старый файловый объект не будет закрыт, пока запись в него не завершится (см. .release_file()).
+        """
+        file = self.file
+        view = memoryview(data)
+        while view:
+            written = file.write(view)
+            view = view[written:]
+        self.size += len(data)
+        self.writes_since_size_sync += 1
+
+    def open_file(self, filename):
+        """
+        Открываем файл на дозапись в бинарном режиме. В режиме атомарной дозаписи - без буферизации (см. .write_atomic()).
+        """
+        if self.atomic_append:
+            return open(filename, 'ab', buffering=0)
+        return open(filename, 'ab')
+
+    def release_file(self, file):
+        """
+        Освобождаем файловый объект, который больше не нужен (например, после ротации).
+
+        В обычном режиме файл просто закрывается. В режиме атомарной дозаписи запись идет без блокировок, поэтому в этот момент в старый файл еще может писать другой поток. Закрывать его явно нельзя: файл закроется сам, когда на него не останется ссылок. Буфера у файла в этом режиме нет, так что терять при этом нечего.
+        """
+        if not self.atomic_append:
+            file.close()
 
     def close(self):
         """
@@ -81,7 +161,9 @@ class FileDependencyWrapper:
         Открываем файл.
         Работает только в том случае, если исходно пользователь передал имя файла, а не файловый объект.
         """
-        self.file = open(filename, 'a', encoding='utf-8')
+        self.file = self.open_file(filename)
+        self.binary = True
+        self.remember_file_state()
 
     def reopen(self):
         """
@@ -93,37 +175,139 @@ class FileDependencyWrapper:
 
     def flush(self):
         """
-        Сброс буфера в файл.
+        Сброс буфера в файл. В режиме атомарной дозаписи буфера нет, так что и сбрасывать нечего.
         """
+        if self.atomic_append:
+            return
         with self.lock:
             self.file.flush()
 
+    def fsync(self):
+        """
+        Просим ОС записать данные файла на диск (см. os.fsync()). Для потоков, которые этого не поддерживают (например, stdout, направленный в терминал), ничего не происходит.
+        """
+        with self.lock:
+            try:
+                os.fsync(self.file.fileno())
+            except (OSError, AttributeError, ValueError):
+                pass
+
     def get_size(self):
         """
         Узнаем размер файла (в байтах).
+
+        Как правило, это просто значение счетчика записанных байт. Время от времени счетчик сверяется с файловой системой (см. описание класса).
+        """
+        if self.writes_since_size_sync >= self.SIZE_SYNC_WRITES or (self.shared and time.monotonic() >= self.next_size_sync):
+            self.sync_size()
+        return self.size
+
+    def remember_file_state(self):
+        """
+        Запоминаем размер и идентификатор (пару из номера устройства и номера inode) только что открытого файла.
+
+        Для файловых объектов от пользователя (и для stdout) размер всегда считается нулевым, а идентификатор не используется.
+        """
+        self.writes_since_size_sync = 0
+        self.next_size_sync = time.monotonic() + self.SIZE_SYNC_INTERVAL
+        if self.filename is None:
+            self.size = 0
+            self.identity = None
+            return
+        stat = os.fstat(self.file.fileno())
+        self.size = stat.st_size
+        self.identity = (stat.st_dev, stat.st_ino)
+
+    def sync_size(self):
+        """
+        Сверяем счетчик записанных байт с размером файла в файловой системе.
+
+        Если по пути к файлу лежит уже не тот файл, что открыт у нас (или там вообще ничего нет), значит, файл ротировали. Тогда мы его переоткрываем, и размер берется уже от нового файла.
+        """
+        if self.filename is None:
+            self.remember_file_state()
+            return
+        try:
+            stat = os.stat(self.filename)
+        except FileNotFoundError:
+            stat = None
+        if stat is None or (stat.st_dev, stat.st_ino) != self.identity:
+            self.reopen_replaced()
+            return
+        self.writes_since_size_sync = 0
+        self.next_size_sync = time.monotonic() + self.SIZE_SYNC_INTERVAL
+        self.size = stat.st_size
+
+    def is_replaced(self):
+        """
+        Проверяем, лежит ли по пути к файлу уже не тот файл, что открыт у нас.
         """
-        if self.filename is not None:
+        try:
             stat = os.stat(self.filename)
-            result = stat.st_size
-            return result
-        return 0
+        except FileNotFoundError:
+            return True
+        return (stat.st_dev, stat.st_ino) != self.identity
+
+    def reopen_replaced(self):
+        """
+        Переоткрываем файл после того, как его ротировал кто-то другой.
+
+        Под блокировкой происходит только открытие нового файла. Старый закрывается (и, соответственно, сбрасывает в себя буфер) уже после того, как блокировка отпущена.
+        """
+        with self.lock:
+            old_file = self.file
+            self.open(self.filename)
+        self.release_file(old_file)
 
     def move_file(self, path_to_copy):
         """
-        Перемещаем исходный файл в path_to_copy.
+        Перемещаем исходный файл в path_to_copy (то есть ротируем его) и открываем по исходному пути новый файл.
+        Возвращается путь, куда был перемещен файл, либо None, если ротация не понадобилась.
 
-        Перемещение файла - опасный процесс с точки зрения concurrency. Если его не защитить блокировками, возможна ситуация, когда, к примеру, один актор начал перемещать файл, уже скопировал его значение в новый, но старый еще не удалил, и в это время другой актор что-то записал в файл, после чего первый его удалил.
-        Для наших целей для обеспечения целостности записей требуется аж 2 вида блокировок:
-        1. Блокировка файла на уровне ОС. Делается, чтобы другие процессы / потоки, открывшие параллельно тот же файл, не могли тут ничего сломать, пока мы работаем с файлом.
+        Перемещение файла - опасный процесс с точки зрения concurrency. Если один актор переместит файл, а другой, ничего не зная об этом, продолжит в него писать или тоже решит его ротировать, записи могут оказаться не там, где нужно, или вовсе потеряться. Поэтому перемещение происходит под блокировками:
+        1. Блокировка файла на уровне ОС. Делается, чтобы другие процессы, открывшие параллельно тот же файл, не могли тут ничего сломать, пока мы работаем с файлом.
         2. Блокировка на уровне потока. Нужна, поскольку с одним обработчиком (читай - одним и тем же файловым объектом) могут параллельно работать воркеры из нескольких потоков.
+
+        Под блокировками происходит минимум работы: переименование файла (обычно это дешевая операция, данные при этом не копируются) и открытие нового. Если несколько процессов одновременно решили ротировать файл, ротирует его только тот, кто первым взял блокировку. Остальные, взяв ее, увидят, что по исходному пути лежит уже другой файл, и просто переоткроют его. Процессы, которые еще не решили ротировать файл, обнаружат ротацию позже, при очередной сверке размера файла (см. .sync_size()).
+        Если файл с таким же именем в месте назначения уже есть, к имени добавляется числовой суффикс.
         """
         with self.lock:
-            try:
-                shutil.move(self.filename, path_to_copy)
-            except FileNotFoundError:
-                self.make_dirs_for_path(path_to_copy)
-                shutil.move(self.filename, path_to_copy)
-            self.reopen()
+            if self.is_replaced():
+                result = None
+            else:
+                result = self.get_free_path(path_to_copy)
+                self.rename(self.filename, result)
+            old_file = self.file
+            self.open(self.filename)
+        self.release_file(old_file)
+        return result
+
+    def rename(self, source, destination):
+        """
+        Переименовываем файл. Если директории назначения нет, она создается. Если файл нужно переместить на другую файловую систему, где переименование невозможно, он копируется.
+        """
+        try:
+            os.rename(source, destination)
+        except FileNotFoundError:
+            self.make_dirs_for_path(destination)
+            os.rename(source, destination)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            shutil.move(source, destination)
+
+    @staticmethod
+    def get_free_path(path):
+        """
+        Если файл по указанному пути уже существует, добавляем к имени (перед расширением) числовой суффикс, чтобы не затереть его.
+        """
+        if not os.path.exists(path):
+            return path
+        root, extension = os.path.splitext(path)
+        number = 1
+        while os.path.exists(f'{root}_{number}{extension}'):
+            number += 1
+        return f'{root}_{number}{extension}'
 
     def make_dirs_for_path(self, path):
         """
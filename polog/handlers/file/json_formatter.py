@@ -0,0 +1,102 @@
+import json
+
+from polog.core.stores.levels import Levels
+from polog.core.utils.raw_traceback import RawTraceback
+from polog.core.utils.json_backend import get_json_backend
+from polog.core.stores.settings.settings_store import SettingsStore
+
+
+class JSONFormatter:
+    """
+    Форматтер для файлового обработчика, который записывает каждый лог одной строкой с компактным JSON-объектом (формат JSON Lines, https://jsonlines.org/):
+
+    >>> file_writer('file.jsonl', formatter=JSONFormatter())
+
+    В отличие от стандартного форматтера, строка которого рассчитана на человека, такой лог не нужно разбирать регулярными выражениями, чтобы отправить в систему сбора логов. Ключи объекта - названия полей лога (включая дополнительные поля), значения - "сырые" значения полей (см. LogItem.get_raw()) с родными для JSON типами:
+
+    {"level":1,"auto":true,"success":true,"time":1700000000.123456,"module":"app","function":"do","time_of_work":0.000123,"input_variables":{"args":[{"value":1,"type":"int"}],"kwargs":{}},"result":{"value":2,"type":"int"},"level_name":"DEBUG"}
+
+    1. 'time' - число секунд с начала эпохи, как оно хранится в логе, без промежуточного объекта datetime.
+    2. 'time_of_work' - число секунд, без округления и приписки " sec.".
+    3. 'level' - числовое значение уровня. Если у уровня есть название, оно дополнительно выводится в поле 'level_name'.
+    4. Переменные функции, возвращаемое значение и трейсбек хранятся в логе как структуры и встраиваются в объект вложенными объектами и списками, а не строками с JSON внутри строки JSON. Так они сериализуются один раз, вместе со всем логом. Если же в таком поле лежит строка (например, переданная пользователем в ручной логгер), она выводится как строка, без попыток разобрать ее как JSON.
+    5. Значения прочих типов, которых нет в JSON, приводятся к строке через str(), в т. ч. вложенные.
+
+    Лог сериализуется одним вызовом функции dumps() модуля из настройки 'json_module' (см. JSONBackend): словарь с полями лога целиком обходит сериализатор, написанный на C, а не код на Python, склеивающий кусочки. Поэтому ключи заново не кодируются в Python при каждой записи - их экранирует тот же сериализатор за один проход. Сериализаторы, которые возвращают байты (например, orjson), пишут их в файл без промежуточных преобразований. Стандартный модуль json используется с компактными разделителями и без экранирования не-ASCII символов.
+
+    Как и стандартный форматтер, этот окончательно настраивается при записи первого лога, т. к. до этого момента настройка 'json_module' еще может поменяться. Готовая строка кэшируется в объекте лога (см. LogItem.get_rendered()).
+    """
+
+    # Типы значений, которые передаются сериализатору как есть.
+    NATIVE_TYPES = frozenset((str, int, float, bool, type(None), dict, list))
+
+    def __init__(self, separator='\n'):
+        """
+        separator - разделитель между строками логов, добавляется в конец каждой строки.
+        """
+        if not isinstance(separator, str):
+            raise ValueError(f'The separator must be a string, not {type(separator).__name__}.')
+        self.separator = separator
+        self.encoded_separator = separator.encode('utf-8')
+        self.cache_key = None
+        self.dumps = None
+
+    def __repr__(self):
+        return f'JSONFormatter(separator={self.separator!r})'
+
+    def __call__(self, log):
+        """
+        Форматирование лога. При первом вызове происходит второй этап инициализации (см. .__init_on_run__()).
+        """
+        if self.dumps is None:
+            self.__init_on_run__()
+        try:
+            get_rendered = log.get_rendered
+        except AttributeError:
+            return self.render(log)
+        return get_rendered(self.cache_key, self.render)
+
+    def __init_on_run__(self):
+        """
+        Второй этап инициализации: фиксируем модуль сериализации.
+        """
+        module = SettingsStore()['json_module']
+        self.cache_key = (type(self), self.separator, module)
+        self.dumps = self.get_dumps(module)
+
+    @staticmethod
+    def get_dumps(module):
+        """
+        Получаем функцию, которая сериализует объект в байты с компактным JSON.
+
+        Быстрые сериализаторы (orjson, ujson) и так выдают JSON без пробелов, а стандартный модуль json по умолчанию ставит пробелы после запятых и двоеточий. Для него создается отдельный кодировщик с компактными разделителями.
+        Вложенные значения, которых нет в JSON (например, даты внутри результата пользовательского сериализатора), приводятся к строке: стандартный модуль делает это сам (default=str), а для быстрых сериализаторов в этом случае используется запасной вариант из JSONBackend.
+        """
+        if module is json:
+            encode = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False, default=str).encode
+            return lambda value: encode(value).encode('utf-8')
+        return get_json_backend(module).dumps_bytes
+
+    def render(self, log):
+        """
+        Непосредственная сериализация лога, без кэширования. Вместо лога может быть передан обычный словарь.
+        """
+        data = {}
+        native_types = self.NATIVE_TYPES
+        for key, value in (log if isinstance(log, dict) else log.fields).items():
+            if type(value) not in native_types:
+                value = self.convert(value)
+            data[key] = value
+        level_name = Levels.levels_reverse.get(data.get('level'))
+        if level_name is not None:
+            data['level_name'] = level_name
+        return self.dumps(data) + self.encoded_separator
+
+    @staticmethod
+    def convert(value):
+        """
+        Приводим значение, тип которого не поддерживается в JSON, к поддерживаемому. "Сырой" трейсбек превращается в список строк, все остальное - в строку.
+        """
+        if isinstance(value, RawTraceback):
+            return value.format()
+        return str(value)
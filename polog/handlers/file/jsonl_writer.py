@@ -0,0 +1,20 @@
+from polog.handlers.file.writer import file_writer
+from polog.handlers.file.json_formatter import JSONFormatter
+
+
+class jsonl_file_writer(file_writer):
+    """
+    Файловый обработчик, который пишет логи в формате JSON Lines: каждый лог - одна строка с JSON-объектом (см. JSONFormatter).
+
+    >>> config.add_handlers(jsonl_file_writer('logs.jsonl', rotation='100 mb', buffer_size=64 * 1024))
+
+    Все аргументы - те же, что у file_writer, так что буферизация, ротация, сжатие и прочие режимы работают так же, как и для обычных текстовых логов. Отличается только форматтер по умолчанию.
+    """
+
+    def get_formatter(self, maybe_formatter):
+        """
+        Если пользователь не передал свой форматтер, логи сериализуются в JSON.
+        """
+        if callable(maybe_formatter):
+            return maybe_formatter
+        return JSONFormatter(self.base_formatter.separator)
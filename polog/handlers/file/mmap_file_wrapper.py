@@ -0,0 +1,192 @@
+import os
+import mmap
+import atexit
+import shutil
+import weakref
+import pathlib
+from functools import partial
+from threading import Lock
+from contextlib import nullcontext
+
+from polog.handlers.file.locks.double_lock import DoubleLock
+from polog.handlers.file.file_dependency_wrapper import FileDependencyWrapper
+from polog.handlers.file.segment_reader import SegmentReader
+from polog.core.engine.engine import Engine
+from polog.core.utils.exception_escaping import exception_escaping
+
+
+class MmapFileWrapper:
+    """
+    Обертка над файлом с логами, который отображается в память (mmap). Заменяет FileDependencyWrapper, если у файлового обработчика включен режим отображения в память (см. аргумент mmap_segment_size у file_writer).
+
+    Файл заранее увеличивается до размера сегмента (segment_size байт) и целиком отображается в память. Запись лога - это копирование его байт в отображенную память и увеличение счетчика записанных байт (смещения), без каких-либо системных вызовов. Данные попадают в страницы памяти, которые ОС сама, в фоне, сбрасывает в файл. Они видны другим процессам сразу и не теряются, если программа упала: теряется только то, что ОС не успела записать на диск до сбоя самой ОС или отключения питания.
+
+    Когда сегмент заполнен (записано не меньше segment_size байт), файл ротируется (см. .is_full() и Rotator), как при ротации по размеру файла. Ротированный файл обрезается до реальной длины данных. Лог, который не поместился в остаток сегмента, дописывается в него же: для этого отображение увеличивается еще на один сегмент (см. .grow()), так что логи никогда не разрываются между файлами.
+
+    После каждой остановки движка (см. Engine.add_stop_callback()), когда все логи из его очереди уже записаны, и при завершении программы отображение убирается, а файл обрезается до реальной длины данных. Порядок срабатывания функций, зарегистрированных в модуле atexit, от обертки не зависит: если после этого в файл приходит еще один лог (например, движок дописывает свою очередь), файл открывается снова и будет еще раз обрезан при остановке движка. После явного закрытия (см. .close()) запись в файл невозможна.
+    При закрытии файл тоже обрезается до реальной длины данных. Если этого не произошло (программа завершилась аварийно), в конце файла остаются нулевые байты. При следующем открытии запись продолжится с места, где заканчиваются данные. Читать такие файлы, не обращая внимания на "рваный хвост", можно с помощью SegmentReader.
+
+    Смещение хранится в памяти процесса, поэтому писать в один файл в этом режиме может только один процесс: файловая блокировка не поддерживается. Потоки внутри процесса защищены блокировкой потока, если она включена (lock_type='thread', по умолчанию).
+    """
+
+    def __init__(self, file, lock_type, segment_size):
+        """
+        file - список с аргументами от пользователя. В этом режиме он должен содержать ровно один элемент - путь к файлу.
+        lock_type - виды блокировок, как у FileDependencyWrapper. Блокировка файла не поддерживается.
+        segment_size (int) - размер сегмента в байтах.
+        """
+        if len(file) != 1 or not isinstance(file[0], str):
+            raise ValueError('The memory-mapped mode is only available when logs are written to a file by its path.')
+        if not isinstance(segment_size, int) or isinstance(segment_size, bool) or segment_size <= 0:
+            raise ValueError('The segment size must be a positive integer.')
+        lock_types = DoubleLock.get_lock_types(lock_type)
+        if 'file' in lock_types:
+            raise ValueError('The memory-mapped mode does not support file locks: only one process can write to the file.')
+        self.filename = file[0]
+        self.segment_size = segment_size
+        self.binary = True
+        # Единственная возможная здесь блокировка - блокировка потока. Обычный мьютекс берется быстрее, чем DoubleLock, а запись лога в этом режиме настолько дешевая, что это заметно.
+        self.lock = Lock() if lock_types else nullcontext()
+        self.mapping = None
+        self.closed = False
+        self.open(self.filename)
+
+        self.stop_callback = partial(self.release_by_reference, weakref.ref(self))
+        Engine().add_stop_callback(self.stop_callback)
+        atexit.register(self.stop_callback)
+
+    def write(self, log_string):
+        """
+        Запись лога: копирование байт в отображенную память и сдвиг смещения.
+
+        Если отображение было убрано при остановке движка или завершении программы, файл открывается снова. Запись в явно закрытый файл (см. .close()) поднимает ValueError.
+        """
+        if isinstance(log_string, str):
+            log_string = log_string.encode('utf-8')
+        with self.lock:
+            if self.mapping is None:
+                if self.closed:
+                    raise ValueError(f'The file "{self.filename}" is closed.')
+                self.open(self.filename)
+            end = self.size + len(log_string)
+            if end > self.capacity:
+                self.grow(end)
+            self.mapping[self.size:end] = log_string
+            self.size = end
+
+    def write_lines(self, lines):
+        """
+        Запись нескольких логов сразу (см. BufferedFileWrapper). Логи склеиваются и копируются в память одним куском.
+        """
+        if lines:
+            self.write(b''.join(x.encode('utf-8') if isinstance(x, str) else x for x in lines))
+
+    def grow(self, end):
+        """
+        Увеличиваем файл и его отображение в память на столько сегментов, сколько нужно, чтобы записать данные до смещения end.
+        """
+        segments = -(-(end - self.capacity) // self.segment_size)
+        capacity = self.capacity + segments * self.segment_size
+        self.mapping.close()
+        os.ftruncate(self.descriptor, capacity)
+        self.mapping = mmap.mmap(self.descriptor, capacity)
+        self.capacity = capacity
+
+    def is_full(self):
+        """
+        Заполнен ли текущий сегмент. Если да, файл пора ротировать.
+        """
+        return self.size >= self.segment_size
+
+    def get_size(self):
+        """
+        Количество записанных байт. В отличие от размера файла в файловой системе, не включает незаполненный остаток сегмента.
+        """
+        return self.size
+
+    def flush(self):
+        """
+        Буфера на стороне Python в этом режиме нет: данные сразу оказываются в памяти, откуда ОС сама сбрасывает их в файл.
+        """
+
+    def fsync(self):
+        """
+        Просим ОС записать измененные страницы отображенной памяти на диск (msync).
+        """
+        with self.lock:
+            if self.mapping is not None:
+                self.mapping.flush()
+
+    def open(self, filename):
+        """
+        Открываем файл и отображаем его в память.
+
+        Если файл уже существует (например, остался от прошлого запуска), запись продолжается с того места, где кончаются данные, а нулевой "хвост" от аварийного завершения перезаписывается (см. SegmentReader.get_valid_length()). Файл меньше сегмента увеличивается до размера сегмента.
+        """
+        self.descriptor = os.open(filename, os.O_RDWR | os.O_CREAT, 0o644)
+        size = os.fstat(self.descriptor).st_size
+        self.capacity = max(size, self.segment_size)
+        if size < self.capacity:
+            os.ftruncate(self.descriptor, self.capacity)
+        self.mapping = mmap.mmap(self.descriptor, self.capacity)
+        self.size = SegmentReader.get_valid_length(self.mapping, size)
+
+    def release(self):
+        """
+        Убираем отображение, обрезаем файл до реальной длины данных и закрываем его.
+        """
+        if self.mapping is None:
+            return
+        self.mapping.close()
+        self.mapping = None
+        os.ftruncate(self.descriptor, self.size)
+        os.close(self.descriptor)
+
+    def close(self):
+        """
+        Закрываем файл, обрезав его до реальной длины данных. После этого писать в него больше нельзя.
+
+        Функции, зарегистрированные в движке и в модуле atexit, после этого больше не нужны и убираются, чтобы не копиться, когда обертки создаются и закрываются много раз (например, в обработчике с маршрутизацией, см. routing_file_writer).
+        """
+        Engine().remove_stop_callback(self.stop_callback)
+        atexit.unregister(self.stop_callback)
+        with self.lock:
+            self.closed = True
+            self.release()
+
+    def reopen(self):
+        """
+        Закрываем файл и открываем снова.
+        """
+        with self.lock:
+            self.release()
+            self.open(self.filename)
+
+    def move_file(self, path_to_copy):
+        """
+        Ротация: закрываем файл (обрезая его до реальной длины данных), перемещаем его в path_to_copy и открываем по исходному пути новый сегмент. Возвращается путь, куда был перемещен файл.
+        Если файл с таким же именем в месте назначения уже есть, к имени добавляется числовой суффикс (см. FileDependencyWrapper.get_free_path()).
+        """
+        with self.lock:
+            result = FileDependencyWrapper.get_free_path(path_to_copy)
+            self.release()
+            pathlib.Path(result).parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(self.filename, result)
+            self.open(self.filename)
+        return result
+
+    def suspend(self):
+        """
+        Убираем отображение и обрезаем файл до реальной длины данных, но не закрываем обертку: следующий лог откроет файл снова (см. .write()).
+        """
+        with self.lock:
+            self.release()
+
+    @staticmethod
+    def release_by_reference(reference):
+        """
+        Обрезка файла до реальной длины данных по слабой ссылке на обертку. Используется в коллбеках движка и модуля atexit.
+        """
+        wrapper = reference()
+        if wrapper is not None:
+            exception_escaping(wrapper.suspend)()
@@ -0,0 +1,90 @@
+import os
+
+from polog.handlers.file.template_formatter import TemplateFormatter
+
+
+class PathTemplate(TemplateFormatter):
+    """
+    Шаблон пути к файлу с логами, который вычисляется для каждого лога (см. routing_file_writer).
+
+    Синтаксис тот же, что и у TemplateFormatter:
+
+    >>> template = PathTemplate('logs/{service_name}/{level}[[/{tenant}]].log')
+
+    Значения полей могут приходить откуда угодно (например, идентификатор клиента - из запроса), поэтому перед подстановкой в путь они обезвреживаются (см. .sanitize()): значение поля не может добавить в путь новые директории или подняться на уровень выше. Разделители директорий допустимы только в самом шаблоне.
+
+    В отличие от TemplateFormatter, поля подставляются "сырыми", а не в человекочитаемом виде стандартного форматтера (см. .get_field_getters()): например, {function} - это просто имя функции. Вместо отсутствующих и пустых значений подставляется MISSING_VALUE, чтобы в пути не появлялись пустые директории (вроде 'logs//ERROR.log') и скрытые файлы (вроде '.log').
+    """
+
+    # Символы, которые в значениях полей заменяются на SAFE_SYMBOL.
+    UNSAFE_SYMBOLS = tuple(x for x in ('/', '\\', os.sep, os.altsep, '\0') if x)
+    SAFE_SYMBOL = '_'
+    # Подставляется вместо отсутствующих и пустых значений полей.
+    MISSING_VALUE = 'unknown'
+
+    def __init__(self, template):
+        """
+        template - строка с шаблоном пути.
+        """
+        super().__init__(template, separator='')
+
+    def __repr__(self):
+        return f'PathTemplate({self.template!r})'
+
+    def generate_source(self, parts):
+        """
+        Генерируем исходный код функции, как в TemplateFormatter, но значение каждой подстановки дополнительно пропускаем через .sanitize().
+        """
+        source = super().generate_source(parts)
+        self.namespace['sanitize'] = self.sanitize
+        return source
+
+    def wrap_placeholder(self, expression):
+        """
+        Значение каждой подстановки пропускаем через .sanitize().
+        """
+        return f'sanitize({expression})'
+
+    @classmethod
+    def get_field_getters(cls):
+        """
+        Человекочитаемые представления полей стандартного форматтера для имен файлов не годятся (например, для функции это 'where: module.function()', а для ручного лога - '?'), поэтому все поля, кроме уровня, берутся из лога как есть. Уровень подставляется названием, если оно у него есть, иначе - числом.
+        """
+        return {
+            'level': cls.level,
+        }
+
+    def get_field_getter(self, field_name):
+        """
+        Пустая строка в значении поля считается отсутствующим значением: вместо нее подставляется заглушка (см. .get_missing_value()), а условная секция с таким полем не выводится.
+        """
+        getter = super().get_field_getter(field_name)
+        def wrapper(log):
+            value = getter(log)
+            if isinstance(value, str) and not value:
+                return None
+            return value
+        return wrapper
+
+    @classmethod
+    def get_missing_value(cls, format_spec):
+        """
+        Заглушка для отсутствующего поля - MISSING_VALUE, отформатированное по спецификации формата. Если спецификация к строкам неприменима, заглушкой будет просто MISSING_VALUE.
+        """
+        try:
+            return cls.sanitize(format(cls.MISSING_VALUE, format_spec))
+        except Exception:
+            return cls.MISSING_VALUE
+
+    @classmethod
+    def sanitize(cls, value):
+        """
+        Обезвреживаем значение поля для подстановки в путь: разделители директорий (и нулевой байт) заменяются на SAFE_SYMBOL. Значения, состоящие из одних точек (вроде '..'), заменяются на SAFE_SYMBOL целиком, а пустые - на MISSING_VALUE.
+        """
+        if not value:
+            return cls.MISSING_VALUE
+        for symbol in cls.UNSAFE_SYMBOLS:
+            value = value.replace(symbol, cls.SAFE_SYMBOL)
+        if not value.strip('.'):
+            return cls.SAFE_SYMBOL * len(value)
+        return value
@@ -0,0 +1,69 @@
+import atexit
+import weakref
+from queue import Queue
+from functools import partial
+from threading import Thread, Condition
+
+from polog.core.stores.settings.settings_store import SettingsStore
+from polog.core.utils.exception_escaping import exception_escaping
+
+
+class BackgroundWorker:
+    """
+    Фоновый поток для работы с ротированными файлами (сжатие, удаление старых файлов и т. д.), чтобы она не происходила в потоке, который пишет логи.
+
+    Задачи выполняются строго по очереди, в порядке поступления. Это важно: скажем, старые файлы удаляются (см. Retention) только после того, как сжат (см. Compressor) только что ротированный файл. Поток запускается лениво, при поступлении первой задачи.
+
+    При завершении работы программы она ждет, пока очередь опустеет, но не дольше, чем указано в настройке 'max_delay_before_exit'.
+    """
+
+    def __init__(self):
+        self.queue = Queue()
+        self.pending = 0
+        self.condition = Condition()
+        self.thread = None
+        self.settings = SettingsStore()
+
+        atexit.register(partial(self.wait_by_reference, weakref.ref(self)))
+
+    def put(self, function, *args):
+        """
+        Добавляем задачу в очередь и, если нужно, запускаем фоновый поток.
+        """
+        with self.condition:
+            self.pending += 1
+            if self.thread is None:
+                self.thread = Thread(target=self.run, args=(self.queue, self.condition))
+                self.thread.daemon = True
+                self.thread.start()
+        self.queue.put((function, args))
+
+    def run(self, queue, condition):
+        """
+        Цикл фонового потока: берем задачи из очереди и выполняем их. Ошибки при выполнении одной задачи не должны останавливать поток.
+        """
+        while True:
+            function, args = queue.get()
+            try:
+                exception_escaping(function)(*args)
+            finally:
+                with condition:
+                    self.pending -= 1
+                    condition.notify_all()
+
+    def wait(self, timeout=None):
+        """
+        Ждем, пока очередь опустеет, но не дольше timeout секунд. Возвращается True, если очередь пуста.
+        """
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.pending, timeout)
+
+    @staticmethod
+    def wait_by_reference(reference):
+        """
+        Ожидание опустошения очереди при завершении работы программы (см. модуль atexit). Объект берется по слабой ссылке, чтобы не мешать сборщику мусора.
+        """
+        worker = reference()
+        if worker is not None:
+            timeout = worker.settings['max_delay_before_exit']
+            exception_escaping(worker.wait)(timeout)
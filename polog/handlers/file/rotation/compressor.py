@@ -0,0 +1,142 @@
+import os
+import bz2
+import gzip
+import lzma
+import time
+import shutil
+
+from polog.handlers.file.rotation.background_worker import BackgroundWorker
+
+
+class Compressor:
+    """
+    Сжатие ротированных файлов с логами в фоновом потоке.
+
+    После ротации (см. Rotator.do()) путь к перемещенному файлу передается сюда и ставится в очередь фонового потока (см. BackgroundWorker). Фоновый поток по одному забирает файлы из очереди и сжимает их выбранным методом: 'gzip', 'bz2' или 'lzma'. Таким образом, пишущий логи поток никогда не ждет сжатия, в т. ч. под блокировками файлового обработчика. Все три модуля сжатия отпускают GIL на время обработки каждого блока данных, так что фоновый поток почти не мешает остальной программе.
+
+    Сжатие происходит так, чтобы на диске никогда не оказался "недожатый" файл под окончательным именем:
+    1. Данные пишутся во временный файл с суффиксом '.part' (в его имени есть также PID процесса, поэтому несколько процессов, которые ротируют логи в одну директорию, не мешают друг другу).
+    2. Временный файл атомарно переименовывается в итоговый (например, '*.logs.gz').
+    3. Только после этого удаляется исходный файл.
+
+    Если работа программы прервалась посреди этого процесса, при следующем запуске (см. .recover()) недожатые временные файлы удаляются, а ротированные, но еще не сжатые файлы снова ставятся в очередь. При штатном завершении работы программа ждет, пока очередь опустеет (см. BackgroundWorker). Все, что не успело сжаться, будет сжато при следующем запуске.
+
+    О каждом сжатом файле сообщается подписчикам (см. .add_listener()) - например, объекту Retention, который хранит список ротированных файлов.
+    """
+
+    # Название метода сжатия: (функция для открытия сжатого файла на запись, расширение сжатого файла).
+    METHODS = {
+        'gzip': (gzip.open, '.gz'),
+        'bz2': (bz2.open, '.bz2'),
+        'lzma': (lzma.open, '.xz'),
+    }
+    PART_SUFFIX = '.part'
+    # Временные файлы, которые не изменялись дольше этого количества секунд, считаются брошенными (активно сжимаемый файл обновляется постоянно).
+    STALE_PART_AGE = 60
+    # Несжатые ротированные файлы, которые изменялись позже, чем это количество секунд назад, при восстановлении директории не трогаются: скорее всего, их только что ротировал другой работающий процесс, который сожмет их сам, когда в них перестанут писать (см. Rotator.wait_for_writers()).
+    RECENT_FILE_AGE = 60
+
+    def __init__(self, method, worker=None):
+        """
+        method - название метода сжатия, один из ключей словаря METHODS.
+        worker - фоновый поток (см. BackgroundWorker), в котором происходит сжатие. Если не передан, создается свой.
+        """
+        if method not in self.METHODS:
+            raise ValueError(f'Unknown compression method "{method}". Available methods: {", ".join(self.METHODS)}.')
+        self.method = method
+        self.opener, self.extension = self.METHODS[method]
+        self.worker = BackgroundWorker() if worker is None else worker
+        self.listeners = []
+
+    def add_listener(self, callback):
+        """
+        Подписываемся на замену файлов их сжатыми версиями. callback вызывается в фоновом потоке с двумя аргументами: путь к исходному файлу (которого уже нет) и путь к сжатому. Повторная подписка той же функции ничего не делает.
+        """
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+
+    def compress(self, path):
+        """
+        Ставим файл в очередь на сжатие.
+        """
+        self.worker.put(self.compress_file, path)
+
+    def recover(self, directory, suffix):
+        """
+        Ставим в очередь восстановление директории с ротированными файлами после прошлых запусков (см. .recover_directory()).
+        Само восстановление, как и сжатие, происходит в фоновом потоке.
+        """
+        self.worker.put(self.recover_directory, directory, suffix)
+
+    def wait(self, timeout=None):
+        """
+        Ждем, пока очередь фонового потока опустеет, но не дольше timeout секунд. Возвращается True, если очередь пуста.
+        """
+        return self.worker.wait(timeout)
+
+    def get_compressed_path(self, path):
+        """
+        Путь к сжатой версии файла.
+        """
+        return f'{path}{self.extension}'
+
+    def compress_file(self, path):
+        """
+        Сжимаем один файл: пишем во временный файл, атомарно переименовываем его в итоговый и только потом удаляем исходный.
+        Время изменения сжатого файла берется от исходного, чтобы по нему можно было судить о возрасте логов (см. Retention).
+        Если исходного файла уже нет (например, его сжал другой процесс), ничего не делаем.
+        """
+        destination = self.get_compressed_path(path)
+        part = f'{destination}.{os.getpid()}{self.PART_SUFFIX}'
+        try:
+            with open(path, 'rb') as source:
+                with self.opener(part, 'wb') as target:
+                    shutil.copyfileobj(source, target, 1024 * 1024)
+                stat = os.fstat(source.fileno())
+            os.utime(part, (stat.st_atime, stat.st_mtime))
+            os.replace(part, destination)
+        except FileNotFoundError:
+            self.remove(part)
+            return
+        except BaseException:
+            self.remove(part)
+            raise
+        self.remove(path)
+        for callback in self.listeners:
+            callback(path, destination)
+
+    def recover_directory(self, directory, suffix):
+        """
+        Наводим порядок в директории с ротированными файлами после прошлых запусков:
+        1. Удаляем брошенные временные файлы (см. STALE_PART_AGE).
+        2. Ставим в очередь на сжатие все ротированные файлы (то есть файлы, имена которых заканчиваются на suffix), которые не были сжаты, кроме недавно измененных (см. RECENT_FILE_AGE). Они будут сжаты при одном из следующих запусков, если этого не сделает процесс, который их ротировал.
+        """
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return
+        now = time.time()
+        for name in names:
+            path = os.path.join(directory, name)
+            if name.endswith(self.PART_SUFFIX):
+                try:
+                    if now - os.stat(path).st_mtime > self.STALE_PART_AGE:
+                        self.remove(path)
+                except FileNotFoundError:
+                    pass
+            elif name.endswith(suffix):
+                try:
+                    if now - os.stat(path).st_mtime > self.RECENT_FILE_AGE:
+                        self.compress(path)
+                except FileNotFoundError:
+                    pass
+
+    @staticmethod
+    def remove(path):
+        """
+        Удаляем файл, если он есть.
+        """
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
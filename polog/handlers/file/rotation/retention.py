@@ -0,0 +1,185 @@
+import os
+import re
+import time
+
+from polog.handlers.file.rotation.background_worker import BackgroundWorker
+from polog.handlers.file.rotation.rules.rules.tokenization.tokenizator import Tokenizator
+
+
+class Retention:
+    """
+    Удаление старых ротированных файлов по лимитам, которые пользователь задает строкой вроде '10 files, 5 gb, 30 days':
+
+    1. 'n files' - хранить не больше n последних файлов.
+    2. 'n <размерность>' (например, '5 gb', синтаксис как у правила ротации по размеру) - суммарный размер файлов не больше указанного.
+    3. 'n <единица времени>' (например, '30 days', синтаксис как у правила ротации по времени) - удалять файлы старше указанного возраста.
+
+    Лимиты проверяются после каждой ротации, в фоновом потоке (см. BackgroundWorker) - то есть не в потоке, который пишет логи. Если включено сжатие (см. Compressor), проверка происходит уже после того, как ротированный файл сжат, поскольку используется тот же фоновый поток.
+
+    Чтобы не обходить директорию после каждой ротации, список ротированных файлов с их размерами и временем изменения (индекс) хранится в памяти. Директория сканируется полностью при запуске, а затем - не чаще, чем раз в RESCAN_INTERVAL секунд. Повторное сканирование нужно, чтобы учесть файлы, которые в ту же директорию ротируют другие процессы. Когда компрессор заменяет файл из индекса сжатой версией (например, при восстановлении директории после прошлых запусков, см. Compressor.recover()), он сообщает об этом (см. .replace()), и запись в индексе обновляется сразу.
+
+    Ротированным считается файл, имя которого заканчивается на suffix (с расширением сжатого файла или без), в т. ч. если перед расширением стоит числовой суффикс, добавленный при совпадении имен (см. FileDependencyWrapper.get_free_path(), например 'x.logs_1.gz').
+    """
+
+    # Лимит по количеству файлов задается словом 'files' или 'file'.
+    COUNT_UNITS = ('file', 'files')
+    RESCAN_INTERVAL = 60
+    # Числовой суффикс, который добавляется к имени ротированного файла перед последним расширением, если файл с таким именем уже есть.
+    COLLISION_TAIL = re.compile(r'_\d+(?=\.[^.]*$|$)')
+
+    def __init__(self, source, directory, suffix, extensions=(), worker=None):
+        """
+        source - строка с лимитами.
+        directory - директория с ротированными файлами.
+        suffix - окончание имен ротированных файлов (например, '.logs'). Остальные файлы в директории не трогаются.
+        extensions - расширения, которые добавляются к именам ротированных файлов при сжатии (например, ('.gz',)). Сжатые ротированные файлы тоже учитываются.
+        worker - фоновый поток (см. BackgroundWorker). Если не передан, создается свой.
+        """
+        self.source = source
+        self.directory = directory
+        self.extensions = tuple(extensions)
+        self.suffixes = (suffix,) + tuple(f'{suffix}{x}' for x in self.extensions)
+        self.max_files, self.max_size, self.max_age = self.parse(source)
+        self.worker = BackgroundWorker() if worker is None else worker
+        # Индекс: список пар [путь к файлу, (размер, время изменения)], от старых файлов к новым.
+        self.index = []
+        self.last_scan = None
+        self.worker.put(self.scan)
+
+    def __repr__(self):
+        return f'Retention("{self.source}")'
+
+    @classmethod
+    def parse(cls, source):
+        """
+        Разбираем строку с лимитами. Возвращается тройка (максимальное количество файлов, максимальный суммарный размер в байтах, максимальный возраст в секундах), отсутствующие лимиты - None.
+        """
+        if not isinstance(source, str):
+            raise ValueError(f'The retention rules must be a string, not {type(source).__name__}.')
+        limits = {}
+        for chunk in [x.strip() for x in source.replace(';', ',').split(',') if x.strip()]:
+            tokens = Tokenizator(chunk).generate_tokens()
+            if tokens.check_regexp('nd') and tokens['d'][0].content in cls.COUNT_UNITS:
+                key = 'files'
+                value = tokens['n'][0].content
+            elif tokens.check_regexp('ns'):
+                key = 'size'
+                value = tokens['n'][0].content * tokens['s'][0].content
+            elif tokens.check_regexp('np'):
+                key = 'age'
+                value = tokens['n'][0].content * tokens['p'][0].content
+            else:
+                raise ValueError(f'The retention rule "{chunk}" is formatted incorrectly. Read the documentation.')
+            if tokens['n'][0].content <= 0:
+                raise ValueError(f'The number in the retention rule "{chunk}" must be greater than zero.')
+            if key in limits:
+                raise ValueError(f'The retention limit by {key} is specified more than once: "{source}".')
+            limits[key] = value
+        if not limits:
+            raise ValueError('The retention rules are empty.')
+        return limits.get('files'), limits.get('size'), limits.get('age')
+
+    def add(self, path):
+        """
+        Сообщаем о ротированном файле. Файл добавляется в индекс, после чего проверяются лимиты. Все это происходит в фоновом потоке.
+        """
+        self.worker.put(self.add_and_enforce, path)
+
+    def add_and_enforce(self, path):
+        """
+        Добавляем файл в индекс и проверяем лимиты.
+
+        К моменту выполнения файл мог быть уже сжат, поэтому ищем его также под всеми именами, которые он может получить после сжатия.
+        """
+        if self.last_scan is None or time.monotonic() - self.last_scan >= self.RESCAN_INTERVAL:
+            self.scan()
+        else:
+            for candidate in [f'{path}{x}' for x in self.extensions] + [path]:
+                stat = self.get_stat(candidate)
+                if stat is not None:
+                    self.index = [x for x in self.index if x[0] != candidate]
+                    self.index.append([candidate, stat])
+                    break
+        self.enforce()
+
+    def replace(self, old_path, new_path):
+        """
+        Сообщаем, что файл old_path заменен файлом new_path (например, сжат). Индекс обновляется в фоновом потоке.
+        """
+        self.worker.put(self.replace_in_index, old_path, new_path)
+
+    def replace_in_index(self, old_path, new_path):
+        """
+        Заменяем в индексе запись о файле old_path записью о new_path, сохраняя ее место. Если old_path в индексе нет, ничего не делаем: новые файлы добавляются в индекс через .add().
+        """
+        for item in self.index:
+            if item[0] == old_path:
+                stat = self.get_stat(new_path)
+                if stat is None:
+                    self.index.remove(item)
+                else:
+                    item[0], item[1] = new_path, stat
+                return
+
+    def enforce(self):
+        """
+        Удаляем самые старые файлы, пока не будут соблюдены все лимиты.
+        """
+        deadline = time.time() - self.max_age if self.max_age is not None else None
+        total_size = sum(stat[0] for _, stat in self.index)
+        while self.index:
+            path, (size, mtime) = self.index[0]
+            too_many = self.max_files is not None and len(self.index) > self.max_files
+            too_big = self.max_size is not None and total_size > self.max_size
+            too_old = deadline is not None and mtime < deadline
+            if not (too_many or too_big or too_old):
+                break
+            self.remove(path)
+            self.index.pop(0)
+            total_size -= size
+
+    def scan(self):
+        """
+        Строим индекс, полностью обходя директорию.
+        """
+        index = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            names = []
+        for name in names:
+            if self.is_rotated(name):
+                path = os.path.join(self.directory, name)
+                stat = self.get_stat(path)
+                if stat is not None:
+                    index.append([path, stat])
+        index.sort(key=lambda x: (x[1][1], x[0]))
+        self.index = index
+        self.last_scan = time.monotonic()
+
+    def is_rotated(self, name):
+        """
+        Проверяем, что файл с таким именем - ротированный (см. описание класса).
+        """
+        return name.endswith(self.suffixes) or self.COLLISION_TAIL.sub('', name, count=1).endswith(self.suffixes)
+
+    @staticmethod
+    def get_stat(path):
+        """
+        Пара (размер, время изменения) для файла или None, если файла нет.
+        """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_size, stat.st_mtime)
+
+    @staticmethod
+    def remove(path):
+        """
+        Удаляем файл, если он есть.
+        """
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
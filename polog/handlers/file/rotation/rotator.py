@@ -1,9 +1,13 @@
 import os
+import time
 import datetime
 from threading import Lock
-from multiprocessing import current_process
 
 from polog.handlers.file.rotation.parser import Parser
+from polog.handlers.file.rotation.compressor import Compressor
+from polog.handlers.file.rotation.retention import Retention
+from polog.handlers.file.rotation.background_worker import BackgroundWorker
+from polog.handlers.file.file_dependency_wrapper import FileDependencyWrapper
 
 
 class Rotator:
@@ -14,17 +18,43 @@ class Rotator:
     2. Принимается решение, нужно в данный момент ротировать файл с логами или нет. Оно основано на извлеченных правилах - если сработало хотя бы одно из них, ротация случится.
     3. Принимается решение, куда перемещать файл с логами.
     4. Осуществляется собственно ротация.
+    5. Опционально ротированные файлы сжимаются (см. Compressor), а самые старые из них удаляются (см. Retention). Это происходит в фоновом потоке (см. BackgroundWorker).
     """
 
-    def __init__(self, source_string, file, parser=Parser):
+    # Расширение ротированных файлов (до сжатия).
+    SUFFIX = '.logs'
+    # Сколько секунд после ротации (и после последнего изменения) ротированный файл должен пролежать нетронутым, прежде чем его можно сжимать или удалять, если в файл пишут несколько процессов (см. .wait_for_writers()).
+    SETTLE_TIME = 2 * FileDependencyWrapper.SIZE_SYNC_INTERVAL
+    # Дольше этого ожидание не длится, даже если файл продолжает меняться.
+    MAX_SETTLE_TIME = 60
+
+    def __init__(self, source_string, file, parser=Parser, compression=None, retention=None, worker=None, cache=None):
+        """
+        worker - фоновый поток (см. BackgroundWorker) для сжатия и удаления старых файлов. Если не передан, но сжатие или удаление включены, создается свой. Общий поток нужен, когда ротаторов много (см. routing_file_writer).
+        cache - словарь, общий для нескольких ротаторов, в котором хранятся компрессоры и объекты Retention для директорий с ротированными файлами. Если он передан, для каждой директории они создаются только один раз, а значит, и восстановление директории после прошлых запусков (см. Compressor.recover()), и ее полное сканирование (см. Retention) происходят один раз, сколько бы ротаторов в нее ни ротировало. Доступ к словарю не защищен блокировкой: ротаторы с общим словарем должны создаваться по очереди.
+        """
         if source_string and file.filename is None:
             raise ValueError('Rotation is not possible when logs are not output to a file.')
+        if compression is not None and not source_string:
+            raise ValueError('Compression of rotated files is only possible when rotation is enabled.')
+        if retention is not None and not source_string:
+            raise ValueError('Retention of rotated files is only possible when rotation is enabled.')
         self.file = file
         self.parser = parser(self.file)
         self.source_rules = self.extract_rules_string_from_source(source_string)
         self.to = self.where_to_rotate(source_string)
         self.rules = self.generate_rules(self.source_rules)
         self.lock = Lock()
+        self.is_full = getattr(file, 'is_full', None)
+        self.extension = getattr(file, 'extension', '')
+        if worker is None and (compression is not None or retention is not None):
+            worker = BackgroundWorker()
+        self.worker = worker
+        self.cache = cache
+        self.compressor = self.get_compressor(compression)
+        self.retention = self.get_retention(retention)
+        if self.compressor is not None and self.retention is not None:
+            self.compressor.add_listener(self.retention.replace)
 
     def maybe_do(self):
         """
@@ -39,18 +69,95 @@ class Rotator:
     def to_do_or_not_to_do(self):
         """
         Здесь принимается решение, нужно ли в данный момент ротировать файл с логами.
+        Помимо правил, учитывается заполненность сегмента, если файл записывается в режиме отображения в память (см. MmapFileWrapper.is_full()). Такие файлы ротируются всегда, даже если правила ротации не заданы.
         """
         for rule in self.rules:
             if rule.check():
                 return True
+        if self.is_full is not None and self.is_full():
+            return True
         return False
 
     def do(self):
         """
-        Копируем файл с логами в указанную пользователем папку, переоткрываем файл по старому пути.
-        В качестве нового имени файла используем название файла корневого скрипта, с измененным на .log расширением и суффиксом, отображающим текущую дату и время.
+        Перемещаем файл с логами в указанную пользователем папку, переоткрываем файл по старому пути.
+        В качестве нового имени файла используем текущие дату и время (см. .new_filename()).
+
+        После ротации сообщаем о ней всем правилам (см. AbstractRule.reset()), чтобы те из них, что ведут отсчет от предыдущей ротации, начали его заново. Правила сбрасываются и тогда, когда оказалось, что файл уже ротировал другой процесс (в этом случае .move_file() только переоткрывает файл и возвращает None). Сжатие и удаление старых файлов (если они включены) ставятся в очередь фонового потока только тем процессом, который выполнил ротацию. Если в файл пишут несколько процессов, перед ними в очередь ставится ожидание, пока остальные процессы не отпустят ротированный файл (см. .wait_for_writers()).
+        """
+        path = self.file.move_file(os.path.join(self.to, self.new_filename()))
+        for rule in self.rules:
+            rule.reset()
+        if path is None:
+            return
+        if (self.compressor is not None or self.retention is not None) and getattr(self.file, 'shared', False):
+            self.worker.put(self.wait_for_writers, path, time.monotonic())
+        if self.compressor is not None:
+            self.compressor.compress(path)
+        if self.retention is not None:
+            self.retention.add(path)
+
+    def wait_for_writers(self, path, rotated_at):
+        """
+        Ждем, пока ротированный файл отпустят другие процессы. Выполняется в фоновом потоке, перед сжатием и проверкой лимитов, которые стоят в очереди после этой задачи.
+
+        Процессы, которые не выполняли ротацию, обнаруживают ее не сразу (см. FileDependencyWrapper.sync_size()) и до тех пор пишут в ротированный файл. Если бы он в это время был сжат и удален, эти записи пропали бы. Поэтому ждем, пока с момента ротации (rotated_at, по time.monotonic()) и с последнего изменения файла не пройдет SETTLE_TIME секунд, но в общей сложности не дольше MAX_SETTLE_TIME секунд.
+        """
+        while True:
+            try:
+                mtime = os.stat(path).st_mtime
+            except FileNotFoundError:
+                return
+            now = time.monotonic()
+            remaining = max(rotated_at + self.SETTLE_TIME - now, mtime + self.SETTLE_TIME - time.time())
+            if remaining <= 0 or now - rotated_at >= self.MAX_SETTLE_TIME:
+                return
+            time.sleep(min(remaining, rotated_at + self.MAX_SETTLE_TIME - now))
+
+    def get_compressor(self, compression):
+        """
+        Создаем компрессор для ротированных файлов, если пользователь выбрал метод сжатия.
+        Сразу же ставим в его очередь восстановление директории с ротированными файлами: там могут остаться несжатые файлы от прошлых запусков.
+        """
+        if compression is None:
+            return None
+        return self.get_cached(('compressor', compression), self.create_compressor, compression)
+
+    def create_compressor(self, compression):
+        """
+        Создаем новый компрессор и ставим в очередь восстановление директории.
         """
-        self.file.move_file(os.path.join(self.to, self.new_filename()))
+        compressor = Compressor(compression, worker=self.worker)
+        compressor.recover(self.to, self.SUFFIX)
+        return compressor
+
+    def get_retention(self, retention):
+        """
+        Создаем объект, удаляющий старые ротированные файлы, если пользователь задал лимиты.
+        Учитываются в т. ч. файлы, сжатые любым из доступных методов - например, в прошлых запусках с другими настройками.
+        """
+        if retention is None:
+            return None
+        return self.get_cached(('retention', retention), self.create_retention, retention)
+
+    def create_retention(self, retention):
+        """
+        Создаем новый объект, удаляющий старые ротированные файлы.
+        """
+        extensions = [extension for _, extension in Compressor.METHODS.values()]
+        return Retention(retention, self.to, self.SUFFIX, extensions=extensions, worker=self.worker)
+
+    def get_cached(self, key, create, *args):
+        """
+        Берем объект для директории с ротированными файлами из общего словаря (см. аргумент cache в .__init__()), а если его там нет - создаем функцией create. Без общего словаря объект создается каждый раз.
+        """
+        if self.cache is None:
+            return create(*args)
+        key = (os.path.abspath(self.to),) + key
+        result = self.cache.get(key)
+        if result is None:
+            result = self.cache[key] = create(*args)
+        return result
 
     def generate_rules(self, source_rules):
         """
@@ -121,9 +228,12 @@ class Rotator:
         """
         Создаем новое имя файла при ротации.
         Оно основано на текущем времени / дате.
+
+        Если логи сжимаются по мере записи (см. CompressedFileWrapper), к имени добавляется расширение сжатого файла, например '.gz'.
+
+        PID процесса в имя не входит: ротацию одного и того же файла несколько процессов выполняют совместно (см. FileDependencyWrapper.move_file()), так что и ротированный файл получается один. Если файл с таким именем уже есть, к нему добавится числовой суффикс.
         """
         stamp = str(datetime.datetime.now()).replace(' ', '_')
-        process_id = current_process().pid
 
-        result = f'{stamp}_{process_id}.logs'
+        result = f'{stamp}{self.SUFFIX}{self.extension}'
         return result
@@ -57,3 +57,11 @@ class AbstractRule:
         Метод должен возвращать True или False в зависимости от результата проверки.
         """
         raise NotImplementedError # pragma: no cover
+
+    def reset(self):
+        """
+        Эта функция вызывается сразу после каждой ротации, вне зависимости от того, какое из правил ее вызвало.
+
+        Правила, которые ведут отсчет от предыдущей ротации (скажем, по количеству записанных строк), должны здесь обнулять свое состояние. По умолчанию ничего не происходит.
+        """
+        pass
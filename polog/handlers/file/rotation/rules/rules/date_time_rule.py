@@ -1,10 +1,95 @@
-from polog.handlers.file.rotation.rules.rules.file_size_rule import AbstractRule
+import os
+import time
+import datetime
+
+from polog.handlers.file.rotation.rules.rules.abstract_rule import AbstractRule
 
 
 class DateTimeRule(AbstractRule):
-    @classmethod
-    def prove_source(cls, source):
-        raise NotImplementedError
+    """
+    Правило для ротации логов в определенные моменты по настенным часам. Поддерживаются выражения:
+
+    1. 'hourly' - в начале каждого часа.
+    2. 'daily' - каждый день в полночь.
+    3. 'weekly' - каждый понедельник в полночь.
+    4. 'at 04:30' или 'daily at 04:30' - каждый день в указанное время. Время указывается в формате 'ЧЧ:ММ' или 'ЧЧ:ММ:СС'.
+    5. 'monday', 'every monday' или 'monday at 04:30' - раз в неделю в указанный день (по умолчанию - в полночь). Дни недели можно сокращать до трех букв: 'mon', 'tue' и т. д.
+
+    Момент следующей ротации (как timestamp) вычисляется заранее, поэтому проверка при каждой записи - это одно сравнение с time.time(). Календарные вычисления происходят только тогда, когда правило срабатывает.
+    Если файл с логами последний раз изменялся до последнего наступившего момента ротации (например, программа не работала в полночь), ротация произойдет при первой же записи.
+    """
+    def prove_source(self):
+        for regexp in ('d[hourly]', 'd[daily]', 'd[weekly]', 'd[at]t', 'd[daily]d[at]t', 'w', 'd[every]w', 'wd[at]t', 'd[every]wd[at]t'):
+            if self.tokens.check_regexp(regexp):
+                return True
+        return False
 
     def check(self):
-        raise NotImplementedError
+        if time.time() < self.deadline:
+            return False
+        self.deadline = self.get_next_moment(datetime.datetime.now()).timestamp()
+        return True
+
+    def extract_data_from_string(self):
+        """
+        Заполняем:
+
+        self.step - промежуток между моментами ротации ('hour', 'day' или 'week').
+        self.at - время суток, в которое происходит ротация (datetime.time).
+        self.weekday - для еженедельной ротации номер дня недели (0 - понедельник), иначе None.
+        self.deadline - timestamp следующей ротации.
+        """
+        words = [token.content for token in self.tokens['d']]
+        times = self.tokens['t']
+        weekdays = self.tokens['w']
+        self.at = times[0].content if len(times) else datetime.time()
+        self.weekday = None
+        if 'hourly' in words:
+            self.step = 'hour'
+        elif 'weekly' in words:
+            self.step = 'week'
+            self.weekday = 0
+        elif len(weekdays):
+            self.step = 'week'
+            self.weekday = weekdays[0].content
+        else:
+            self.step = 'day'
+        self.deadline = self.get_first_deadline(datetime.datetime.now())
+
+    def get_first_deadline(self, now):
+        """
+        Вычисляем timestamp первой ротации.
+
+        Обычно это следующий после now момент ротации. Но если файл не пуст и последний раз изменялся раньше предыдущего момента ротации, то есть содержит логи, которые уже должны были быть ротированы, - срабатываем сразу.
+        """
+        next_moment = self.get_next_moment(now)
+        previous_moment = next_moment - self.get_step_delta()
+        filename = getattr(self.file, 'filename', None)
+        if filename is not None:
+            try:
+                stat = os.stat(filename)
+                if stat.st_size and stat.st_mtime < previous_moment.timestamp():
+                    return previous_moment.timestamp()
+            except OSError:
+                pass
+        return next_moment.timestamp()
+
+    def get_step_delta(self):
+        """
+        Промежуток между двумя соседними моментами ротации.
+        """
+        return {'hour': datetime.timedelta(hours=1), 'day': datetime.timedelta(days=1), 'week': datetime.timedelta(weeks=1)}[self.step]
+
+    def get_next_moment(self, now):
+        """
+        Вычисляем ближайший момент ротации строго после now.
+        """
+        if self.step == 'hour':
+            result = now.replace(minute=self.at.minute, second=self.at.second, microsecond=0)
+        else:
+            result = datetime.datetime.combine(now.date(), self.at)
+            if self.step == 'week':
+                result += datetime.timedelta(days=(self.weekday - now.weekday()) % 7)
+        while result <= now:
+            result += self.get_step_delta()
+        return result
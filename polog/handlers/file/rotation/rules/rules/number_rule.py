@@ -1,13 +1,35 @@
-from polog.handlers.file.rotation.rules.rules.file_size_rule import AbstractRule
+from polog.handlers.file.rotation.rules.rules.abstract_rule import AbstractRule
 
 
 class NumberRule(AbstractRule):
     """
-    Правило для ротации логов раз в n записей.
+    Правило для ротации логов раз в n записей, например '10000 lines' или 'every 500 logs'.
+
+    Записи отсчитываются от создания обработчика, а затем - от каждой последующей ротации (в т. ч. вызванной другими правилами). Строки, которые уже были в файле до создания обработчика, не учитываются.
+    Проверка вызывается ровно один раз перед каждой записью, поэтому правилу достаточно простого счетчика.
     """
-    @classmethod
-    def prove_source(cls, source):
-        raise NotImplementedError
+    units = ('line', 'lines', 'log', 'logs', 'record', 'records', 'entry', 'entries')
+
+    def prove_source(self):
+        if not (self.tokens.check_regexp('nd') or self.tokens.check_regexp('d[every]nd')):
+            return False
+        if self.tokens['n'][0].content <= 0:
+            return False
+        return self.tokens['d'][-1].content in self.units
 
     def check(self):
-        raise NotImplementedError
+        self.counter += 1
+        return self.counter > self.limit
+
+    def reset(self):
+        """
+        Ротация происходит перед записью очередной строки, так что эта строка будет первой в новом файле.
+        """
+        self.counter = 1
+
+    def extract_data_from_string(self):
+        """
+        Заполняем self.limit - сколько записей может быть в файле - и обнуляем счетчик записей.
+        """
+        self.limit = self.tokens['n'][0].content
+        self.counter = 0
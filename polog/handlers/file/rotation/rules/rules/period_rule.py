@@ -1,10 +1,34 @@
-from polog.handlers.file.rotation.rules.rules.file_size_rule import AbstractRule
+import time
+
+from polog.handlers.file.rotation.rules.rules.abstract_rule import AbstractRule
 
 
 class PeriodRule(AbstractRule):
-    @classmethod
-    def prove_source(cls, source):
-        raise NotImplementedError
+    """
+    Правило для ротации логов через равные промежутки времени, например '2 hours' или 'every 1 day'.
+
+    Промежуток отсчитывается от создания обработчика, а затем - от каждой последующей ротации (в т. ч. вызванной другими правилами).
+    Момент следующей ротации вычисляется заранее, поэтому проверка при каждой записи - это одно сравнение с текущим временем. Используются монотонные часы, так что на правило не влияют переводы системного времени.
+    """
+    def prove_source(self):
+        if self.tokens.check_regexp('np') or self.tokens.check_regexp('d[every]np'):
+            return self.tokens['n'][0].content > 0
+        return self.tokens.check_regexp('p') or self.tokens.check_regexp('d[every]p')
 
     def check(self):
-        raise NotImplementedError
+        return time.monotonic() >= self.deadline
+
+    def reset(self):
+        self.deadline = time.monotonic() + self.period
+
+    def extract_data_from_string(self):
+        """
+        Заполняем self.period и self.deadline.
+
+        self.period - длина промежутка в секундах. Образуется путем перемножения количества (если оно не указано, то 1) и количества секунд в единице измерения.
+        self.deadline - момент следующей ротации по монотонным часам (см. time.monotonic()).
+        """
+        numbers = self.tokens['n']
+        number = numbers[0].content if len(numbers) else 1
+        self.period = number * self.tokens['p'][0].content
+        self.reset()
@@ -1,4 +1,4 @@
-from polog.handlers.file.rotation.rules.rules.tokenization.tokens import SizeToken, NumberToken, DotToken
+from polog.handlers.file.rotation.rules.rules.tokenization.tokens import SizeToken, NumberToken, PeriodToken, TimeToken, WeekdayToken, DotToken
 from polog.handlers.file.rotation.rules.rules.tokenization.tokens.tokens_group import TokensGroup
 
 
@@ -6,7 +6,7 @@ class Tokenizator:
     """
     Разбиваем исходную строку с правилом на токены.
     """
-    def __init__(self, source, tokens_classes=[SizeToken, NumberToken, DotToken]):
+    def __init__(self, source, tokens_classes=[SizeToken, NumberToken, PeriodToken, TimeToken, WeekdayToken, DotToken]):
         """
         source - исходная строка с правилом.
         tokens_classes - все доступные классы токенов.
@@ -1,3 +1,6 @@
 from polog.handlers.file.rotation.rules.rules.tokenization.tokens.size_token import SizeToken
 from polog.handlers.file.rotation.rules.rules.tokenization.tokens.number_token import NumberToken
+from polog.handlers.file.rotation.rules.rules.tokenization.tokens.period_token import PeriodToken
+from polog.handlers.file.rotation.rules.rules.tokenization.tokens.time_token import TimeToken
+from polog.handlers.file.rotation.rules.rules.tokenization.tokens.weekday_token import WeekdayToken
 from polog.handlers.file.rotation.rules.rules.tokenization.tokens.dot_token import DotToken
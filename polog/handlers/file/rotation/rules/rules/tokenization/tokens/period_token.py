@@ -0,0 +1,56 @@
+from polog.handlers.file.rotation.rules.rules.tokenization.tokens.abstractions.abstract_token import AbstractToken
+
+
+class PeriodToken(AbstractToken):
+    """
+    Токен единицы измерения времени: секунды, минуты, часы и т. д.
+    Значение токена - количество секунд в единице измерения.
+    """
+    regexp_letter = 'p'
+
+    # Сокращения названий единиц измерения времени.
+    short_periods = {
+        'sec': 1,
+        'secs': 1,
+        'min': 60,
+        'mins': 60,
+        'h': 60 * 60,
+        'hr': 60 * 60,
+        'hrs': 60 * 60,
+    }
+    # Полные названия единиц измерения времени.
+    full_periods = {
+        'second': 1,
+        'minute': 60,
+        'hour': 60 * 60,
+        'day': 60 * 60 * 24,
+        'week': 60 * 60 * 24 * 7,
+    }
+
+    @classmethod
+    def its_me(cls, chunk):
+        """
+        Если подстрока chunk находится в полном списке возможных названий единиц времени - возвращаем True.
+        """
+        return chunk in cls.get_all_keys()
+
+    def parse(self):
+        """
+        Берем строку self.source и достаем из словарей self.short_periods и self.full_periods соответствующее число секунд.
+        """
+        if self.source in self.short_periods:
+            return self.short_periods[self.source]
+        elif self.source in self.full_periods:
+            return self.full_periods[self.source]
+        if self.source.endswith('s'):
+            return self.full_periods[self.source[:-1]]
+
+    @classmethod
+    def get_all_keys(cls):
+        """
+        Возвращаем список всех ключей из словарей cls.short_periods и cls.full_periods, а также ключей из cls.full_periods с постфиксами 's'.
+        """
+        result = [x for x in cls.short_periods.keys()]
+        result.extend([x for x in cls.full_periods.keys()])
+        result.extend([f'{x}s' for x in cls.full_periods.keys()])
+        return result
@@ -0,0 +1,32 @@
+import datetime
+
+from polog.handlers.file.rotation.rules.rules.tokenization.tokens.abstractions.abstract_token import AbstractToken
+
+
+class TimeToken(AbstractToken):
+    """
+    Токен времени суток в формате 'ЧЧ:ММ' или 'ЧЧ:ММ:СС', например '04:30'.
+    Значение токена - объект datetime.time.
+    """
+    regexp_letter = 't'
+
+    @classmethod
+    def its_me(cls, chunk):
+        try:
+            cls.parse_time(chunk)
+            return True
+        except Exception:
+            return False
+
+    def parse(self):
+        return self.parse_time(self.source)
+
+    @staticmethod
+    def parse_time(chunk):
+        """
+        Разбираем строку со временем. Если формат неправильный, поднимается исключение.
+        """
+        parts = chunk.split(':')
+        if len(parts) not in (2, 3) or not all(len(x) == 2 and x.isdigit() for x in parts):
+            raise ValueError(f'"{chunk}" is not a time in HH:MM or HH:MM:SS format.')
+        return datetime.time(*(int(x) for x in parts))
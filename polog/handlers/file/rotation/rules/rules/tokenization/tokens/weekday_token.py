@@ -0,0 +1,22 @@
+from polog.handlers.file.rotation.rules.rules.tokenization.tokens.abstractions.abstract_token import AbstractToken
+
+
+class WeekdayToken(AbstractToken):
+    """
+    Токен дня недели. Значение токена - номер дня недели, как его возвращает datetime.datetime.weekday(): 0 - понедельник, 6 - воскресенье.
+    """
+    regexp_letter = 'w'
+
+    # Полные названия дней недели.
+    full_weekdays = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+    # Сокращения названий дней недели.
+    short_weekdays = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+
+    @classmethod
+    def its_me(cls, chunk):
+        return chunk in cls.full_weekdays or chunk in cls.short_weekdays
+
+    def parse(self):
+        if self.source in self.full_weekdays:
+            return self.full_weekdays.index(self.source)
+        return self.short_weekdays.index(self.source)
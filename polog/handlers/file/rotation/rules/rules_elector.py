@@ -1,11 +1,14 @@
 from polog.handlers.file.rotation.rules.rules.file_size_rule import FileSizeRule
+from polog.handlers.file.rotation.rules.rules.period_rule import PeriodRule
+from polog.handlers.file.rotation.rules.rules.date_time_rule import DateTimeRule
+from polog.handlers.file.rotation.rules.rules.number_rule import NumberRule
 
 
 class RulesElector:
     """
     Класс для распознавания правил, представленных в виде строк, и преобразования их в функциональные объекты.
     """
-    def __init__(self, file, rules=[FileSizeRule]):
+    def __init__(self, file, rules=[FileSizeRule, PeriodRule, DateTimeRule, NumberRule]):
         self.file = file
         self.rules = rules
 
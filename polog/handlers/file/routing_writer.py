@@ -0,0 +1,206 @@
+import os
+import time
+import inspect
+from threading import Lock
+from functools import partial
+from collections import OrderedDict
+
+from polog.handlers.abstract.base import BaseHandler
+from polog.handlers.file.writer import file_writer
+from polog.handlers.file.path_template import PathTemplate
+from polog.handlers.file.base_formatter import BaseFormatter
+from polog.handlers.file.shared_file_wrappers import SharedFileWrappers
+from polog.handlers.file.rotation.rotator import Rotator
+from polog.handlers.file.rotation.background_worker import BackgroundWorker
+from polog.core.utils.exception_escaping import exception_escaping
+
+
+class routing_file_writer(BaseHandler):
+    """
+    Обработчик, который раскладывает логи по разным файлам в зависимости от значений полей лога.
+
+    Путь к файлу задается шаблоном (см. PathTemplate), который вычисляется для каждого лога:
+
+    >>> config.add_handlers(routing_file_writer('logs/{service_name}/{level}.log', rotation='100 mb >> archive'))
+
+    Для каждого пути "под капотом" создается свой файловый обработчик (см. file_writer) - со своей оберткой над файлом, блокировками и ротатором. Все именованные аргументы, кроме собственных аргументов этого класса, передаются в file_writer. Директории из пути создаются автоматически.
+
+    Открытые файловые обработчики хранятся в словаре, упорядоченном по времени последнего использования (LRU). Чтобы не исчерпать лимит файловых дескрипторов, открыто одновременно не больше max_open_files файлов: при превышении лимита закрывается файл, в который дольше всего не писали. Кроме того, закрываются файлы, в которые не писали дольше idle_timeout секунд (проверяется при записи логов, не чаще раза в IDLE_CHECK_INTERVAL секунд). Закрытый файл при следующей записи откроется снова.
+
+    Если несколько таких обработчиков с одинаковыми настройками ротации пишут в один и тот же файл, обертка над ним (т. е. файловый дескриптор и блокировки) и ротатор у них общие (см. SharedFileWrappers). Фоновый поток для сжатия и удаления ротированных файлов тоже один на весь обработчик.
+    """
+
+    # Аргументы file_writer, которые нельзя передать в этот обработчик.
+    FORBIDDEN_OPTIONS = ('file_wrapper', 'mmap_segment_size', 'only_errors', 'filter', 'alt')
+    IDLE_CHECK_INTERVAL = 1.0
+    # Аргументы file_writer, от которых зависит ротация. Обработчики, у которых они различаются, не делят обертку над файлом (см. SharedFileWrappers).
+    ROTATION_OPTIONS = ('rotation', 'compression', 'retention', 'stream_compression')
+
+    input_proves = {
+        **file_writer.input_proves,
+        'template': lambda x: isinstance(x, str) and bool(x.strip()),
+        'max_open_files': lambda x: isinstance(x, int) and not isinstance(x, bool) and x > 0,
+        'idle_timeout': lambda x: x is None or ((isinstance(x, int) or isinstance(x, float)) and not isinstance(x, bool) and x > 0),
+    }
+
+    def __init__(self, template, max_open_files=128, idle_timeout=60, only_errors=False, filter=None, alt=None, **options):
+        """
+        template - шаблон пути к файлу.
+        max_open_files - максимальное количество одновременно открытых файлов.
+        idle_timeout - через сколько секунд без записи файл закрывается. None - не закрывать.
+        options - аргументы для file_writer.
+        """
+        super().__init__(only_errors=only_errors, filter=filter, alt=alt)
+        self.check_options(options)
+        self.do_input_proves(template=template, max_open_files=max_open_files, idle_timeout=idle_timeout, **options)
+        self.template = PathTemplate(template)
+        self.max_open_files = max_open_files
+        self.idle_timeout = idle_timeout
+        self.options = self.get_writer_options(options)
+        self.file_wrapper = partial(SharedFileWrappers.acquire, group=tuple(options.get(name) for name in self.ROTATION_OPTIONS))
+        self.formatter = self.get_formatter(options)
+        # Путь к файлу -> Route. От давно не использованных к недавним.
+        self.routes = OrderedDict()
+        self.lock = Lock()
+        self.next_idle_check = time.monotonic() + self.IDLE_CHECK_INTERVAL
+
+    def check_options(self, options):
+        """
+        Проверяем, что все переданные аргументы есть у file_writer и не входят в число запрещенных (FORBIDDEN_OPTIONS).
+        """
+        parameters = inspect.signature(file_writer.__init__).parameters
+        for name in options:
+            if name not in parameters or name in self.FORBIDDEN_OPTIONS or parameters[name].kind is inspect.Parameter.VAR_POSITIONAL:
+                raise ValueError(f'The argument "{name}" is not supported by the routing file handler.')
+
+    def get_writer_options(self, options):
+        """
+        Получаем аргументы для создания файловых обработчиков.
+
+        Если включено сжатие или удаление старых ротированных файлов, все ротаторы получают один общий фоновый поток (см. BackgroundWorker), чтобы не создавать по потоку на каждый файл. Кроме того, у них общие компрессоры и объекты Retention (см. аргумент cache у Rotator): иначе при каждом повторном открытии файла фоновый поток заново сканировал бы одни и те же директории с ротированными файлами. Ротаторы создаются под блокировкой обработчика (см. .acquire()), так что общий словарь с ними защищен.
+
+        Ротатор каждого файла создается один на всех пользователей общей обертки над ним (см. SharedFileWrappers.get_rotator()).
+        """
+        options = dict(options)
+        rotator = options.get('rotator', Rotator)
+        if 'rotator' not in options and (options.get('compression') is not None or options.get('retention') is not None):
+            rotator = partial(Rotator, worker=BackgroundWorker(), cache={})
+        options['rotator'] = partial(SharedFileWrappers.get_rotator, rotator)
+        return options
+
+    def get_formatter(self, options):
+        """
+        Получаем функцию, которая превращает лог в строку. Она та же, что использовал бы file_writer с теми же аргументами, поэтому лог форматируется один раз - до того, как станет известно, в какой файл он будет записан.
+        """
+        formatter = options.get('formatter')
+        if callable(formatter):
+            return formatter
+        return options.get('base_formatter', BaseFormatter)(options.get('separator', '\n')).get_formatted_string
+
+    def get_content(self, log):
+        """
+        Вычисляем путь к файлу и форматируем лог.
+        """
+        path = self.template(log)
+        if not path:
+            raise ValueError('The path to the log file is empty.')
+        return os.path.normpath(path), self.formatter(log)
+
+    def do(self, content):
+        """
+        Записываем лог в файл через обработчик, который соответствует пути.
+        """
+        path, content = content
+        route = self.acquire(path)
+        try:
+            route.writer.do(content)
+        finally:
+            self.release(route)
+
+    def acquire(self, path):
+        """
+        Получаем объект маршрута для пути (при необходимости - открываем файл) и отмечаем, что он используется.
+
+        Файлы, которые при этом нужно закрыть (см. описание класса), закрываются уже после того, как отпущена блокировка.
+        """
+        now = time.monotonic()
+        to_close = []
+        with self.lock:
+            route = self.routes.get(path)
+            if route is None:
+                route = Route(self.create_writer(path))
+                self.routes[path] = route
+                while len(self.routes) > self.max_open_files:
+                    self.evict(next(iter(self.routes)), to_close)
+            else:
+                self.routes.move_to_end(path)
+            route.users += 1
+            route.last_used = now
+            if self.idle_timeout is not None and now >= self.next_idle_check:
+                self.next_idle_check = now + self.IDLE_CHECK_INTERVAL
+                while True:
+                    old_path, old_route = next(iter(self.routes.items()))
+                    if now - old_route.last_used < self.idle_timeout:
+                        break
+                    self.evict(old_path, to_close)
+        for old_route in to_close:
+            self.close_route(old_route)
+        return route
+
+    def release(self, route):
+        """
+        Отмечаем, что запись в файл закончена. Если маршрут за это время был вытеснен и больше никем не используется, закрываем файл.
+        """
+        with self.lock:
+            route.users -= 1
+            close = route.evicted and not route.users
+        if close:
+            self.close_route(route)
+
+    def evict(self, path, to_close):
+        """
+        Убираем маршрут из словаря открытых. Если прямо сейчас в файл никто не пишет, он добавляется в список to_close, иначе файл закроет тот, кто закончит запись последним (см. .release()). Вызывать только под блокировкой.
+        """
+        route = self.routes.pop(path)
+        route.evicted = True
+        if not route.users:
+            to_close.append(route)
+
+    def create_writer(self, path):
+        """
+        Создаем файловый обработчик для пути. Обертка над файлом и ротатор берутся из общего реестра (см. SharedFileWrappers).
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return file_writer(path, file_wrapper=self.file_wrapper, **self.options)
+
+    @staticmethod
+    def close_route(route):
+        """
+        Закрываем файл маршрута: сбрасываем буферы и освобождаем общую обертку над файлом.
+        """
+        exception_escaping(route.writer.file.close)()
+
+    def close(self):
+        """
+        Закрываем все открытые файлы.
+        """
+        to_close = []
+        with self.lock:
+            for path in list(self.routes):
+                self.evict(path, to_close)
+        for route in to_close:
+            self.close_route(route)
+
+
+class Route:
+    """
+    Открытый файл обработчика с маршрутизацией: файловый обработчик и сведения о его использовании.
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.users = 0
+        self.last_used = None
+        self.evicted = False
@@ -0,0 +1,79 @@
+import os
+import mmap
+
+
+class SegmentReader:
+    """
+    Чтение файлов с логами, записанных в режиме отображения в память (см. MmapFileWrapper).
+
+    Пока такой файл открыт на запись, он имеет размер целого сегмента, а все, что дальше последнего записанного лога, заполнено нулевыми байтами. При штатном закрытии файл обрезается до реальной длины данных, но если программа завершилась аварийно, "хвост" из нулей остается. Более того, при сбое ОС или отключении питания на диск могут успеть попасть не все страницы памяти - тогда последний лог может оказаться оборванным, а в конце данных могут оказаться куски, заполненные нулями.
+
+    Читатель устойчив к такому "рваному хвосту":
+    1. Нулевые байты в конце файла отбрасываются (см. .get_valid_length()).
+    2. Последний лог, после которого нет разделителя, считается недописанным и пропускается.
+    3. Чтение останавливается на первом логе, в котором встретился нулевой байт: это признак того, что дальше данные повреждены.
+
+    Итерация по объекту возвращает логи по одному, в виде строк без разделителя:
+
+    >>> for line in SegmentReader('file.log'):
+    ...     print(line)
+    """
+
+    # Размер куска, которыми файл просматривается с конца в поисках последнего ненулевого байта.
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, path, separator='\n'):
+        """
+        path - путь к файлу.
+        separator - разделитель между логами, тот же, что был у файлового обработчика.
+        """
+        if not isinstance(separator, str) or not separator:
+            raise ValueError('The separator must be a non-empty string.')
+        self.path = path
+        self.separator = separator.encode('utf-8')
+
+    def __repr__(self):
+        return f'SegmentReader({self.path!r})'
+
+    def __iter__(self):
+        """
+        Читаем логи по одному. Файл отображается в память только на чтение, так что его размер не важен.
+        """
+        with open(self.path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            if not size:
+                return
+            with mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ) as data:
+                length = self.get_valid_length(data, size)
+                position = 0
+                while True:
+                    end = data.find(self.separator, position, length)
+                    if end == -1:
+                        return
+                    record = data[position:end]
+                    if b'\0' in record:
+                        return
+                    yield record.decode('utf-8', errors='replace')
+                    position = end + len(self.separator)
+
+    def read(self):
+        """
+        Все целые логи из файла списком.
+        """
+        return list(self)
+
+    @classmethod
+    def get_valid_length(cls, data, size):
+        """
+        Длина данных без нулевых байт в конце. data - байты (или объект mmap) длиной size.
+
+        Файл просматривается с конца кусками по CHUNK_SIZE байт, поэтому для файла, который был записан почти до конца сегмента, это быстро.
+        """
+        position = size
+        while position > 0:
+            start = max(0, position - cls.CHUNK_SIZE)
+            chunk = data[start:position].rstrip(b'\0')
+            if chunk:
+                return start + len(chunk)
+            position = start
+        return 0
@@ -0,0 +1,105 @@
+import os
+from threading import Lock
+from functools import partial
+
+from polog.handlers.file.file_dependency_wrapper import FileDependencyWrapper
+
+
+class SharedFileWrappers:
+    """
+    Реестр оберток над файлами (см. FileDependencyWrapper), общих для всех обработчиков, которые пишут в один и тот же файл.
+
+    Обработчики с маршрутизацией (см. routing_file_writer) могут открывать одни и те же файлы. Если бы каждый из них открывал файл сам, на один файл приходилось бы несколько файловых дескрипторов с независимыми буферами и блокировками потока, а записи из разных обработчиков могли бы перемешиваться. Вместо этого обертка над файлом создается один раз и выдается всем, кто запросил тот же файл с теми же настройками (см. .acquire()). Когда обертку освобождает последний из них, файл закрывается.
+
+    Вместе с оберткой общим должен быть и ротатор (см. .get_rotator()). Если бы у каждого обработчика был свой, их счетчики строк и границы периодов расходились бы, а после ротации, выполненной одним из них, другие не смогли бы это заметить (общая обертка уже переоткрыта, см. FileDependencyWrapper.is_replaced()) и ротировали бы новый файл еще раз. Поэтому настройки ротации входят в ключ (аргумент group у .acquire()): обработчики с разными настройками получают разные обертки и ротируют файл совместно, как это делают разные процессы.
+    """
+
+    # Ключ (абсолютный путь к файлу, вид блокировок, дополнительные настройки, группа) -> [обертка, количество пользователей, ротатор].
+    wrappers = {}
+    lock = Lock()
+
+    @classmethod
+    def acquire(cls, file, lock_type, group=(), **options):
+        """
+        Получаем обертку над файлом. Сигнатура такая же, как у FileDependencyWrapper, поэтому метод можно передать в file_writer в качестве аргумента file_wrapper.
+
+        group - хэшируемое значение (например, кортеж с настройками ротации), которое дополнительно входит в ключ: обертку делят только те, кто передал одинаковые значения.
+
+        Каждый вызов возвращает отдельный объект SharedFileWrapper, который нужно закрыть (.close()), когда он больше не нужен.
+        """
+        if len(file) != 1 or not isinstance(file[0], str):
+            raise ValueError('Only files specified by the path can be shared between handlers.')
+        key = (os.path.abspath(file[0]), lock_type, tuple(sorted(options.items())), group)
+        with cls.lock:
+            entry = cls.wrappers.get(key)
+            if entry is None:
+                entry = [FileDependencyWrapper([file[0]], lock_type, **options), 0, None]
+                cls.wrappers[key] = entry
+            entry[1] += 1
+        return SharedFileWrapper(entry[0], partial(cls.release, key), partial(cls.get_shared_rotator, key))
+
+    @classmethod
+    def get_shared_rotator(cls, key, create):
+        """
+        Получаем ротатор, общий для всех пользователей обертки. Если его еще нет, он создается функцией create без аргументов.
+        """
+        with cls.lock:
+            entry = cls.wrappers[key]
+            if entry[2] is None:
+                entry[2] = create()
+            return entry[2]
+
+    @staticmethod
+    def get_rotator(rotator, source_string, file, **options):
+        """
+        Фабрика ротаторов для file_writer (аргумент rotator, частично примененный к исходной фабрике rotator): ротатор создается только для первого пользователя общей обертки, остальные получают тот же самый.
+
+        Ротатор остается привязанным к файловому объекту обработчика, который его создал (например, к его BufferedFileWrapper). Закрытие этого обработчика ротатору не мешает: после закрытия такой объект продолжает проксировать вызовы к общей обертке.
+        """
+        return file.get_shared_rotator(partial(rotator, source_string, file, **options))
+
+    @classmethod
+    def release(cls, key):
+        """
+        Освобождаем обертку. Файл закрывается, если у него не осталось пользователей.
+        """
+        with cls.lock:
+            entry = cls.wrappers[key]
+            entry[1] -= 1
+            if entry[1]:
+                return
+            del cls.wrappers[key]
+        entry[0].close()
+
+
+class SharedFileWrapper:
+    """
+    Ссылка на общую обертку над файлом, выданная реестром (см. SharedFileWrappers.acquire()).
+
+    Все атрибуты и методы проксируются к общей обертке, кроме .close(): он не закрывает файл, а только сообщает реестру, что этот пользователь обертку освободил.
+    """
+
+    def __init__(self, file, release, get_shared_rotator):
+        """
+        file - общая обертка над файлом.
+        release - функция, освобождающая обертку в реестре.
+        get_shared_rotator - функция, возвращающая общий ротатор (см. SharedFileWrappers.get_shared_rotator()).
+        """
+        self.wrapped_file = file
+        self.release = release
+        self.get_shared_rotator = get_shared_rotator
+        self.closed = False
+
+    def __getattr__(self, name):
+        """
+        Все, что не переопределено здесь, берем у общей обертки.
+        """
+        return getattr(self.wrapped_file, name)
+
+    def close(self):
+        """
+        Освобождаем общую обертку. Повторные вызовы ничего не делают.
+        """
+        if not self.closed:
+            self.closed = True
+            self.release()
@@ -0,0 +1,296 @@
+import re
+from string import Formatter
+
+from polog.core.stores.levels import Levels
+from polog.handlers.file.base_formatter_fields_extractors import BaseFormatterFieldsExtractors
+
+
+class TemplateFormatter:
+    """
+    Форматтер для файлового обработчика, который собирает строку лога по шаблону.
+
+    Шаблон - это строка с подстановками в фигурных скобках, по синтаксису как у str.format():
+
+    >>> formatter = TemplateFormatter('{time:%H:%M:%S} | {level:^8} | {message}[[ | result: {result}]]')
+    >>> file_writer('file.log', formatter=formatter)
+
+    1. {field} - значение поля лога с названием field. Если такого поля в логе нет, подставляется пустая строка.
+    2. {field:spec} - то же самое, но к значению применяется спецификация формата (ширина, выравнивание и т. д., см. https://docs.python.org/3/library/string.html#formatspec).
+    3. [[...]] - условная секция. Она выводится, только если все поля, которые в ней упоминаются, в логе есть. Вложенные секции не поддерживаются.
+    4. {{, }}, [[[ и ]]] - экранирование: они выводятся как "{", "}", "[[" и "]]" соответственно.
+
+    Некоторые поля перед подстановкой приводятся к человекочитаемому виду так же, как это делает стандартный форматтер, только без префиксов вроде "result: " (см. .get_field_getters()). Остальные поля подставляются как есть.
+
+    Шаблон разбирается и проверяется один раз, при создании форматтера. Из него генерируется исходный код специализированной функции, которая затем компилируется. Таким образом, форматирование каждого лога - это один вызов функции, без обхода словарей с обработчиками полей и склеивания кусочков.
+    """
+
+    SECTION_PATTERN = re.compile(r'\[\[\[|\]\]\]|\[\[|\]\]')
+    SIMPLE_FORMAT_SPEC = re.compile(r'[\w<>=^+\- #,.%:]*')
+    # Допустимые конверсии: {field!s}, {field!r} и {field!a}. None - конверсии нет.
+    CONVERSIONS = (None, 's', 'r', 'a')
+
+    def __init__(self, template, separator='\n'):
+        """
+        template - строка с шаблоном.
+        separator - разделитель между строками логов, добавляется в конец каждой строки.
+        """
+        if not isinstance(template, str):
+            raise ValueError(f'The template must be a string, not {type(template).__name__}.')
+        if not isinstance(separator, str):
+            raise ValueError(f'The separator must be a string, not {type(separator).__name__}.')
+        self.template = template
+        self.separator = separator
+        self.cache_key = (type(self), template, separator)
+        self.source = self.generate_source(self.parse(template))
+        self.render = self.compile(self.source)
+
+    def __repr__(self):
+        return f'TemplateFormatter({self.template!r}, separator={self.separator!r})'
+
+    def __call__(self, log):
+        """
+        Форматирование лога.
+
+        Готовая строка кэшируется в объекте лога (см. LogItem.get_rendered()), так что несколько обработчиков с одинаковыми шаблонами отформатируют лог только один раз.
+        """
+        try:
+            get_rendered = log.get_rendered
+        except AttributeError:
+            return self.render(log)
+        return get_rendered(self.cache_key, self.render)
+
+    @classmethod
+    def parse(cls, template):
+        """
+        Разбираем шаблон на части.
+
+        Возвращается список, каждый элемент которого - либо кортеж (строка, название поля, спецификация формата, конверсия), как их возвращает string.Formatter().parse(), либо список таких кортежей - условная секция.
+        """
+        result = []
+        section = None
+        position = 0
+        for match in cls.SECTION_PATTERN.finditer(template):
+            token = match.group()
+            text = template[position:match.start()]
+            position = match.end()
+            if token in ('[[[', ']]]'):
+                cls.add_text(result if section is None else section, text + token[:2])
+                continue
+            cls.add_text(result if section is None else section, text)
+            if token == '[[':
+                if section is not None:
+                    raise ValueError(f'Nested conditional sections are not supported. Template: "{template}".')
+                section = []
+            else:
+                if section is None:
+                    raise ValueError(f'Closing "]]" without opening "[[". Template: "{template}".')
+                result.append(section)
+                section = None
+        if section is not None:
+            raise ValueError(f'The conditional section is not closed. Template: "{template}".')
+        cls.add_text(result, template[position:])
+        return result
+
+    @classmethod
+    def add_text(cls, parts, text):
+        """
+        Разбираем кусок шаблона без условных секций и добавляем его элементы в список parts.
+        """
+        for literal, field_name, format_spec, conversion in Formatter().parse(text):
+            if field_name is not None:
+                if not field_name.isidentifier():
+                    raise ValueError(f'The field name in the template must be a valid identifier, not "{field_name}".')
+                if '{' in format_spec:
+                    raise ValueError(f'Nested fields in the format specification are not supported: "{format_spec}".')
+                if conversion not in cls.CONVERSIONS:
+                    raise ValueError(f'Unknown conversion "!{conversion}" for the field "{field_name}" in the template. Available conversions: !s, !r, !a.')
+            parts.append((literal, field_name, format_spec, conversion))
+
+    def generate_source(self, parts):
+        """
+        Генерируем исходный код функции, которая форматирует лог.
+
+        Для шаблона '{level:^8} | {message}[[ | {result}]]' получится примерно следующее:
+
+        def render(log):
+            try:
+                v0 = g0(log)
+            except Exception:
+                v0 = fallback(log, 'level')
+            ...
+            try:
+                p0 = m0 if v0 is None else f'{v0:^8}'
+            except Exception:
+                p0 = str(v0)
+            ...
+            s0 = f' | {p2}' if v2 is not None else ''
+            return f'{p0} | {p1}{s0}\\n'
+
+        Здесь v - значения полей (каждое поле извлекается из лога один раз, даже если упоминается в шаблоне несколько раз), p - отформатированные подстановки, s - условные секции. m - заранее вычисленные заглушки для отсутствующих полей: пустые строки, дополненные пробелами до ширины, указанной в спецификации формата (чтобы не "ломать" колонки).
+        """
+        self.names = []
+        self.namespace = {'fallback': self.fallback}
+        placeholders = []
+        sections = []
+        expression = []
+
+        for part in parts:
+            if isinstance(part, list):
+                indexes = []
+                section_expression = []
+                for literal, field_name, format_spec, conversion in part:
+                    section_expression.append(self.escape(literal))
+                    if field_name is not None:
+                        indexes.append(self.get_index(field_name))
+                        section_expression.append(self.add_placeholder(placeholders, field_name, format_spec, conversion))
+                condition = ' and '.join(f'v{index} is not None' for index in indexes) or 'True'
+                sections.append(f"    s{len(sections)} = f{''.join(section_expression)!r} if {condition} else ''")
+                expression.append(f'{{s{len(sections) - 1}}}')
+            else:
+                literal, field_name, format_spec, conversion = part
+                expression.append(self.escape(literal))
+                if field_name is not None:
+                    expression.append(self.add_placeholder(placeholders, field_name, format_spec, conversion))
+        expression.append(self.escape(self.separator))
+
+        body = []
+        for index, field_name in enumerate(self.names):
+            self.namespace[f'g{index}'] = self.get_field_getter(field_name)
+            body.append('    try:')
+            body.append(f'        v{index} = g{index}(log)')
+            body.append('    except Exception:')
+            body.append(f'        v{index} = fallback(log, {field_name!r})')
+
+        lines = ['def render(log):'] + body + placeholders + sections + [f"    return f{''.join(expression)!r}"]
+        return '\n'.join(lines)
+
+    def compile(self, source):
+        """
+        Компилируем сгенерированный исходный код и получаем из него функцию.
+        """
+        namespace = self.namespace
+        exec(compile(source, f'<TemplateFormatter {self.template!r}>', 'exec'), namespace)
+        return namespace['render']
+
+    def get_index(self, field_name):
+        """
+        Получаем номер переменной, в которую будет сохранено значение поля.
+        """
+        if field_name not in self.names:
+            self.names.append(field_name)
+        return self.names.index(field_name)
+
+    def add_placeholder(self, placeholders, field_name, format_spec, conversion):
+        """
+        Генерируем код форматирования одной подстановки и добавляем его в список placeholders. Возвращается кусок f-строки, куда будет вставлен результат.
+
+        Если значение поля не удалось отформатировать по спецификации (например, к строке применен формат даты), подставляется просто строковое представление значения.
+        """
+        index = self.get_index(field_name)
+        number = len(placeholders) // 4
+        value = f'v{index}'
+        if conversion:
+            value = f'{value}!{conversion}'
+        if format_spec:
+            if self.SIMPLE_FORMAT_SPEC.fullmatch(format_spec):
+                value = f'{value}:{format_spec}'
+            else:
+                self.namespace[f'f{number}'] = format_spec
+                value = f'{value}:{{f{number}}}'
+        self.namespace[f'm{number}'] = self.get_missing_value(format_spec)
+        formatted = f'{{{value}}}'
+        formatted = self.wrap_placeholder(f'f{formatted!r}')
+        fallback = self.wrap_placeholder(f'str(v{index})')
+        placeholders.append('    try:')
+        placeholders.append(f'        p{number} = m{number} if v{index} is None else {formatted}')
+        placeholders.append('    except Exception:')
+        placeholders.append(f'        p{number} = {fallback}')
+        return f'{{p{number}}}'
+
+    def wrap_placeholder(self, expression):
+        """
+        Получаем выражение, которое будет подставлено в сгенерированный код вместо выражения expression, вычисляющего отформатированное значение поля.
+        Здесь выражение не меняется. Наследники могут переопределить метод, чтобы дополнительно обработать значения всех подстановок (см., например, PathTemplate).
+        """
+        return expression
+
+    @staticmethod
+    def get_missing_value(format_spec):
+        """
+        Получаем заглушку для отсутствующего поля: пустую строку, отформатированную по той же спецификации (т. е. дополненную до нужной ширины). Если спецификация к строкам неприменима, заглушкой будет просто пустая строка.
+        """
+        try:
+            return format('', format_spec)
+        except Exception:
+            return ''
+
+    @staticmethod
+    def escape(text):
+        """
+        Экранируем фигурные скобки для вставки текста в f-строку.
+        """
+        return text.replace('{', '{{').replace('}', '}}')
+
+    @staticmethod
+    def fallback(log, field_name):
+        """
+        Если функция, извлекающая поле, упала, в шаблон подставляется строковое представление поля как есть.
+        """
+        try:
+            value = log.get(field_name)
+        except Exception:
+            return None
+        if value is None:
+            return None
+        return str(value)
+
+    def get_field_getter(self, field_name):
+        """
+        Получаем функцию, которая достает из лога значение поля для подстановки в шаблон. Если функция возвращает None, поле считается отсутствующим.
+        """
+        getters = self.get_field_getters()
+        if field_name in getters:
+            return getters[field_name]
+        return lambda log: log.get(field_name)
+
+    @classmethod
+    def get_field_getters(cls):
+        """
+        Функции для полей, которые перед подстановкой в шаблон приводятся к человекочитаемому виду.
+
+        Для большинства из них используются обработчики полей стандартного форматтера (см. BaseFormatterFieldsExtractors), с которых срезаются префиксы.
+        """
+        return {
+            'level': cls.level,
+            'success': BaseFormatterFieldsExtractors.success,
+            'auto': BaseFormatterFieldsExtractors.auto,
+            'function': cls.without_prefix(BaseFormatterFieldsExtractors.function, 'where: '),
+            'input_variables': cls.without_prefix(BaseFormatterFieldsExtractors.input_variables, 'input variables: '),
+            'local_variables': cls.without_prefix(BaseFormatterFieldsExtractors.local_variables, 'local variables: '),
+            'result': cls.without_prefix(BaseFormatterFieldsExtractors.result, 'result: '),
+            'exception': cls.without_prefix(BaseFormatterFieldsExtractors.exception, 'exception: '),
+            'traceback': cls.without_prefix(BaseFormatterFieldsExtractors.traceback, 'traceback: '),
+        }
+
+    @staticmethod
+    def level(log):
+        """
+        Название уровня лога (или число, если у уровня нет названия).
+        """
+        level = log.get('level')
+        if level is None:
+            return None
+        return Levels.get_level_name(level)
+
+    @staticmethod
+    def without_prefix(extractor, prefix):
+        """
+        Оборачиваем обработчик поля стандартного форматтера, чтобы срезать с его результата префикс.
+        """
+        length = len(prefix)
+        def getter(log):
+            result = extractor(log)
+            if result is not None and result.startswith(prefix):
+                return result[length:]
+            return result
+        return getter
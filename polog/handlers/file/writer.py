@@ -1,8 +1,12 @@
 from polog.handlers.abstract.base import BaseHandler
 from polog.core.utils.signature_matcher import SignatureMatcher
 from polog.handlers.file.file_dependency_wrapper import FileDependencyWrapper
+from polog.handlers.file.buffered_file_wrapper import BufferedFileWrapper
+from polog.handlers.file.mmap_file_wrapper import MmapFileWrapper
+from polog.handlers.file.compressed_file_wrapper import CompressedFileWrapper
 from polog.handlers.file.base_formatter import BaseFormatter
 from polog.handlers.file.rotation.rotator import Rotator
+from polog.handlers.file.rotation.compressor import Compressor
 from polog.core.utils.exception_escaping import exception_escaping
 
 
@@ -19,16 +23,55 @@ class file_writer(BaseHandler):
         'separator': lambda x: isinstance(x, str),
         'formatter': lambda x: x is None or SignatureMatcher.is_handler(x),
         'rotation': lambda x: x is None or isinstance(x, str),
+        'compression': lambda x: x is None or x in Compressor.METHODS,
+        'stream_compression': lambda x: x is None or x in CompressedFileWrapper.METHODS,
+        'retention': lambda x: x is None or isinstance(x, str),
+        'buffer_size': lambda x: x is None or (isinstance(x, int) and not isinstance(x, bool) and x > 0),
+        'flush_interval': lambda x: (isinstance(x, int) or isinstance(x, float)) and not isinstance(x, bool) and x > 0,
+        'atomic_append': lambda x: isinstance(x, bool),
+        'mmap_segment_size': lambda x: x is None or (isinstance(x, int) and not isinstance(x, bool) and x > 0),
+        'fsync': lambda x: x in ('never', 'flush') or ((isinstance(x, int) or isinstance(x, float)) and not isinstance(x, bool) and x >= 0),
     }
 
-    def __init__(self, *file, formatter=None, rotation=None, forced_flush=True, separator='\n', only_errors=False, filter=None, alt=None, file_wrapper=FileDependencyWrapper, base_formatter=BaseFormatter, rotator=Rotator, lock_type='thread'):
+    def __init__(self, *file, formatter=None, rotation=None, forced_flush=True, separator='\n', only_errors=False, filter=None, alt=None, file_wrapper=FileDependencyWrapper, base_formatter=BaseFormatter, rotator=Rotator, lock_type='thread', buffer_size=None, flush_interval=0.1, fsync='never', compression=None, retention=None, atomic_append=False, mmap_segment_size=None, stream_compression=None):
+        """
+        Помимо очевидных параметров, можно включить режим буферизации (см. BufferedFileWrapper), передав buffer_size - число байт, при накоплении которых буфер сбрасывается в файл. В этом режиме буфер также сбрасывается не реже, чем раз в flush_interval секунд, а параметр forced_flush не используется. Параметр fsync задает, как часто вызывать os.fsync(): 'never' (никогда), 'flush' (после каждого сброса буфера) или число секунд.
+
+        Параметр compression включает сжатие ротированных файлов в фоновом потоке (см. Compressor): 'gzip', 'bz2' или 'lzma'. Параметр retention - строка с лимитами для ротированных файлов, например '10 files, 5 gb, 30 days' (см. Retention).
+
+        Параметр atomic_append включает режим атомарной дозаписи (см. FileDependencyWrapper.write_atomic()): каждый лог (или пачка логов в режиме буферизации) записывается одним системным вызовом без каких-либо блокировок, в т. ч. при записи в один файл из нескольких процессов.
+
+        Параметр mmap_segment_size включает режим отображения файла в память (см. MmapFileWrapper): файл заранее увеличивается до указанного количества байт, а запись лога - это просто копирование в память. Заполненные сегменты ротируются.
+
+        Параметр stream_compression включает сжатие логов по мере записи (см. CompressedFileWrapper): 'gzip' или 'lzma'. В этом режиме всегда включена буферизация, а при каждом сбросе буфера в файл записывается законченный сжатый поток.
+        """
         super().__init__(only_errors=only_errors, filter=filter, alt=alt)
-        self.do_input_proves(forced_flush=forced_flush, separator=separator, formatter=formatter, rotation=rotation)
-        self.file = file_wrapper([x for x in file], lock_type)
+        self.do_input_proves(forced_flush=forced_flush, separator=separator, formatter=formatter, rotation=rotation, compression=compression, retention=retention, stream_compression=stream_compression, atomic_append=atomic_append, mmap_segment_size=mmap_segment_size, buffer_size=buffer_size, flush_interval=flush_interval, fsync=fsync)
+        self.file = self.get_file_wrapper(file, file_wrapper, lock_type, atomic_append, mmap_segment_size)
+        if stream_compression is not None:
+            if mmap_segment_size is not None or compression is not None:
+                raise ValueError('The stream compression cannot be used together with the memory-mapped mode or with the compression of rotated files.')
+            self.file = CompressedFileWrapper(self.file, stream_compression)
+            if buffer_size is None:
+                buffer_size = CompressedFileWrapper.DEFAULT_BUFFER_SIZE
+        if buffer_size is not None:
+            self.file = BufferedFileWrapper(self.file, buffer_size, flush_interval, fsync)
+            forced_flush = False
         self.forced_flush = forced_flush
         self.base_formatter = base_formatter(separator)
         self.formatter = self.get_formatter(formatter)
-        self.rotator = self.get_rotator(rotator, rotation)
+        self.rotator = self.get_rotator(rotator, rotation, compression, retention)
+
+    def get_file_wrapper(self, file, file_wrapper, lock_type, atomic_append, mmap_segment_size):
+        """
+        Создаем обертку над файлом. В режиме отображения в память вместо file_wrapper используется MmapFileWrapper.
+        """
+        if mmap_segment_size is not None:
+            if atomic_append:
+                raise ValueError('The atomic append mode and the memory-mapped mode cannot be used together.')
+            return MmapFileWrapper([x for x in file], lock_type, mmap_segment_size)
+        wrapper_options = {'atomic_append': True} if atomic_append else {}
+        return file_wrapper([x for x in file], lock_type, **wrapper_options)
 
     def do(self, content):
         """
@@ -74,12 +117,15 @@ class file_writer(BaseHandler):
             return maybe_formatter
         return self.base_formatter_wrapper
 
-    def get_rotator(self, rotator, rotation_rules):
+    def get_rotator(self, rotator, rotation_rules, compression, retention):
         """
         Возвращаем ротатор - объект класса, ответственного за ротацию.
         У ротатора обязан присутствовать метод .maybe_do().
+
+        Параметры сжатия и удаления старых файлов передаются ротатору, только если они заданы, чтобы пользовательские ротаторы не были обязаны их принимать.
         """
-        return rotator(rotation_rules, self.file)
+        options = {key: value for key, value in (('compression', compression), ('retention', retention)) if value is not None}
+        return rotator(rotation_rules, self.file, **options)
 
     def base_formatter_wrapper(self, log):
         """
@@ -1,6 +1,5 @@
 import time
 import inspect
-import datetime
 from functools import wraps
 from collections.abc import Iterable
 
@@ -13,13 +12,16 @@ from polog.core.utils.not_none_to_dict import not_none_to_dict
 from polog.core.utils.get_errors_level import get_errors_level
 from polog.core.utils.exception_to_dict import exception_to_dict
 from polog.core.utils.cut_traceback import cut_traceback
-from polog.utils.json_vars import json_vars, json_one_variable
+from polog.utils.json_vars import vars_to_dict, get_item
 from polog.core.utils.exception_is_suppressed import exception_is_suppressed
 from polog.core.utils.signature_matcher import SignatureMatcher
 from polog.core.utils.get_traceback import get_traceback, get_locals_from_traceback
+from polog.core.utils.call_profiler import CallProfiler
 from polog.errors import IncorrectUseOfTheDecoratorError, HandlerNotFoundError
 from polog.loggers.handle.message import message as _message
 from polog.core.log_item import LogItem
+from polog.core.aggregation.aggregator import Aggregator
+from polog.core.watchdog.watchdog import Watchdog
 from polog.data_structures.trees.named_tree.projector import TreeProjector
 from polog.core.utils.pony_names_generator import PonyNamesGenerator
 from polog.core.stores.fields import in_place_fields, engine_fields
@@ -39,8 +41,10 @@ class FunctionLogger:
         self.global_handlers = handlers
         self.in_place_fields = in_place_fields
         self.engine_fields = engine_fields
+        self.aggregator = Aggregator()
+        self.watchdog = Watchdog()
 
-    def __call__(self, suppress_all, suppressed_exceptions, *args, message=None, level=None, errors_level=None, is_method=False, handlers=None, extra_fields=None, extra_engine_fields=None):
+    def __call__(self, suppress_all, suppressed_exceptions, *args, message=None, level=None, errors_level=None, is_method=False, handlers=None, extra_fields=None, extra_engine_fields=None, slower_than=None, aggregate=None, profile=False, stuck_after=None):
         """
         Фабрика декораторов логирования для функций. Можно вызывать как со скобками, так и без.
         """
@@ -52,6 +56,14 @@ class FunctionLogger:
             raise ValueError('The errors_level of the decorator must be an instance of the str or int.')
         if not isinstance(is_method, bool):
             raise ValueError('The flag "is_method" of the decorator must be an instance of the bool.')
+        if slower_than is not None and (not isinstance(slower_than, (int, float)) or isinstance(slower_than, bool) or slower_than < 0):
+            raise ValueError('The "slower_than" argument of the decorator must be a number (int or float) greater than or equal to zero.')
+        if aggregate is not None and not isinstance(aggregate, bool):
+            raise ValueError('The flag "aggregate" of the decorator must be an instance of the bool.')
+        if not isinstance(profile, bool):
+            raise ValueError('The flag "profile" of the decorator must be an instance of the bool.')
+        if stuck_after is not None and (not isinstance(stuck_after, (int, float)) or isinstance(stuck_after, bool) or stuck_after <= 0):
+            raise ValueError('The "stuck_after" argument of the decorator must be a number (int or float) greater than zero.')
 
         def error_logger(func):
             # Если функция уже ранее была задекорирована, мы декорируем ее саму, а не ее в уже задекорированном виде.
@@ -66,20 +78,36 @@ class FunctionLogger:
                 """
                 _message._clean_context()
                 args_dict = self.get_base_args_dict(func, message)
+                profiler = None
+                start = time.perf_counter_ns()
                 try:
-                    start = time.time()
-                    args_dict['time'] = datetime.datetime.fromtimestamp(start)
-                    result = await func(*args, **kwargs)
+                    args_dict['time'] = time.time()
+                    if profile:
+                        profiler = CallProfiler(args_dict)
+                    coroutine = func(*args, **kwargs)
+                    watching_token = self.start_watching(stuck_after, args_dict, errors_level, level, local_handlers, in_place_fields, engine_fields, coroutine=coroutine)
+                    try:
+                        if profiler is None:
+                            result = await coroutine
+                        else:
+                            result = await profiler.wrap(coroutine)
+                    finally:
+                        if watching_token is not None:
+                            self.watchdog.unregister(watching_token)
                 except Exception as e:
-                    finish = time.time()
-                    self.log_exception_info(e, finish, start, args_dict, errors_level, level, local_handlers, in_place_fields, engine_fields, args, kwargs)
+                    finish = time.perf_counter_ns()
+                    if profiler is not None:
+                        profiler.stop()
+                    self.log_exception_info(e, finish, start, args_dict, errors_level, level, local_handlers, in_place_fields, engine_fields, args, kwargs, aggregate=aggregate)
                     if not suppress_all:
                         if not exception_is_suppressed(e, suppressed_exceptions, self.settings):
                             cut_traceback(self.settings)
                             raise
                     return None
-                finish = time.time()
-                self.log_normal_info(result, finish, start, args_dict, level, local_handlers, in_place_fields, engine_fields, args, kwargs)
+                finish = time.perf_counter_ns()
+                if profiler is not None:
+                    profiler.stop()
+                self.log_normal_info(result, finish, start, args_dict, level, local_handlers, in_place_fields, engine_fields, args, kwargs, slower_than=slower_than, aggregate=aggregate)
                 return result
             @wraps(func)
             def wrapper(*args, **kwargs):
@@ -88,20 +116,32 @@ class FunctionLogger:
                 """
                 _message._clean_context()
                 args_dict = self.get_base_args_dict(func, message)
+                profiler = None
+                start = time.perf_counter_ns()
                 try:
-                    start = time.time()
-                    args_dict['time'] = datetime.datetime.fromtimestamp(start)
-                    result = func(*args, **kwargs)
+                    args_dict['time'] = time.time()
+                    if profile:
+                        profiler = CallProfiler(args_dict)
+                    watching_token = self.start_watching(stuck_after, args_dict, errors_level, level, local_handlers, in_place_fields, engine_fields)
+                    try:
+                        result = func(*args, **kwargs)
+                    finally:
+                        if watching_token is not None:
+                            self.watchdog.unregister(watching_token)
                 except Exception as e:
-                    finish = time.time()
-                    self.log_exception_info(e, finish, start, args_dict, errors_level, level, local_handlers, in_place_fields, engine_fields, args, kwargs)
+                    finish = time.perf_counter_ns()
+                    if profiler is not None:
+                        profiler.stop()
+                    self.log_exception_info(e, finish, start, args_dict, errors_level, level, local_handlers, in_place_fields, engine_fields, args, kwargs, aggregate=aggregate)
                     if not suppress_all:
                         if not exception_is_suppressed(e, suppressed_exceptions, self.settings):
                             cut_traceback(self.settings)
                             raise
                     return None
-                finish = time.time()
-                self.log_normal_info(result, finish, start, args_dict, level, local_handlers, in_place_fields, engine_fields, args, kwargs)
+                finish = time.perf_counter_ns()
+                if profiler is not None:
+                    profiler.stop()
+                self.log_normal_info(result, finish, start, args_dict, level, local_handlers, in_place_fields, engine_fields, args, kwargs, slower_than=slower_than, aggregate=aggregate)
                 return result
             if inspect.iscoroutinefunction(func):
                 result = async_wrapper
@@ -165,54 +205,82 @@ class FunctionLogger:
         arg = getattr(obj, arg_name, None)
         not_none_to_dict(args, key_name, arg)
 
-    def log_exception_info(self, exc, finish, start, args_dict, errors_level, simple_level, handlers, in_place_fields, engine_fields, args, kwargs):
+    def log_exception_info(self, exc, finish, start, args_dict, errors_level, simple_level, handlers, in_place_fields, engine_fields, args, kwargs, aggregate=None):
         """
         Здесь происходит заполнение автоматически извлекаемых полей в случае исключения.
         В т. ч. извлекается вся информация об исключении - название, сообщение и т. д.
+
+        В режиме агрегации (см. .resolve_aggregation()) ошибка учитывается в статистике функции, но лог о ней все равно записывается отдельно.
         """
         if not unlog.get_unlog_status():
+            if self.resolve_aggregation(aggregate):
+                self.aggregator.record(args_dict, self.get_time_of_work(finish, start), False, handlers, simple_level, in_place_fields, engine_fields)
             if not hasattr(exc, 'checked_by_polog') or not self.settings['deduplicate_errors']:
                 exc.checked_by_polog = True
                 errors_level = get_errors_level(errors_level, simple_level)
                 if errors_level >= self.settings['level']:
                     exception_to_dict(args_dict, exc)
                     args_dict['success'] = False
-                    args_dict['traceback'] = get_traceback(cut_string_at_begin=1)
-                    args_dict['local_variables'] = get_locals_from_traceback()
-                    args_dict['time_of_work'] = finish - start
+                    args_dict['traceback'] = get_traceback(cut_string_at_begin=1, serialize=False)
+                    args_dict['local_variables'] = get_locals_from_traceback(serialize=False)
+                    args_dict['time_of_work'] = self.get_time_of_work(finish, start)
                     args_dict['level'] = errors_level
                     service_name = self.settings['service_name']
                     if service_name is not None:
                         args_dict['service_name'] = service_name
-                    input_variables = json_vars(*args, **kwargs)
+                    input_variables = vars_to_dict(*args, **kwargs)
                     _message._copy_context(args_dict)
                     if not (input_variables is None):
                         args_dict['input_variables'] = input_variables
                     log = self.create_log_item(args, kwargs, args_dict, handlers, engine_fields, in_place_fields)
                     self.engine.write(log)
 
-    def log_normal_info(self, result, finish, start, args_dict, level, handlers, in_place_fields, engine_fields, args, kwargs):
+    def log_normal_info(self, result, finish, start, args_dict, level, handlers, in_place_fields, engine_fields, args, kwargs, slower_than=None, aggregate=None):
         """
         Заполнение автоматических полей в случае, когда исключения не было.
+
+        Если вызов функции оказался быстрее порога slower_than (см. .resolve_slowness_threshold()), лог не создается вовсе - ни сериализации аргументов, ни объекта лога, ни обращения к движку.
+        В режиме агрегации (см. .resolve_aggregation()) вызов только учитывается в статистике функции, отдельный лог также не создается.
         """
         if not unlog.get_unlog_status():
+            if self.resolve_aggregation(aggregate):
+                _message._clean_context()
+                self.aggregator.record(args_dict, self.get_time_of_work(finish, start), True, handlers, level, in_place_fields, engine_fields)
+                return
             level = self.resolve_normal_level(level)
 
             if level >= self.settings['level']:
+                time_of_work = self.get_time_of_work(finish, start)
+                if time_of_work < self.resolve_slowness_threshold(slower_than, level):
+                    # Сообщение, переданное через message() изнутри функции, не должно "утечь" в лог внешней задекорированной функции.
+                    _message._clean_context()
+                    return
                 args_dict['success'] = True
-                args_dict['result'] = json_one_variable(result)
-                args_dict['time_of_work'] = finish - start
+                args_dict['result'] = get_item(result)
+                args_dict['time_of_work'] = time_of_work
                 args_dict['level'] = level
                 service_name = self.settings['service_name']
                 if service_name is not None:
                     args_dict['service_name'] = service_name
                 _message._copy_context(args_dict)
-                input_variables = json_vars(*args, **kwargs)
+                input_variables = vars_to_dict(*args, **kwargs)
                 if not (input_variables is None):
                     args_dict['input_variables'] = input_variables
                 log = self.create_log_item(args, kwargs, args_dict, handlers, engine_fields, in_place_fields)
                 self.engine.write(log)
 
+    @staticmethod
+    def get_time_of_work(finish, start):
+        """
+        Вычисляем длительность работы функции в секундах.
+
+        Обертки засекают время через time.perf_counter_ns(): это монотонные часы с наносекундным разрешением, их показания не прыгают при переводе системных часов и позволяют честно измерять даже очень быстрые функции. В этом случае finish и start - целые числа наносекунд.
+        Если же переданы числа с плавающей точкой, они считаются уже выраженными в секундах.
+        """
+        if isinstance(finish, int) and isinstance(start, int):
+            return (finish - start) / 1000000000
+        return finish - start
+
     def resolve_normal_level(self, level):
         """
         Определяем уровень события.
@@ -224,6 +292,48 @@ class FunctionLogger:
             level = self.settings['default_level']
         return level
 
+    def resolve_slowness_threshold(self, slower_than, level):
+        """
+        Определяем порог длительности (в секундах), ниже которого успешные вызовы функции не логируются.
+
+        Приоритет источников порога:
+        1. Значение, переданное в конкретный декоратор.
+        2. Значение для данного уровня логирования из настройки 'slower_than_by_levels'.
+        3. Глобальное значение из настройки 'slower_than'.
+
+        Если порог нигде не задан, возвращается 0, то есть логируются все вызовы.
+        """
+        if slower_than is not None:
+            return slower_than
+        slower_than = self.settings['slower_than_by_levels'].get(level)
+        if slower_than is not None:
+            return slower_than
+        slower_than = self.settings['slower_than']
+        if slower_than is not None:
+            return slower_than
+        return 0
+
+    def start_watching(self, stuck_after, args_dict, errors_level, level, handlers, in_place_fields, engine_fields, coroutine=None):
+        """
+        Регистрация начинающегося вызова в сторожевом потоке (см. polog.core.watchdog), если для него задан порог "зависания".
+
+        Порог, переданный в декоратор, приоритетнее глобальной настройки 'stuck_after'. Если порог не задан нигде, вызов не регистрируется и возвращается None. Иначе - токен для снятия регистрации.
+        """
+        if stuck_after is None:
+            stuck_after = self.settings['stuck_after']
+            if stuck_after is None:
+                return None
+        return self.watchdog.register(args_dict, stuck_after, errors_level, level, handlers, in_place_fields, engine_fields, coroutine=coroutine)
+
+    def resolve_aggregation(self, aggregate):
+        """
+        Определяем, работает ли декоратор в режиме агрегации.
+        Значение, переданное в конкретный декоратор, приоритетнее глобальной настройки 'aggregate'.
+        """
+        if aggregate is not None:
+            return aggregate
+        return self.settings['aggregate']
+
     def create_log_item(self, args, kwargs, data, handlers, engine_fields, in_place_fields):
         """
         Здесь порождается объект лога.
@@ -1,9 +1,7 @@
 import weakref
 import inspect
-import traceback
-from time import time
+from time import time, perf_counter_ns
 import json
-from datetime import datetime
 
 from polog.loggers.handle.handle_log import simple_handle_log
 from polog.loggers.auto.class_logger import clog
@@ -11,6 +9,7 @@ from polog.loggers.auto.function_logger import flog
 from polog.errors import IncorrectUseLoggerError, IncorrectUseOfTheDecoratorError, IncorrectUseOfTheContextManagerError
 from polog.core.stores.settings.settings_store import SettingsStore
 from polog.core.utils.exception_is_suppressed import exception_is_suppressed
+from polog.core.utils.raw_traceback import RawTraceback
 
 
 class LoggerRouteFinalizer:
@@ -76,8 +75,8 @@ class LoggerRouteFinalizer:
 
         self.finalizer.detach()
 
-        self.start_time = time()
-        self.data['time'] = datetime.fromtimestamp(self.start_time)
+        self.data['time'] = time()
+        self.start_time = perf_counter_ns()
 
         return self
 
@@ -91,11 +90,11 @@ class LoggerRouteFinalizer:
             self.data['exception_type'] = exception_type.__name__
             self.data['exception_message'] = str(exception_value)
             self.data['success'] = False
-            self.data['traceback'] = self.settings['json_module'].dumps(traceback.format_tb(traceback_instance))
+            self.data['traceback'] = RawTraceback.from_traceback(traceback_instance)
         else:
             self.data['success'] = True
 
-        self.data['time_of_work'] = time() - self.start_time
+        self.data['time_of_work'] = (perf_counter_ns() - self.start_time) / 1000000000
 
         simple_handle_log(**(self.data))
 
@@ -191,8 +191,8 @@ class AbstractHandleLogger:
         if 'exception' in fields:
             if isinstance(fields['exception'], Exception):
                 exception_to_dict(fields, fields['exception'])
-                fields['traceback'] = get_traceback()
-                traceback = get_locals_from_traceback()
+                fields['traceback'] = get_traceback(serialize=False)
+                traceback = get_locals_from_traceback(serialize=False)
                 if traceback:
                     fields['local_variables'] = traceback
             elif isinstance(fields['exception'], str):
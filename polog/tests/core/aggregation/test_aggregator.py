@@ -0,0 +1,211 @@
+import os
+import time
+from urllib.request import urlopen
+
+import pytest
+
+from polog import log, config
+from polog.core.aggregation.aggregator import Aggregator
+from polog.core.aggregation.prometheus import prometheus_text, escape_label_value
+from polog.core.aggregation.function_statistics import FunctionStatistics
+
+
+def test_aggregator_is_singleton():
+    """
+    Проверяем, что накопитель статистики - синглтон.
+    """
+    assert Aggregator() is Aggregator()
+
+def test_aggregated_calls_write_one_summary(handler):
+    """
+    Проверяем, что успешные вызовы функции в режиме агрегации не пишут отдельных логов, а при выгрузке появляется один сводный лог.
+    """
+    @log(aggregate=True)
+    def aggregated_function(number):
+        return number
+
+    config.set(level=1)
+
+    for number in range(100):
+        aggregated_function(number)
+
+    assert handler.last is None
+
+    Aggregator().flush()
+    time.sleep(0.0001)
+
+    assert len(handler.all) == 1
+    assert handler.last['aggregated'] == True
+    assert handler.last['function'] == aggregated_function.__name__
+    assert handler.last['calls'] == 100
+    assert handler.last['errors'] == 0
+    assert handler.last['success'] == True
+    assert handler.last['latency_p50'] <= handler.last['latency_p99'] <= handler.last['latency_max']
+
+    handler.clean()
+    Aggregator().flush()
+    assert handler.last is None
+
+def test_aggregated_errors_are_logged_and_counted(handler):
+    """
+    Проверяем, что ошибки в режиме агрегации логируются как обычно, и при этом учитываются в сводном логе.
+    """
+    @log(aggregate=True)
+    def aggregated_function_with_error(flag):
+        if flag:
+            raise ValueError
+        return flag
+
+    config.set(level=1)
+
+    aggregated_function_with_error(False)
+    with pytest.raises(ValueError):
+        aggregated_function_with_error(True)
+
+    assert len(handler.all) == 1
+    assert handler.last['exception_type'] == 'ValueError'
+    handler.clean()
+
+    Aggregator().flush()
+
+    assert handler.last['calls'] == 2
+    assert handler.last['errors'] == 1
+    assert handler.last['success'] == False
+
+def test_aggregate_global_setting(handler):
+    """
+    Проверяем, что режим агрегации включается глобальной настройкой и отключается в конкретном декораторе.
+    """
+    @log
+    def globally_aggregated_function():
+        pass
+
+    @log(aggregate=False)
+    def not_aggregated_function():
+        pass
+
+    config.set(level=1)
+
+    try:
+        config.set(aggregate=True)
+        globally_aggregated_function()
+        assert handler.last is None
+        not_aggregated_function()
+        assert handler.last['function'] == not_aggregated_function.__name__
+    finally:
+        config.set(aggregate=False)
+
+    handler.clean()
+    Aggregator().flush()
+    assert handler.last['function'] == globally_aggregated_function.__name__
+
+def test_prometheus_file(delete_files):
+    """
+    Проверяем экспорт метрик в файл.
+    """
+    path = os.path.join('polog', 'tests', 'data', 'metrics.prom')
+
+    @log(aggregate=True)
+    def function_for_prometheus_file():
+        pass
+
+    function_for_prometheus_file()
+
+    try:
+        config.set(aggregation_prometheus_file=path)
+        Aggregator().flush()
+    finally:
+        config.set(aggregation_prometheus_file=None)
+
+    with open(path) as file:
+        content = file.read()
+    delete_files(path)
+
+    assert f'polog_function_calls_total{{module="{function_for_prometheus_file.__module__}",function="function_for_prometheus_file"}} 1' in content
+    assert 'le="+Inf"' in content
+
+def test_prometheus_endpoint():
+    """
+    Проверяем отдачу метрик через локальный HTTP-сервер.
+    """
+    @log(aggregate=True)
+    def function_for_prometheus_endpoint():
+        pass
+
+    function_for_prometheus_endpoint()
+
+    try:
+        config.set(aggregation_prometheus_port=18765)
+        Aggregator().flush()
+        content = urlopen('http://127.0.0.1:18765/metrics').read().decode('utf-8')
+    finally:
+        config.set(aggregation_prometheus_port=None)
+        Aggregator().flush()
+
+    assert Aggregator().endpoint is None
+    assert 'function="function_for_prometheus_endpoint"} 1' in content
+
+def test_prometheus_text_format():
+    """
+    Проверяем формат текста для Prometheus и экранирование значений меток.
+    """
+    statistics = FunctionStatistics({'module': 'lol', 'function': 'kek'}, None, None, {}, {})
+    statistics.record(0.5, True)
+    statistics.record(0.5, False)
+
+    text = prometheus_text([statistics], service_name='cheburek')
+
+    assert '# TYPE polog_function_latency_seconds histogram' in text
+    assert 'polog_function_calls_total{service="cheburek",module="lol",function="kek"} 2' in text
+    assert 'polog_function_errors_total{service="cheburek",module="lol",function="kek"} 1' in text
+    assert 'polog_function_latency_seconds_count{service="cheburek",module="lol",function="kek"} 2' in text
+    assert 'polog_function_latency_seconds_bucket{service="cheburek",module="lol",function="kek",le="0.5"} 2' in text
+    assert escape_label_value('a"b\\c\n') == 'a\\"b\\\\c\\n'
+
+def test_wrong_values():
+    """
+    Проверяем, что неправильные значения для флага и настроек агрегации не принимаются.
+    """
+    with pytest.raises(ValueError):
+        @log(aggregate=1)
+        def function():
+            pass
+
+    with pytest.raises(ValueError):
+        config.set(aggregation_interval=0)
+
+    with pytest.raises(ValueError):
+        config.set(aggregation_prometheus_port=70000)
+
+def test_prometheus_endpoint_without_flush():
+    """
+    Проверяем, что метрики можно забрать с HTTP-сервера сразу, не дожидаясь первой выгрузки статистики.
+    """
+    @log(aggregate=True)
+    def function_for_prometheus_endpoint_without_flush():
+        pass
+
+    try:
+        config.set(aggregation_prometheus_port=18766)
+        function_for_prometheus_endpoint_without_flush()
+        content = urlopen('http://127.0.0.1:18766/metrics').read().decode('utf-8')
+    finally:
+        config.set(aggregation_prometheus_port=None)
+
+    assert Aggregator().endpoint is None
+    assert 'function="function_for_prometheus_endpoint_without_flush"} 1' in content
+
+def test_prometheus_message_label():
+    """
+    Проверяем, что статистика одной функции с разными сообщениями попадает в серии с разными метками.
+    """
+    first = FunctionStatistics({'module': 'lol', 'function': 'kek', 'message': 'first'}, None, None, {}, {})
+    second = FunctionStatistics({'module': 'lol', 'function': 'kek', 'message': 'second'}, None, None, {}, {})
+    first.record(0.5, True)
+    second.record(0.5, True)
+    second.record(0.5, True)
+
+    text = prometheus_text([first, second])
+
+    assert 'polog_function_calls_total{module="lol",function="kek",message="first"} 1' in text
+    assert 'polog_function_calls_total{module="lol",function="kek",message="second"} 2' in text
@@ -0,0 +1,44 @@
+from polog.core.aggregation.function_statistics import FunctionStatistics
+
+
+def test_record_and_pop_interval():
+    """
+    Проверяем, что статистика за интервал сбрасывается после выгрузки, а накопительная - нет.
+    """
+    statistics = FunctionStatistics({'function': 'kek'}, None, None, {}, {})
+
+    statistics.record(0.1, True)
+    statistics.record(0.2, False)
+
+    calls, errors, histogram = statistics.pop_interval()
+
+    assert calls == 2
+    assert errors == 1
+    assert histogram.count == 2
+
+    statistics.record(0.3, True)
+
+    calls, errors, histogram = statistics.pop_interval()
+    assert calls == 1
+    assert errors == 0
+
+    calls, errors, histogram = statistics.pop_interval()
+    assert calls == 0
+    assert histogram.count == 0
+
+def test_totals_include_current_interval():
+    """
+    Проверяем, что накопительная статистика учитывает еще не выгруженный интервал.
+    """
+    statistics = FunctionStatistics({'function': 'kek'}, None, None, {}, {})
+
+    statistics.record(0.1, True)
+    statistics.pop_interval()
+    statistics.record(0.2, False)
+
+    calls, errors, histogram = statistics.totals()
+
+    assert calls == 2
+    assert errors == 1
+    assert histogram.count == 2
+    assert histogram.max == 0.2
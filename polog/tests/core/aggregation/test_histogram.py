@@ -0,0 +1,84 @@
+import pytest
+
+from polog.core.aggregation.histogram import LatencyHistogram
+
+
+def test_empty_histogram():
+    """
+    Проверяем, что у пустой гистограммы нет среднего и квантилей.
+    """
+    histogram = LatencyHistogram()
+
+    assert histogram.count == 0
+    assert histogram.mean() is None
+    assert histogram.quantile(0.5) is None
+
+def test_add_and_statistics():
+    """
+    Проверяем подсчет количества, суммы, максимума и среднего.
+    """
+    histogram = LatencyHistogram()
+
+    for value in (0.001, 0.002, 0.003):
+        histogram.add(value)
+
+    assert histogram.count == 3
+    assert histogram.sum == pytest.approx(0.006)
+    assert histogram.max == 0.003
+    assert histogram.mean() == pytest.approx(0.002)
+
+def test_quantiles_are_in_bounds():
+    """
+    Проверяем, что оценки квантилей монотонны и не выходят за пределы записанных значений.
+    """
+    histogram = LatencyHistogram()
+
+    for index in range(1, 1001):
+        histogram.add(index / 1000)
+
+    p50 = histogram.quantile(0.5)
+    p90 = histogram.quantile(0.9)
+    p99 = histogram.quantile(0.99)
+
+    assert 0.25 <= p50 <= 1.0
+    assert p50 <= p90 <= p99 <= histogram.max
+    assert histogram.quantile(1) == histogram.max
+
+    with pytest.raises(ValueError):
+        histogram.quantile(2)
+
+def test_merge_and_copy():
+    """
+    Проверяем слияние гистограмм и то, что копия независима от оригинала.
+    """
+    first = LatencyHistogram()
+    second = LatencyHistogram()
+    first.add(0.1)
+    second.add(5)
+
+    first.merge(second)
+    copy = first.copy()
+    copy.add(100)
+
+    assert first.count == 2
+    assert first.max == 5
+    assert copy.count == 3
+    assert copy.max == 100
+
+    with pytest.raises(ValueError):
+        first.merge(LatencyHistogram(bounds=(1, 2)))
+
+def test_cumulative_buckets():
+    """
+    Проверяем, что накопительные значения корзин не убывают, а последняя корзина бесконечна и содержит все значения.
+    """
+    histogram = LatencyHistogram()
+    for value in (0.00001, 0.5, 100):
+        histogram.add(value)
+
+    buckets = histogram.cumulative_buckets()
+
+    assert len(buckets) == len(LatencyHistogram.DEFAULT_BOUNDS) + 1
+    assert buckets[-1] == (float('inf'), 3)
+    assert buckets[0] == (0.00001, 1)
+    assert all(buckets[index][1] <= buckets[index + 1][1] for index in range(len(buckets) - 1))
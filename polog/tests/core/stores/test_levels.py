@@ -63,3 +63,11 @@ def test_get_level_name_none_request():
     Проверяем, что если запросить имя уровня логирования передачей в качестве аргумента None - вернется None.
     """
     assert Levels.get_level_name(None) is None
+
+def test_version_changes():
+    """
+    Проверяем, что номер версии соответствий меняется при каждом изменении.
+    """
+    version = Levels.version
+    Levels.set('kek', 777)
+    assert Levels.version == version + 1
@@ -0,0 +1,41 @@
+import pytest
+
+from polog.core.stores.serializers import Serializers
+
+
+class Parent:
+    pass
+
+class Child(Parent):
+    pass
+
+
+def test_lookup_by_mro_and_cache():
+    """
+    Проверяем, что сериализатор ищется по MRO, результат кэшируется, а при изменении реестра кэш сбрасывается.
+    """
+    serializer = lambda x: 'parent'
+    Serializers.set(Parent, serializer)
+    try:
+        assert Serializers.get(Child) == (serializer, None)
+        assert Child in Serializers.cache
+
+        child_serializer = lambda x: 'child'
+        Serializers.set(Child, child_serializer, type_name='kek')
+        assert Child not in Serializers.cache
+        assert Serializers.get(Child) == (child_serializer, 'kek')
+        assert Serializers.get(Parent) == (serializer, None)
+
+        Serializers.delete(Child)
+        assert Serializers.get(Child) == (serializer, None)
+    finally:
+        Serializers.delete(Parent)
+
+    assert Serializers.get(Child) == (None, None)
+
+def test_delete_unknown_type():
+    """
+    Проверяем, что удаление незарегистрированного сериализатора поднимает KeyError.
+    """
+    with pytest.raises(KeyError):
+        Serializers.delete(Parent)
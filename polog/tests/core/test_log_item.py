@@ -1,4 +1,5 @@
 import time
+import json
 import datetime
 from multiprocessing import Process, Queue
 from random import shuffle
@@ -583,3 +584,73 @@ def test_log_item_repr_is_str():
     log_item.set_data({'lol': 'kek'})
 
     assert str(log_item) == repr(log_item)
+
+def test_lazy_time_conversion():
+    """
+    Проверяем, что поле 'time' хранится в логе как число, а в объект datetime преобразуется только при обращении к нему. Результат преобразования кэшируется.
+    """
+    stamp = time.time()
+    log = LogItem()
+    log.set_data({'time': stamp, 'lol': 'kek'})
+
+    assert log.get_raw('time') == stamp
+    assert log.fields['time'] == stamp
+    assert log['time'] == datetime.datetime.fromtimestamp(stamp)
+    assert log['time'] is log['time']
+    assert log.get('time') is log['time']
+    assert dict(log.items())['time'] is log['time']
+    assert log['time'] in log.values()
+    assert log.get_raw('kek', 'default') == 'default'
+    assert LogItem().get_raw('time') is None
+
+def test_lazy_time_conversion_keeps_datetime():
+    """
+    Проверяем, что если в поле 'time' уже лежит объект datetime, он возвращается как есть.
+    """
+    now = datetime.datetime.now()
+    log = LogItem()
+    log.set_data({'time': now})
+
+    assert log['time'] is now
+    assert log.get_raw('time') is now
+
+def test_lazy_json_serialization():
+    """
+    Проверяем, что переменные и трейсбек хранятся в логе как структуры, а в JSON сериализуются только при обращении к ним через [] или .get(). Результат сериализации кэшируется.
+    """
+    variables = {'args': [{'value': 1, 'type': 'int'}]}
+    traceback = ['  File "kek.py", line 1, in lol\n    raise ValueError\n']
+    log = LogItem()
+    log.set_data({'input_variables': variables, 'result': {'value': 2, 'type': 'int'}, 'traceback': traceback, 'local_variables': 'kek'})
+
+    assert log.get_raw('input_variables') is variables
+    assert log.get_raw('traceback') is traceback
+    assert log['input_variables'] == json.dumps(variables)
+    assert log['input_variables'] is log.get('input_variables')
+    assert json.loads(log['result']) == {'value': 2, 'type': 'int'}
+    assert json.loads(log['traceback']) == traceback
+    assert log['local_variables'] == 'kek'
+
+def test_get_rendered():
+    """
+    Проверяем, что представление лога создается один раз для каждого ключа, а исключения из функции-рендерера не кэшируются.
+    """
+    calls = []
+    def renderer(log):
+        calls.append(log)
+        return f'{log["lol"]}!'
+    def broken_renderer(log):
+        raise ValueError
+
+    log = LogItem()
+    log.set_data({'lol': 'kek'})
+
+    assert log.get_rendered('key', renderer) == 'kek!'
+    assert log.get_rendered('key', renderer) == 'kek!'
+    assert len(calls) == 1
+    assert log.get_rendered('other_key', renderer) == 'kek!'
+    assert len(calls) == 2
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            log.get_rendered('broken', broken_renderer)
@@ -0,0 +1,110 @@
+import time
+import asyncio
+import tracemalloc
+
+import pytest
+
+from polog.core.utils.call_profiler import CallProfiler
+
+
+def test_sync_profiling():
+    """
+    Проверяем, что для обычной функции считается процессорное время, а поля корутин не заполняются.
+    """
+    fields = {}
+    profiler = CallProfiler(fields)
+    sum(range(100000))
+    time.sleep(0.01)
+    profiler.stop()
+
+    assert isinstance(fields['cpu_time'], float)
+    assert 0 < fields['cpu_time'] < 0.01
+    assert 'running_time' not in fields
+    assert 'awaiting_time' not in fields
+
+def test_memory_fields_only_when_tracing():
+    """
+    Проверяем, что поля с памятью заполняются, только если включен tracemalloc.
+    """
+    fields = {}
+    profiler = CallProfiler(fields)
+    profiler.stop()
+    assert 'memory_allocated' not in fields
+    assert 'memory_peak' not in fields
+
+    tracemalloc.start()
+    try:
+        fields = {}
+        profiler = CallProfiler(fields)
+        data = [object() for _ in range(10000)]
+        del data
+        profiler.stop()
+    finally:
+        tracemalloc.stop()
+
+    assert fields['memory_peak'] > 0
+    assert isinstance(fields['memory_allocated'], int)
+
+def test_nested_memory_peaks():
+    """
+    Проверяем, что вложенный замер не стирает пик памяти, набранный внешним замером до его начала.
+    """
+    tracemalloc.start()
+    try:
+        outer_fields = {}
+        inner_fields = {}
+        outer = CallProfiler(outer_fields)
+        data = bytearray(10 * 1024 * 1024)
+        del data
+        inner = CallProfiler(inner_fields)
+        inner.stop()
+        outer.stop()
+    finally:
+        tracemalloc.stop()
+
+    assert outer_fields['memory_peak'] >= 10 * 1024 * 1024
+    assert inner_fields['memory_peak'] < 1024 * 1024
+    assert not CallProfiler.active
+
+def test_coroutine_running_and_awaiting():
+    """
+    Проверяем, что для корутин время разделяется на время исполнения и ожидания.
+    """
+    fields = {}
+
+    async def coroutine_function(number):
+        await asyncio.sleep(0.05)
+        return number
+
+    async def main():
+        profiler = CallProfiler(fields)
+        result = await profiler.wrap(coroutine_function(5))
+        profiler.stop()
+        return result
+
+    assert asyncio.run(main()) == 5
+    assert fields['awaiting_time'] >= 0.04
+    assert fields['running_time'] < fields['awaiting_time']
+    assert fields['cpu_time'] <= fields['running_time'] + 0.001
+
+def test_coroutine_exception():
+    """
+    Проверяем, что исключения внутри корутины пробрасываются наружу без изменений.
+    """
+    fields = {}
+
+    async def coroutine_function():
+        await asyncio.sleep(0)
+        raise ValueError('kek')
+
+    async def main():
+        profiler = CallProfiler(fields)
+        try:
+            await profiler.wrap(coroutine_function())
+        finally:
+            profiler.stop()
+
+    with pytest.raises(ValueError, match='kek'):
+        asyncio.run(main())
+
+    assert 'running_time' in fields
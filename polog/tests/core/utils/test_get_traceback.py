@@ -4,6 +4,7 @@ import json
 import pytest
 
 from polog.core.utils.get_traceback import get_traceback, get_locals_from_traceback
+from polog.core.utils.raw_traceback import RawTraceback
 from polog import json_vars, config
 
 
@@ -51,3 +52,18 @@ def test_get_traceback_json_format():
             assert True
         except:
             assert False
+
+def test_get_traceback_and_locals_without_serialization():
+    """
+    Проверяем, что с serialize=False трейсбек и локальные переменные возвращаются в виде структур, которые при сериализации дают тот же JSON, что и по умолчанию.
+    """
+    a = 5
+    try:
+        c = 5 / 0
+    except:
+        results = (get_traceback(serialize=False), get_traceback(), get_locals_from_traceback(serialize=False), get_locals_from_traceback())
+    structured_traceback, traceback_json, structured_locals, locals_json = results
+    assert isinstance(structured_traceback, RawTraceback)
+    assert json.dumps(structured_traceback.format()) == traceback_json
+    assert isinstance(structured_locals, dict)
+    assert json.dumps(structured_locals) == locals_json
@@ -0,0 +1,79 @@
+import json
+import decimal
+import datetime
+
+import pytest
+
+from polog.core.utils.json_backend import JSONBackend, get_json_backend
+
+
+def test_stdlib_backend():
+    """
+    Проверяем, что для стандартного модуля json строки и байты получаются как обычно.
+    """
+    backend = get_json_backend(json)
+
+    assert backend.bytes_native == False
+    assert backend.dumps({'lol': 'kek'}) == json.dumps({'lol': 'kek'})
+    assert backend.dumps_bytes({'lol': 'kek'}) == json.dumps({'lol': 'kek'}).encode('utf-8')
+    assert backend.loads('{"lol": "kek"}') == {'lol': 'kek'}
+
+def test_backend_is_cached():
+    """
+    Проверяем, что прослойка для одного модуля создается один раз.
+    """
+    assert get_json_backend(json) is get_json_backend(json)
+
+def test_bytes_native_backend():
+    """
+    Проверяем работу с сериализатором, возвращающим байты.
+    """
+    orjson = pytest.importorskip('orjson')
+    backend = get_json_backend(orjson)
+
+    assert backend.bytes_native == True
+    assert backend.dumps({'lol': 'кек'}) == '{"lol":"кек"}'
+    assert backend.dumps_bytes({'lol': 'кек'}) == '{"lol":"кек"}'.encode('utf-8')
+    assert isinstance(backend.dumps_bytes([]), bytes)
+
+def test_fallback_to_stdlib():
+    """
+    Проверяем, что если быстрый сериализатор не справился, используется стандартный модуль json.
+    """
+    class BrokenModule:
+        @staticmethod
+        def dumps(value):
+            if value:
+                raise TypeError
+            return b'[]'
+
+        @staticmethod
+        def loads(value):
+            return json.loads(value)
+
+    backend = JSONBackend(BrokenModule)
+
+    assert backend.bytes_native == True
+    assert backend.dumps([2 ** 100]) == json.dumps([2 ** 100])
+    assert backend.dumps_bytes([2 ** 100]) == json.dumps([2 ** 100]).encode('utf-8')
+
+@pytest.mark.parametrize('module_name', ['json', 'ujson', 'orjson'])
+def test_unknown_objects_are_converted_to_str(module_name):
+    """
+    Проверяем, что объекты, которых нет в JSON, в т. ч. вложенные, приводятся к строке, а не роняют сериализацию.
+    """
+    backend = get_json_backend(pytest.importorskip(module_name))
+    value = {'id': 5, 'when': datetime.date(2020, 1, 2), 'amount': [decimal.Decimal('1.5')]}
+    expected = {'id': 5, 'when': '2020-01-02', 'amount': ['1.5']}
+
+    assert json.loads(backend.dumps(value)) == expected
+    assert json.loads(backend.dumps_bytes(value)) == expected
+
+def test_stdlib_errors_are_raised():
+    """
+    Ошибки, которые не связаны с типами значений (например, циклические ссылки), не маскируются.
+    """
+    value = []
+    value.append(value)
+    with pytest.raises(ValueError):
+        get_json_backend(json).dumps(value)
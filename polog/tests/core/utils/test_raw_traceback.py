@@ -0,0 +1,64 @@
+import sys
+import json
+import traceback
+
+from polog.core.utils.raw_traceback import RawTraceback, format_frames
+from polog.core.log_item import LogItem
+from polog.handlers.file.base_formatter_fields_extractors import BaseFormatterFieldsExtractors as Extractors
+
+
+def function_with_error():
+    raise ValueError('kek')
+
+def get_exc_info():
+    try:
+        function_with_error()
+    except ValueError:
+        return sys.exc_info()
+
+def test_format_like_format_tb():
+    """
+    Проверяем, что строки сырого трейсбека совпадают с тем, что возвращает traceback.format_tb().
+    """
+    trace = get_exc_info()[2]
+
+    assert RawTraceback.from_traceback(trace).format() == traceback.format_tb(trace)
+    assert RawTraceback.from_traceback(trace, 1).format() == traceback.format_tb(trace)[1:]
+    assert len(RawTraceback.from_traceback(trace)) == 2
+    assert RawTraceback.from_traceback(trace).format() is not RawTraceback.from_traceback(trace).format()
+
+def test_format_is_cached():
+    """
+    Проверяем, что одинаковые трейсбеки форматируются один раз.
+    """
+    first = RawTraceback.from_traceback(get_exc_info()[2])
+    second = RawTraceback.from_traceback(get_exc_info()[2])
+
+    assert first == second
+    assert hash(first) == hash(second)
+
+    first.format()
+    hits = format_frames.cache_info().hits
+    second.format()
+
+    assert format_frames.cache_info().hits == hits + 1
+
+def test_empty_raw_traceback():
+    """
+    Проверяем поведение пустого трейсбека.
+    """
+    assert RawTraceback(()).format() == []
+    assert not RawTraceback(())
+    assert RawTraceback.from_traceback(None).format() == []
+    assert Extractors.traceback({'traceback': RawTraceback(())}) == 'no traceback'
+
+def test_raw_traceback_in_log_item():
+    """
+    Проверяем, что в логе сырой трейсбек сериализуется в тот же JSON, что и список строк, а форматтер выводит его так же, как этот JSON.
+    """
+    trace = get_exc_info()[2]
+    log = LogItem()
+    log.set_data({'traceback': RawTraceback.from_traceback(trace)})
+
+    assert json.loads(log['traceback']) == traceback.format_tb(trace)
+    assert Extractors.traceback(log) == Extractors.traceback({'traceback': json.dumps(traceback.format_tb(trace))})
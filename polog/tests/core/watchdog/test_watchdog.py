@@ -0,0 +1,92 @@
+import json
+import time
+import asyncio
+
+import pytest
+
+from polog import log, config
+from polog.core.watchdog.watchdog import Watchdog
+
+
+def test_watchdog_is_singleton():
+    """
+    Проверяем, что сторож - синглтон.
+    """
+    assert Watchdog() is Watchdog()
+
+def test_stuck_call_is_logged_with_stack(handler):
+    """
+    Проверяем, что о вызове, длящемся дольше порога, пишется лог со стеком еще до завершения вызова.
+    """
+    @log(stuck_after=0.05)
+    def sleeping_function_for_watchdog():
+        time.sleep(0.3)
+
+    config.set(level=1)
+
+    sleeping_function_for_watchdog()
+
+    stuck_logs = [item for item in handler.all if item.get('stuck')]
+    assert len(stuck_logs) == 1
+    stuck_log = stuck_logs[0]
+
+    assert stuck_log['function'] == 'sleeping_function_for_watchdog'
+    assert 0.05 <= stuck_log['time_of_work'] < 0.3
+    assert handler.all.index(stuck_log) < handler.all.index(handler.last)
+    stack = json.loads(stuck_log['traceback'])
+    assert any('time.sleep(0.3)' in line for line in stack)
+    assert Watchdog().calls == {}
+
+def test_stuck_coroutine_is_logged_with_stack(handler):
+    """
+    Проверяем, что для корутин стек собирается по цепочке await.
+    """
+    async def inner_coroutine_for_watchdog():
+        await asyncio.sleep(0.3)
+
+    @log(stuck_after=0.05)
+    async def sleeping_coroutine_for_watchdog():
+        await inner_coroutine_for_watchdog()
+
+    config.set(level=1)
+
+    asyncio.run(sleeping_coroutine_for_watchdog())
+
+    stuck_logs = [item for item in handler.all if item.get('stuck')]
+    assert len(stuck_logs) == 1
+    stack = json.loads(stuck_logs[0]['traceback'])
+    assert any('await inner_coroutine_for_watchdog()' in line for line in stack)
+    assert any('await asyncio.sleep(0.3)' in line for line in stack)
+
+def test_fast_call_is_not_reported(handler):
+    """
+    Проверяем, что быстрые вызовы не порождают логов о зависании, а глобальная настройка работает.
+    """
+    @log
+    def fast_function_for_watchdog():
+        pass
+
+    config.set(level=1)
+
+    try:
+        config.set(stuck_after=10)
+        fast_function_for_watchdog()
+        time.sleep(0.1)
+    finally:
+        config.set(stuck_after=None)
+
+    assert len(handler.all) == 1
+    assert handler.last.get('stuck') is None
+    assert Watchdog().calls == {}
+
+def test_wrong_values():
+    """
+    Проверяем, что порог можно задать только положительным числом.
+    """
+    with pytest.raises(ValueError):
+        @log(stuck_after=0)
+        def function():
+            pass
+
+    with pytest.raises(ValueError):
+        config.set(stuck_after='1')
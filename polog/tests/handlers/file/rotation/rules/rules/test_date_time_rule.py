@@ -0,0 +1,69 @@
+import os
+import time
+import datetime
+
+import pytest
+
+from polog.handlers.file.rotation.rules.rules.date_time_rule import DateTimeRule
+
+
+class FileDependencyWrapperMock:
+    def __init__(self, filename):
+        self.filename = filename
+
+
+@pytest.mark.parametrize('source', ['hourly', 'daily', 'weekly', 'at 04:30', 'daily at 04:30', 'monday', 'every fri', 'sunday at 23:00'])
+def test_prove_date_time_rule(source):
+    """
+    Проверяем, что правило узнает себя в корректных строках.
+    """
+    assert DateTimeRule(source, None).prove_source() == True
+
+@pytest.mark.parametrize('source', ['at', 'at 25:00', '04:30', 'kek', '2 hours', 'hourly at 04:30'])
+def test_wrong_date_time_rule(source):
+    """
+    Проверяем, что правило не узнает себя в некорректных строках.
+    """
+    assert DateTimeRule(source, None).prove_source() == False
+
+@pytest.mark.parametrize('source, now, expected', [
+    ('hourly', datetime.datetime(2022, 1, 1, 10, 15), datetime.datetime(2022, 1, 1, 11)),
+    ('hourly', datetime.datetime(2022, 1, 1, 23, 0), datetime.datetime(2022, 1, 2, 0)),
+    ('daily', datetime.datetime(2022, 1, 1, 10, 15), datetime.datetime(2022, 1, 2)),
+    ('at 04:30', datetime.datetime(2022, 1, 1, 3, 0), datetime.datetime(2022, 1, 1, 4, 30)),
+    ('at 04:30', datetime.datetime(2022, 1, 1, 4, 30), datetime.datetime(2022, 1, 2, 4, 30)),
+    ('weekly', datetime.datetime(2022, 1, 1, 10, 15), datetime.datetime(2022, 1, 3)),
+    ('saturday at 12:00', datetime.datetime(2022, 1, 1, 10, 15), datetime.datetime(2022, 1, 1, 12)),
+    ('saturday at 12:00', datetime.datetime(2022, 1, 1, 12, 15), datetime.datetime(2022, 1, 8, 12)),
+])
+def test_get_next_moment(source, now, expected):
+    """
+    Проверяем вычисление ближайшего момента ротации. 1 января 2022 года - суббота.
+    """
+    assert DateTimeRule(source, None).get_next_moment(now) == expected
+
+def test_check_date_time_rule():
+    """
+    Проверяем, что правило срабатывает после наступления момента ротации и сразу же вычисляет следующий.
+    """
+    rule = DateTimeRule('hourly', None)
+    assert rule.check() == False
+
+    rule.deadline = time.time() - 1
+    assert rule.check() == True
+    assert rule.check() == False
+    assert rule.deadline > time.time()
+
+def test_date_time_rule_with_old_file(filename_for_test):
+    """
+    Проверяем, что, если в файле лежат логи, которые уже должны были быть ротированы, правило срабатывает при первой же записи.
+    """
+    with open(filename_for_test, 'w') as file:
+        file.write('kek\n')
+    two_days_ago = time.time() - 2 * 24 * 60 * 60
+    os.utime(filename_for_test, (two_days_ago, two_days_ago))
+
+    assert DateTimeRule('daily', FileDependencyWrapperMock(filename_for_test)).check() == True
+
+    os.utime(filename_for_test, None)
+    assert DateTimeRule('daily', FileDependencyWrapperMock(filename_for_test)).check() == False
@@ -0,0 +1,30 @@
+import pytest
+
+from polog.handlers.file.rotation.rules.rules.number_rule import NumberRule
+
+
+@pytest.mark.parametrize('source', ['10 lines', '10 logs', 'every 10 records', '10 entries'])
+def test_prove_number_rule(source):
+    """
+    Проверяем, что правило узнает себя в корректных строках.
+    """
+    assert NumberRule(source, None).prove_source() == True
+
+@pytest.mark.parametrize('source', ['0 lines', '-5 lines', '10 mb', '10 kek', 'lines', '10 hours'])
+def test_wrong_number_rule(source):
+    """
+    Проверяем, что правило не узнает себя в некорректных строках.
+    """
+    assert NumberRule(source, None).prove_source() == False
+
+def test_check_number_rule():
+    """
+    Проверяем, что правило срабатывает перед каждой (n + 1)-й записью, а после ротации отсчет начинается заново.
+    """
+    rule = NumberRule('3 lines', None)
+
+    assert [rule.check() for _ in range(3)] == [False, False, False]
+    assert rule.check() == True
+    rule.reset()
+    assert [rule.check() for _ in range(2)] == [False, False]
+    assert rule.check() == True
@@ -0,0 +1,43 @@
+import time
+
+import pytest
+
+from polog.handlers.file.rotation.rules.rules.period_rule import PeriodRule
+
+
+@pytest.mark.parametrize('source, period', [
+    ('2 hours', 2 * 60 * 60),
+    ('every 2 hours', 2 * 60 * 60),
+    ('30 min', 30 * 60),
+    ('day', 24 * 60 * 60),
+    ('every week', 7 * 24 * 60 * 60),
+])
+def test_prove_period_rule(source, period):
+    """
+    Проверяем, что правило узнает себя в корректных строках и правильно вычисляет длину промежутка.
+    """
+    rule = PeriodRule(source, None)
+    assert rule.prove_source() == True
+    assert rule.period == period
+
+@pytest.mark.parametrize('source', ['0 hours', '-1 day', '2 mb', '2 lines', 'daily'])
+def test_wrong_period_rule(source):
+    """
+    Проверяем, что правило не узнает себя в некорректных строках.
+    """
+    assert PeriodRule(source, None).prove_source() == False
+
+def test_check_period_rule():
+    """
+    Проверяем, что правило срабатывает по истечении промежутка, а после ротации отсчет начинается заново.
+    """
+    rule = PeriodRule('1 sec', None)
+    rule.period = 0.05
+    rule.reset()
+
+    assert rule.check() == False
+    time.sleep(0.06)
+    assert rule.check() == True
+    assert rule.check() == True
+    rule.reset()
+    assert rule.check() == False
@@ -0,0 +1,30 @@
+import pytest
+
+from polog.handlers.file.rotation.rules.rules.tokenization.tokens.period_token import PeriodToken
+
+
+def test_content_extraction_for_period_token():
+    """
+    Проверяем, что значение (количество секунд) из строки извлекается корректно.
+    """
+    assert PeriodToken('second').content == 1
+    assert PeriodToken('seconds').content == 1
+    assert PeriodToken('sec').content == 1
+    assert PeriodToken('minute').content == 60
+    assert PeriodToken('mins').content == 60
+    assert PeriodToken('hour').content == 60 * 60
+    assert PeriodToken('h').content == 60 * 60
+    assert PeriodToken('hrs').content == 60 * 60
+    assert PeriodToken('days').content == 60 * 60 * 24
+    assert PeriodToken('week').content == 60 * 60 * 24 * 7
+
+def test_creating_period_token_with_error():
+    """
+    Проверяем, что, если строка не является единицей измерения времени, токен не создастся.
+    """
+    with pytest.raises(ValueError):
+        PeriodToken('kek')
+    with pytest.raises(ValueError):
+        PeriodToken('5')
+    with pytest.raises(ValueError):
+        PeriodToken('mb')
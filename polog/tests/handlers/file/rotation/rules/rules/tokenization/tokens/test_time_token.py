@@ -0,0 +1,22 @@
+import datetime
+
+import pytest
+
+from polog.handlers.file.rotation.rules.rules.tokenization.tokens.time_token import TimeToken
+
+
+def test_content_extraction_for_time_token():
+    """
+    Проверяем, что время суток из строки извлекается корректно.
+    """
+    assert TimeToken('04:30').content == datetime.time(4, 30)
+    assert TimeToken('23:59:59').content == datetime.time(23, 59, 59)
+    assert TimeToken('00:00').content == datetime.time()
+
+@pytest.mark.parametrize('source', ['kek', '5', '4:30', '24:00', '12:60', '12:00:00:00', 'aa:bb'])
+def test_creating_time_token_with_error(source):
+    """
+    Проверяем, что, если строка не является временем суток в правильном формате, токен не создастся.
+    """
+    with pytest.raises(ValueError):
+        TimeToken(source)
@@ -0,0 +1,22 @@
+import pytest
+
+from polog.handlers.file.rotation.rules.rules.tokenization.tokens.weekday_token import WeekdayToken
+
+
+def test_content_extraction_for_weekday_token():
+    """
+    Проверяем, что номер дня недели из строки извлекается корректно.
+    """
+    assert WeekdayToken('monday').content == 0
+    assert WeekdayToken('mon').content == 0
+    assert WeekdayToken('wednesday').content == 2
+    assert WeekdayToken('sun').content == 6
+
+def test_creating_weekday_token_with_error():
+    """
+    Проверяем, что, если строка не является днем недели, токен не создастся.
+    """
+    with pytest.raises(ValueError):
+        WeekdayToken('kek')
+    with pytest.raises(ValueError):
+        WeekdayToken('5')
@@ -2,6 +2,9 @@ import pytest
 
 from polog.handlers.file.rotation.rules.rules_elector import RulesElector
 from polog.handlers.file.rotation.rules.rules.file_size_rule import FileSizeRule
+from polog.handlers.file.rotation.rules.rules.period_rule import PeriodRule
+from polog.handlers.file.rotation.rules.rules.date_time_rule import DateTimeRule
+from polog.handlers.file.rotation.rules.rules.number_rule import NumberRule
 from polog.handlers.file.file_dependency_wrapper import FileDependencyWrapper
 
 
@@ -23,3 +26,19 @@ def test_rules_elector_base_behavior_with_no_rules(filename_for_test):
 
     with pytest.raises(ValueError):
         elector.choose('jnsdvkjnsdfkjncvs')
+
+@pytest.mark.parametrize('source, rule_class', [
+    ('20 mb', FileSizeRule),
+    ('2 hours', PeriodRule),
+    ('daily', DateTimeRule),
+    ('monday at 04:30', DateTimeRule),
+    ('1000 lines', NumberRule),
+])
+def test_rules_elector_chooses_right_rule(source, rule_class, filename_for_test):
+    """
+    Проверяем, что электор правильно распознает все виды правил.
+    """
+    file = FileDependencyWrapper([filename_for_test], lock_type='thread')
+    elector = RulesElector(file)
+
+    assert isinstance(elector.choose(source), rule_class)
@@ -0,0 +1,50 @@
+import time
+import threading
+
+from polog.handlers.file.rotation.background_worker import BackgroundWorker
+
+
+def test_tasks_are_executed_in_order():
+    """
+    Проверяем, что задачи выполняются в фоновом потоке строго по очереди.
+    """
+    worker = BackgroundWorker()
+    results = []
+
+    def task(number):
+        time.sleep(0.001 * (5 - number))
+        results.append((number, threading.current_thread() is threading.main_thread()))
+
+    for number in range(5):
+        worker.put(task, number)
+    assert worker.wait(5) == True
+
+    assert results == [(number, False) for number in range(5)]
+
+def test_exception_does_not_stop_worker():
+    """
+    Проверяем, что исключение в одной задаче не мешает выполнению следующих.
+    """
+    worker = BackgroundWorker()
+    results = []
+
+    def broken_task():
+        raise ValueError
+
+    worker.put(broken_task)
+    worker.put(results.append, 'kek')
+    assert worker.wait(5) == True
+
+    assert results == ['kek']
+
+def test_wait_with_timeout():
+    """
+    Проверяем, что ожидание опустошения очереди ограничено по времени.
+    """
+    worker = BackgroundWorker()
+    event = threading.Event()
+
+    worker.put(event.wait)
+    assert worker.wait(0.01) == False
+    event.set()
+    assert worker.wait(5) == True
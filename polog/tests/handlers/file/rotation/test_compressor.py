@@ -0,0 +1,109 @@
+import os
+import bz2
+import gzip
+import lzma
+import time
+
+import pytest
+
+from polog.handlers.file.writer import file_writer
+from polog.handlers.file.rotation.compressor import Compressor
+
+
+@pytest.mark.parametrize('method, module, extension', [
+    ('gzip', gzip, '.gz'),
+    ('bz2', bz2, '.bz2'),
+    ('lzma', lzma, '.xz'),
+])
+def test_compress_file(method, module, extension, filename_for_test):
+    """
+    Проверяем, что файл сжимается выбранным методом, исходный файл удаляется, а временных файлов не остается.
+    """
+    with open(filename_for_test, 'wb') as file:
+        file.write(b'kek\n' * 1000)
+
+    compressor = Compressor(method)
+    compressor.compress(filename_for_test)
+    assert compressor.wait(5) == True
+
+    assert not os.path.exists(filename_for_test)
+    with module.open(filename_for_test + extension, 'rb') as file:
+        assert file.read() == b'kek\n' * 1000
+    assert [x for x in os.listdir(os.path.dirname(filename_for_test)) if x.endswith(Compressor.PART_SUFFIX)] == []
+
+def test_unknown_compression_method():
+    """
+    Проверяем, что для неизвестного метода сжатия поднимается ValueError.
+    """
+    with pytest.raises(ValueError):
+        Compressor('zip')
+    with pytest.raises(ValueError):
+        file_writer(compression='zip')
+
+def test_compress_missing_file(filename_for_test):
+    """
+    Проверяем, что, если файла уже нет (скажем, его сжал другой процесс), ничего не происходит и временных файлов не остается.
+    """
+    compressor = Compressor('gzip')
+    compressor.compress(filename_for_test + '.kek')
+    assert compressor.wait(5) == True
+
+    assert [x for x in os.listdir(os.path.dirname(filename_for_test)) if x.endswith(Compressor.PART_SUFFIX) or x.endswith('.gz')] == []
+
+def test_recover_directory(dirname_for_test):
+    """
+    Проверяем восстановление директории после прошлых запусков: брошенные временные файлы удаляются, свежие - нет, а несжатые ротированные файлы сжимаются, кроме недавно измененных (их, возможно, еще не отпустил другой процесс).
+    """
+    os.makedirs(dirname_for_test, exist_ok=True)
+    stale_part = os.path.join(dirname_for_test, 'old.logs.gz.1.part')
+    fresh_part = os.path.join(dirname_for_test, 'new.logs.gz.2.part')
+    rotated = os.path.join(dirname_for_test, 'rotated.logs')
+    fresh_rotated = os.path.join(dirname_for_test, 'fresh.logs')
+    other = os.path.join(dirname_for_test, 'other.txt')
+    for path in (stale_part, fresh_part, rotated, fresh_rotated, other):
+        with open(path, 'w') as file:
+            file.write('kek')
+    long_ago = time.time() - max(Compressor.STALE_PART_AGE, Compressor.RECENT_FILE_AGE) * 2
+    os.utime(stale_part, (long_ago, long_ago))
+    os.utime(rotated, (long_ago, long_ago))
+
+    compressor = Compressor('gzip')
+    compressor.recover(dirname_for_test, '.logs')
+    assert compressor.wait(5) == True
+
+    assert sorted(os.listdir(dirname_for_test)) == sorted(['new.logs.gz.2.part', 'rotated.logs.gz', 'fresh.logs', 'other.txt'])
+
+def test_recover_missing_directory(dirname_for_test):
+    """
+    Проверяем, что восстановление несуществующей директории ничего не ломает.
+    """
+    compressor = Compressor('gzip')
+    compressor.recover(os.path.join(dirname_for_test, 'kek'), '.logs')
+    assert compressor.wait(5) == True
+
+def test_file_writer_with_compression(filename_for_test, dirname_for_test):
+    """
+    Проверяем, что файловый обработчик сжимает ротированные файлы.
+    """
+    dirname = os.path.join(dirname_for_test, 'rotation_dir')
+    handler = file_writer(filename_for_test, rotation=f'2 lines >> {dirname}', compression='gzip')
+
+    for index in range(5):
+        handler.do(f'kek {index}\n')
+    assert handler.rotator.compressor.wait(5) == True
+
+    archives = sorted(x for x in os.listdir(dirname) if not x.endswith('.lock'))
+    assert len(archives) == 2
+    assert all(x.endswith('.logs.gz') for x in archives)
+    contents = []
+    for name in archives:
+        with gzip.open(os.path.join(dirname, name), 'rt') as file:
+            contents.append(file.read())
+    assert contents == ['kek 0\nkek 1\n', 'kek 2\nkek 3\n']
+
+def test_compression_without_rotation(filename_for_test):
+    """
+    Проверяем, что сжатие нельзя включить без ротации.
+    """
+    with pytest.raises(ValueError):
+        file_writer(filename_for_test, compression='gzip')
@@ -0,0 +1,168 @@
+import os
+import time
+
+import pytest
+
+from polog.handlers.file.writer import file_writer
+from polog.handlers.file.rotation.retention import Retention
+from polog.handlers.file.rotation.compressor import Compressor
+from polog.handlers.file.rotation.background_worker import BackgroundWorker
+
+
+def create_files(directory, names_and_sizes):
+    """
+    Создаем в директории файлы указанных размеров. Время изменения файлов возрастает в том порядке, в котором они перечислены.
+    """
+    os.makedirs(directory, exist_ok=True)
+    now = time.time()
+    for index, (name, size) in enumerate(names_and_sizes):
+        path = os.path.join(directory, name)
+        with open(path, 'wb') as file:
+            file.write(b'k' * size)
+        moment = now - len(names_and_sizes) + index
+        os.utime(path, (moment, moment))
+
+
+@pytest.mark.parametrize('source, expected', [
+    ('10 files', (10, None, None)),
+    ('1 file', (1, None, None)),
+    ('5 gb', (None, 5 * 1024 * 1024 * 1024, None)),
+    ('30 days', (None, None, 30 * 24 * 60 * 60)),
+    ('10 files, 5 gb; 30 days', (10, 5 * 1024 * 1024 * 1024, 30 * 24 * 60 * 60)),
+])
+def test_parse_retention(source, expected):
+    """
+    Проверяем разбор строки с лимитами.
+    """
+    assert Retention.parse(source) == expected
+
+@pytest.mark.parametrize('source', ['', 'kek', '0 files', '-1 gb', '10 files, 20 files', '10 lines', 5])
+def test_parse_wrong_retention(source):
+    """
+    Проверяем, что для некорректных строк поднимается ValueError.
+    """
+    with pytest.raises(ValueError):
+        Retention.parse(source)
+
+def test_retention_by_number_of_files(dirname_for_test):
+    """
+    Проверяем, что при запуске удаляются самые старые файлы сверх лимита, а посторонние файлы не трогаются.
+    """
+    create_files(dirname_for_test, [('1.logs', 1), ('2.logs.gz', 1), ('other.txt', 1), ('3.logs', 1), ('4.logs.xz', 1)])
+
+    retention = Retention('2 files', dirname_for_test, '.logs', extensions=('.gz', '.xz'))
+    retention.add(os.path.join(dirname_for_test, '4.logs'))
+    assert retention.worker.wait(5) == True
+
+    assert sorted(os.listdir(dirname_for_test)) == ['3.logs', '4.logs.xz', 'other.txt']
+    assert [os.path.basename(path) for path, _ in retention.index] == ['3.logs', '4.logs.xz']
+
+def test_retention_by_size(dirname_for_test):
+    """
+    Проверяем, что удаляются самые старые файлы, пока их суммарный размер больше лимита.
+    """
+    create_files(dirname_for_test, [('1.logs', 600), ('2.logs', 600), ('3.logs', 600)])
+
+    retention = Retention('1 kb', dirname_for_test, '.logs')
+    retention.add(os.path.join(dirname_for_test, '3.logs'))
+    assert retention.worker.wait(5) == True
+
+    assert sorted(os.listdir(dirname_for_test)) == ['3.logs']
+
+def test_retention_by_age(dirname_for_test):
+    """
+    Проверяем, что удаляются файлы старше указанного возраста.
+    """
+    create_files(dirname_for_test, [('1.logs', 1), ('2.logs', 1)])
+    long_ago = time.time() - 2 * 24 * 60 * 60
+    os.utime(os.path.join(dirname_for_test, '1.logs'), (long_ago, long_ago))
+
+    retention = Retention('1 day', dirname_for_test, '.logs')
+    retention.add(os.path.join(dirname_for_test, '2.logs'))
+    assert retention.worker.wait(5) == True
+
+    assert sorted(os.listdir(dirname_for_test)) == ['2.logs']
+
+def test_index_is_updated_without_rescan(dirname_for_test, monkeypatch):
+    """
+    Проверяем, что после первоначального сканирования новые файлы добавляются в индекс без обхода директории.
+    """
+    create_files(dirname_for_test, [('1.logs', 1)])
+    retention = Retention('2 files', dirname_for_test, '.logs', extensions=('.gz',))
+    assert retention.worker.wait(5) == True
+
+    calls = []
+    original_listdir = os.listdir
+    monkeypatch.setattr(os, 'listdir', lambda *args: calls.append(args) or original_listdir(*args))
+
+    for name in ('2.logs.gz', '3.logs'):
+        create_files(dirname_for_test, [(name, 1)])
+        retention.add(os.path.join(dirname_for_test, name.replace('.gz', '')))
+        assert retention.worker.wait(5) == True
+
+    assert calls == []
+    monkeypatch.undo()
+    assert sorted(os.listdir(dirname_for_test)) == ['2.logs.gz', '3.logs']
+
+def test_file_writer_with_retention_and_compression(filename_for_test, dirname_for_test):
+    """
+    Проверяем, что файловый обработчик хранит только указанное количество ротированных (и сжатых) файлов.
+    """
+    dirname = os.path.join(dirname_for_test, 'rotation_dir')
+    handler = file_writer(filename_for_test, rotation=f'1 line >> {dirname}', compression='gzip', retention='2 files')
+
+    for index in range(6):
+        handler.do(f'kek {index}\n')
+    assert handler.rotator.worker.wait(5) == True
+
+    archives = [x for x in os.listdir(dirname) if not x.endswith('.lock')]
+    assert len(archives) == 2
+    assert all(x.endswith('.logs.gz') for x in archives)
+
+def test_retention_without_rotation(filename_for_test):
+    """
+    Проверяем, что лимиты для ротированных файлов нельзя задать без ротации, а некорректные лимиты не принимаются.
+    """
+    with pytest.raises(ValueError):
+        file_writer(filename_for_test, retention='2 files')
+    with pytest.raises(ValueError):
+        file_writer(filename_for_test, rotation='1 mb', retention='kek')
+    with pytest.raises(ValueError):
+        file_writer(filename_for_test, rotation='1 mb', retention=2)
+
+def test_index_is_updated_after_recovery_compression(dirname_for_test, monkeypatch):
+    """
+    Проверяем, что когда компрессор сжимает файлы, оставшиеся от прошлых запусков, индекс сразу указывает на сжатые файлы с их реальными размерами, без повторного обхода директории.
+    """
+    create_files(dirname_for_test, [('1.logs', 1000), ('2.logs', 1000)])
+    for index, name in enumerate(('1.logs', '2.logs')):
+        long_ago = time.time() - Compressor.RECENT_FILE_AGE * 2 + index
+        os.utime(os.path.join(dirname_for_test, name), (long_ago, long_ago))
+    worker = BackgroundWorker()
+    compressor = Compressor('gzip', worker=worker)
+    compressor.recover(dirname_for_test, '.logs')
+    retention = Retention('10 files', dirname_for_test, '.logs', extensions=('.gz',), worker=worker)
+    compressor.add_listener(retention.replace)
+    compressor.add_listener(retention.replace)
+
+    calls = []
+    original_listdir = os.listdir
+    monkeypatch.setattr(os, 'listdir', lambda *args: calls.append(args) or original_listdir(*args))
+    assert worker.wait(5) == True
+    monkeypatch.undo()
+
+    assert len(calls) == 2
+    assert compressor.listeners == [retention.replace]
+    assert [(os.path.basename(path), size) for path, (size, _) in retention.index] == [(name, os.stat(os.path.join(dirname_for_test, name)).st_size) for name in ('1.logs.gz', '2.logs.gz')]
+
+def test_names_with_collision_suffix(dirname_for_test):
+    """
+    Проверяем, что ротированные файлы с числовым суффиксом, добавленным при совпадении имен, учитываются и удаляются наравне с остальными.
+    """
+    create_files(dirname_for_test, [('1.logs_1.gz', 1), ('1_1.logs', 1), ('2.logs.gz', 1), ('other_1.txt', 1)])
+
+    retention = Retention('1 file', dirname_for_test, '.logs', extensions=('.gz',))
+    retention.add(os.path.join(dirname_for_test, '2.logs'))
+    assert retention.worker.wait(5) == True
+
+    assert sorted(os.listdir(dirname_for_test)) == ['2.logs.gz', 'other_1.txt']
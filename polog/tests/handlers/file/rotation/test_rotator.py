@@ -73,3 +73,22 @@ def test_wrong_number_of_rules_to_rotation():
 
     with pytest.raises(ValueError):
         rotator = Rotator(f'3 kilobyte >> logs.log >> kek.log', FileDependencyWrapper((), lock_type='thread+file'))
+
+def test_rotation_by_number_of_lines(number_of_strings_in_the_files, dirname_for_test, filename_for_test):
+    """
+    Проверяем ротацию по количеству строк: в каждом ротированном файле должно оказаться ровно столько строк, сколько указано в правиле.
+    Заодно проверяем, что после ротации, вызванной другим правилом, счетчик строк начинается заново.
+    """
+    dirname = os.path.join(dirname_for_test, 'rotation_dir')
+    handler = file_writer(filename_for_test, rotation=f'3 lines >> {dirname}')
+
+    for index in range(7):
+        handler.do(f'kek {index}\n')
+
+    archives = [os.path.join(dirname, x) for x in os.listdir(dirname) if not x.endswith('.lock')]
+    assert len(archives) == 2
+    assert [number_of_strings_in_the_files(x) for x in archives] == [3, 3]
+    assert number_of_strings_in_the_files(filename_for_test) == 1
+
+    handler.rotator.do()
+    assert [rule.counter for rule in handler.rotator.rules] == [1]
@@ -6,6 +6,7 @@ import pytest
 
 from polog import json_vars
 from polog.handlers.file.base_formatter import BaseFormatter
+from polog.core.log_item import LogItem
 from polog.core.utils.signature_matcher import SignatureMatcher
 
 
@@ -137,3 +138,33 @@ def test_width_and_align():
         if key in norms:
             norm_lenth = norms[key][0]
             assert len(value) >= norm_lenth
+
+def test_formatted_string_is_shared_between_formatters():
+    """
+    Проверяем, что одинаково настроенные форматтеры форматируют один и тот же лог только один раз, а по-разному настроенные - каждый сам.
+    """
+    calls = []
+
+    class CountingFormatter(BaseFormatter):
+        def _get_formatted_string(self, log):
+            calls.append(self)
+            return super()._get_formatted_string(log)
+
+    log = LogItem()
+    log.set_data({'level': 1, 'auto': False, 'message': 'kek'})
+    first = CountingFormatter('\n')
+    second = CountingFormatter('\n')
+    third = CountingFormatter('\r\n')
+
+    assert first.get_formatted_string(log) is second.get_formatted_string(log)
+    assert len(calls) == 1
+    assert third.get_formatted_string(log) == first.get_formatted_string(log)[:-1] + '\r\n'
+    assert len(calls) == 2
+
+    other_log = LogItem()
+    other_log.set_data({'level': 1, 'auto': False, 'message': 'lol'})
+    assert '"lol"' in second.get_formatted_string(other_log)
+    assert len(calls) == 3
+
+    assert first.get_formatted_string({'level': 1, 'message': 'kek'}) == first.get_formatted_string({'level': 1, 'message': 'kek'})
+    assert len(calls) == 5
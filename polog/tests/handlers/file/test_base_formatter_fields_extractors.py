@@ -7,6 +7,8 @@ from polog.handlers.file.base_formatter_fields_extractors import BaseFormatterFi
 from polog.core.utils.get_traceback import get_traceback
 from polog import config, json_vars
 from polog.core.stores.settings.settings_store import SettingsStore
+from polog.core.log_item import LogItem
+from polog.utils.json_vars import vars_to_dict, get_item
 
 
 def test_full_time():
@@ -17,6 +19,17 @@ def test_full_time():
     tag_string = '[2021-02-07 23:46:00]'
     assert Extractors.time({'time': tag}) == tag_string
 
+def test_time_from_timestamp():
+    """
+    Проверяем, что время, хранящееся в логе как число секунд с начала эпохи, выводится так же, как объект datetime, в том числе когда строка с секундами берется из кэша.
+    """
+    stamp = 1612730760.0
+    for time in (stamp, stamp + 0.5, stamp + 0.000001, stamp + 0.9999996, stamp + 1, int(stamp)):
+        assert Extractors.time({'time': time}) == f'[{datetime.datetime.fromtimestamp(time)}]'
+        log = LogItem()
+        log.set_data({'time': time})
+        assert Extractors.time(log) == f'[{datetime.datetime.fromtimestamp(time)}]'
+
 def test_empty_time():
     """
     Проверка, что при отсутствии поля time возвращается None.
@@ -31,6 +44,15 @@ def test_full_level():
     config.levels(SOMELEVEL=123)
     assert Extractors.level({'level': 123}) == 'SOMELEVEL'
 
+def test_level_names_cache_refreshes():
+    """
+    Проверяем, что закэшированные названия уровней обновляются при изменении соответствий.
+    """
+    config.levels(SOMELEVEL_2=124)
+    assert Extractors.level({'level': 124}) == 'SOMELEVEL_2'
+    config.levels(SOMELEVEL_3=124)
+    assert Extractors.level({'level': 124}) == 'SOMELEVEL_3'
+
 def test_empty_level():
     """
     Проверка, что при отсутствии поля level возвращается None.
@@ -87,6 +109,16 @@ def test_full_function():
     assert Extractors.function({'function': 'lol', 'module': 'kek', 'class': 'KekoClass'}) == 'where: keko_service.kek.KekoClass.lol()'
     assert Extractors.function({'module': 'kek', 'class': 'KekoClass'}) == 'where: keko_service.kek.KekoClass.?'
 
+def test_locations_cache_is_bounded():
+    """
+    Проверяем, что кэш мест в коде не растет бесконечно.
+    """
+    config.set(service_name=None)
+    for index in range(Extractors.MAX_LOCATIONS_CACHE_SIZE + 10):
+        assert Extractors.function({'function': f'lol_{index}'}) == f'where: lol_{index}()'
+    assert len(Extractors.locations_cache) <= Extractors.MAX_LOCATIONS_CACHE_SIZE
+    config.set(service_name='keko_service')
+
 def test_full_input_variables():
     """
     Проверка, что входные параметры функции форматируются корректно.
@@ -96,6 +128,29 @@ def test_full_input_variables():
     vars = json_vars(1, 2, 3, lol='kek')
     assert Extractors.input_variables({'input_variables': vars}) == 'input variables: 1 (int), 2 (int), 3 (int), lol = "kek" (str)'
 
+def test_structured_variables_in_log_item():
+    """
+    Проверка, что переменные, хранящиеся в логе в виде структур, форматируются так же, как и JSON, и при этом лог не сериализует их в JSON.
+    """
+    log = LogItem()
+    log.set_data({'input_variables': vars_to_dict(1, lol='kek'), 'local_variables': vars_to_dict(a=1), 'result': get_item(2)})
+
+    assert Extractors.input_variables(log) == 'input variables: 1 (int), lol = "kek" (str)'
+    assert Extractors.local_variables(log) == 'local variables: a = 1 (int)'
+    assert Extractors.result(log) == 'result: 2 (int)'
+    assert not hasattr(log, '_converted')
+
+def test_truncated_input_variables():
+    """
+    Проверка, что метки обрезки и отброшенные переменные отображаются в человекочитаемом виде.
+    """
+    config.set(max_variable_length=3, max_variables=2)
+    try:
+        vars = json_vars('hello', 2, 3)
+    finally:
+        config.set(max_variable_length=10000, max_variables=100)
+    assert Extractors.input_variables({'input_variables': vars}) == 'input variables: "hel..." (str, truncated, 5 chars), 2 (int), ... (1 more omitted)'
+
 def test_empty_input_variables():
     """
     Проверка, что при отсутствии поля input_variables возвращается None.
@@ -178,3 +233,4 @@ def test_traceback_full():
         assert len(handled_trace) > len('traceback: ')
         assert "raise ValueError('lol')" in handled_trace
         assert "in test_traceback_full" in handled_trace
+        assert Extractors.traceback({'traceback': get_traceback(serialize=False)}) == handled_trace
@@ -0,0 +1,203 @@
+import time
+
+import pytest
+
+from polog import file_writer, log as polog_log
+from polog.core.engine.engine import Engine
+from polog.core.log_item import LogItem
+from polog.handlers.file.file_dependency_wrapper import FileDependencyWrapper
+from polog.handlers.file.buffered_file_wrapper import BufferedFileWrapper
+
+
+class FileMock:
+    """
+    Заглушка для FileDependencyWrapper, запоминающая все вызовы.
+    """
+    binary = False
+
+    def __init__(self):
+        self.writes = []
+        self.flushes = 0
+        self.fsyncs = 0
+        self.moved = []
+
+    def write(self, data):
+        self.writes.append(data)
+
+    def flush(self):
+        self.flushes += 1
+
+    def fsync(self):
+        self.fsyncs += 1
+
+    def get_size(self):
+        return sum(len(x) for x in self.writes)
+
+    def move_file(self, path):
+        self.moved.append((path, list(self.writes)))
+
+    def close(self):
+        pass
+
+def read(filename):
+    with open(filename, 'r', encoding='utf-8') as file:
+        return file.read()
+
+def test_flush_by_size():
+    """
+    Проверяем, что буфер сбрасывается одной записью, как только в нем накапливается нужное количество байт.
+    """
+    mock = FileMock()
+    wrapper = BufferedFileWrapper(mock, 10, 100)
+
+    wrapper.write('12345')
+    wrapper.write('6789')
+    assert mock.writes == []
+    assert wrapper.get_size() == 9
+
+    wrapper.write('0')
+    assert mock.writes == ['1234567890']
+    assert mock.flushes == 1
+    assert mock.fsyncs == 0
+    wrapper.close()
+
+def test_flush_by_interval():
+    """
+    Проверяем, что фоновый поток сбрасывает буфер по таймеру.
+    """
+    mock = FileMock()
+    wrapper = BufferedFileWrapper(mock, 1000, 0.01)
+
+    wrapper.write('kek')
+    time.sleep(0.2)
+
+    assert mock.writes == ['kek']
+    wrapper.close()
+
+def test_fsync_policies():
+    """
+    Проверяем политики вызова fsync.
+    """
+    mock = FileMock()
+    wrapper = BufferedFileWrapper(mock, 1, 100, fsync='flush')
+    wrapper.write('kek')
+    wrapper.write('lol')
+    assert mock.fsyncs == 2
+    wrapper.close()
+
+    mock = FileMock()
+    wrapper = BufferedFileWrapper(mock, 1, 100, fsync=100)
+    wrapper.write('kek')
+    assert mock.fsyncs == 0
+    wrapper.fsync_policy = 0
+    wrapper.write('lol')
+    assert mock.fsyncs == 1
+    wrapper.close()
+
+def test_drain_before_rotation():
+    """
+    Перед перемещением файла буфер должен сбрасываться в старый файл.
+    """
+    mock = FileMock()
+    wrapper = BufferedFileWrapper(mock, 1000, 100)
+    wrapper.write('kek')
+    wrapper.move_file('lol')
+
+    assert mock.moved == [('lol', ['kek'])]
+    wrapper.close()
+
+def test_bytes_and_str_are_converted():
+    """
+    Проверяем, что строки и байты приводятся к режиму файла.
+    """
+    mock = FileMock()
+    mock.binary = True
+    wrapper = BufferedFileWrapper(mock, 1000, 100)
+    wrapper.write('кек')
+    wrapper.write(b'lol')
+    wrapper.flush()
+
+    assert mock.writes == ['кек'.encode('utf-8') + b'lol']
+    wrapper.close()
+
+def test_drain_on_engine_stop(filename_for_test):
+    """
+    Проверяем, что буфер сбрасывается при остановке (перезагрузке) движка.
+    """
+    polog_log('the engine must be started')
+    wrapper = BufferedFileWrapper(FileDependencyWrapper([filename_for_test], 'thread'), 1000, 100)
+    wrapper.write('kek\n')
+    assert read(filename_for_test) == ''
+
+    Engine().reload()
+    assert read(filename_for_test) == 'kek\n'
+    wrapper.close()
+
+def test_callbacks_are_removed_on_close():
+    """
+    Проверяем, что при закрытии обертки ее функция сброса буфера убирается из движка.
+    """
+    wrapper = BufferedFileWrapper(FileMock(), 1000, 100)
+    assert wrapper.stop_callback in Engine().stop_callbacks
+
+    wrapper.close()
+    assert wrapper.stop_callback not in Engine().stop_callbacks
+    wrapper.close()
+
+def test_file_writer_buffered_mode(filename_for_test):
+    """
+    Проверяем буферизованный режим файлового обработчика.
+    """
+    handler = file_writer(filename_for_test, formatter=lambda log: log['message'], separator='', buffer_size=10, flush_interval=100)
+    assert handler.forced_flush == False
+
+    log = LogItem()
+    log.set_data({'message': 'kek'})
+    handler(log)
+    assert read(filename_for_test) == ''
+
+    log = LogItem()
+    log.set_data({'message': 'lollollol'})
+    handler(log)
+    assert read(filename_for_test) == 'keklollollol'
+    handler.file.close()
+
+@pytest.mark.parametrize('arguments', [{'buffer_size': 0}, {'buffer_size': 1.5}, {'buffer_size': True}, {'buffer_size': 10, 'flush_interval': 0}, {'buffer_size': 10, 'fsync': 'always'}, {'buffer_size': 10, 'fsync': -1}])
+def test_wrong_buffering_arguments(arguments):
+    with pytest.raises(ValueError):
+        file_writer(**arguments)
+
+def test_batches_in_atomic_append_mode():
+    """
+    Проверяем, что в режиме атомарной дозаписи буфер записывается пачками не больше ATOMIC_BATCH_LIMIT байт, а отдельные логи не разрываются.
+    """
+    class AtomicFile(FileMock):
+        atomic_append = True
+
+    wrapper = BufferedFileWrapper(AtomicFile(), 100, 100)
+    wrapper.ATOMIC_BATCH_LIMIT = 5
+    assert wrapper.get_batches(['aa', 'bb', 'c', 'dddddddd', 'e']) == [['aa', 'bb', 'c'], ['dddddddd'], ['e']]
+
+    wrapper = BufferedFileWrapper(FileMock(), 100, 100)
+    wrapper.ATOMIC_BATCH_LIMIT = 5
+    assert wrapper.get_batches(['aa', 'bb', 'c', 'dddddddd', 'e']) == [['aa', 'bb', 'c', 'dddddddd', 'e']]
+
+def test_drain_uses_write_lines():
+    """
+    Проверяем, что, если обертка файла умеет записывать список логов, буфер передается ей без склеивания.
+    """
+    class LinesFile(FileMock):
+        def __init__(self):
+            super().__init__()
+            self.lines = []
+        def write_lines(self, lines):
+            self.lines.append(list(lines))
+
+    file = LinesFile()
+    wrapper = BufferedFileWrapper(file, 100, 100)
+    wrapper.write('kek\n')
+    wrapper.write('lol\n')
+    wrapper.flush()
+
+    assert file.lines == [['kek\n', 'lol\n']]
+    assert file.writes == []
@@ -0,0 +1,98 @@
+import io
+import os
+import gzip
+import lzma
+
+import pytest
+
+from polog.handlers.file.file_dependency_wrapper import FileDependencyWrapper
+from polog.handlers.file.compressed_file_wrapper import CompressedFileWrapper
+
+
+OPENERS = {
+    'gzip': gzip.open,
+    'lzma': lzma.open,
+}
+
+@pytest.mark.parametrize('method', ['gzip', 'lzma'])
+def test_flush_points(filename_for_test, method):
+    """
+    Проверяем, что каждый сброс записывает в файл законченный сжатый поток, и все, что было сброшено, можно прочитать, даже если файл не был закрыт.
+    """
+    wrapper = CompressedFileWrapper(FileDependencyWrapper([filename_for_test], lock_type='thread'), method)
+    wrapper.write('кек\n')
+    wrapper.write_lines([b'lol\n', 'cheburek\n'])
+    assert wrapper.get_size() == 0
+    wrapper.flush()
+    size = wrapper.get_size()
+    assert size == os.stat(filename_for_test).st_size
+    wrapper.flush()
+    assert wrapper.get_size() == size
+
+    wrapper.write('perekek\n')
+    wrapper.flush()
+    wrapper.write('not flushed\n')
+
+    with OPENERS[method](filename_for_test, 'rt', encoding='utf-8') as file:
+        assert file.read() == 'кек\nlol\ncheburek\nperekek\n'
+
+    wrapper.close()
+
+    with OPENERS[method](filename_for_test, 'rt', encoding='utf-8') as file:
+        assert file.read() == 'кек\nlol\ncheburek\nperekek\nnot flushed\n'
+
+@pytest.mark.parametrize('method', ['gzip', 'lzma'])
+def test_append_after_restart(filename_for_test, method):
+    """
+    Проверяем, что после перезапуска новые сжатые потоки дописываются в конец того же файла, и он остается читаемым.
+    """
+    for line in ('kek\n', 'lol\n'):
+        wrapper = CompressedFileWrapper(FileDependencyWrapper([filename_for_test], lock_type='thread'), method)
+        wrapper.write(line)
+        wrapper.close()
+
+    with OPENERS[method](filename_for_test, 'rb') as file:
+        assert file.read() == b'kek\nlol\n'
+
+def test_move_file(filename_for_test, dirname_for_test):
+    """
+    Проверяем, что перед ротацией все отложенные логи записываются в старый файл.
+    """
+    destination = os.path.join(dirname_for_test, 'rotated.logs.gz')
+    wrapper = CompressedFileWrapper(FileDependencyWrapper([filename_for_test], lock_type='thread'), 'gzip')
+    wrapper.write('kek\n')
+    assert wrapper.move_file(destination) == destination
+    wrapper.write('lol\n')
+    wrapper.close()
+
+    with gzip.open(destination, 'rb') as file:
+        assert file.read() == b'kek\n'
+    with gzip.open(filename_for_test, 'rb') as file:
+        assert file.read() == b'lol\n'
+
+def test_proxy_attributes(filename_for_test):
+    """
+    Проверяем, что атрибуты исходной обертки доступны через сжимающую обертку.
+    """
+    file = FileDependencyWrapper([filename_for_test], lock_type='thread')
+    wrapper = CompressedFileWrapper(file, 'lzma')
+
+    assert wrapper.filename == filename_for_test
+    assert wrapper.binary == True
+    assert wrapper.extension == '.xz'
+    wrapper.close()
+
+@pytest.mark.parametrize('method', ['bz2', 'zip', None])
+def test_unknown_method(filename_for_test, method):
+    """
+    Проверяем, что неизвестный метод сжатия не принимается.
+    """
+    with pytest.raises(ValueError):
+        CompressedFileWrapper(FileDependencyWrapper([filename_for_test], lock_type='thread'), method)
+
+def test_text_file_object():
+    """
+    Проверяем, что сжатые логи нельзя записывать в текстовый файловый объект.
+    """
+    with pytest.raises(ValueError):
+        CompressedFileWrapper(FileDependencyWrapper([io.StringIO()], lock_type='thread'), 'gzip')
@@ -0,0 +1,228 @@
+import io
+import os
+
+import pytest
+
+from polog.handlers.file.file_dependency_wrapper import FileDependencyWrapper
+
+
+def test_file_by_name_is_binary(filename_for_test):
+    """
+    Проверяем, что файл, открытый по имени, открывается в бинарном режиме, и в него можно писать как строки, так и байты.
+    """
+    wrapper = FileDependencyWrapper([filename_for_test], lock_type='thread')
+    assert wrapper.binary == True
+
+    wrapper.write('кек\n')
+    wrapper.write('лол\n'.encode('utf-8'))
+    wrapper.flush()
+    wrapper.reopen()
+    wrapper.write('чебурек\n')
+    wrapper.close()
+
+    with open(filename_for_test, 'r', encoding='utf-8') as file:
+        assert file.read() == 'кек\nлол\nчебурек\n'
+    assert wrapper.binary == True
+
+def test_write_bytes_to_text_file_object():
+    """
+    Проверяем, что байты перекодируются в строку при записи в текстовый файловый объект.
+    """
+    class TextFile(io.StringIO):
+        mode = 'w'
+
+    file = TextFile()
+    wrapper = FileDependencyWrapper([file], lock_type='thread')
+    assert wrapper.binary == False
+
+    wrapper.write('кек'.encode('utf-8'))
+    wrapper.write('лол')
+
+    assert file.getvalue() == 'кеклол'
+
+def test_write_str_to_binary_file_object():
+    """
+    Проверяем, что строки кодируются в UTF-8 при записи в бинарный файловый объект.
+    """
+    class BinaryFile(io.BytesIO):
+        mode = 'ab'
+
+    file = BinaryFile()
+    wrapper = FileDependencyWrapper([file], lock_type='thread')
+    assert wrapper.binary == True
+
+    wrapper.write('кек')
+    wrapper.write(b'lol')
+
+    assert file.getvalue() == 'кек'.encode('utf-8') + b'lol'
+
+def test_size_counter_without_stat(filename_for_test, monkeypatch):
+    """
+    Проверяем, что размер файла считается по записанным байтам, без обращения к файловой системе на каждую запись.
+    """
+    with open(filename_for_test, 'w') as file:
+        file.write('12345')
+
+    wrapper = FileDependencyWrapper([filename_for_test], lock_type='thread')
+    assert wrapper.get_size() == 5
+
+    calls = []
+    original_stat = os.stat
+    monkeypatch.setattr(os, 'stat', lambda *args, **kwargs: calls.append(args) or original_stat(*args, **kwargs))
+
+    wrapper.write('кек\n')
+    wrapper.write(b'lol\n')
+    assert wrapper.get_size() == 5 + len('кек\n'.encode('utf-8')) + 4
+    assert calls == []
+
+    monkeypatch.undo()
+    wrapper.flush()
+    assert wrapper.get_size() == os.stat(filename_for_test).st_size
+    wrapper.close()
+
+def test_size_counter_sync_after_reopen(filename_for_test):
+    """
+    Проверяем, что после переоткрытия файла счетчик сверяется с реальным размером файла.
+    """
+    wrapper = FileDependencyWrapper([filename_for_test], lock_type='thread')
+    wrapper.write('kek')
+    wrapper.flush()
+
+    with open(filename_for_test, 'w') as file:
+        file.write('a')
+
+    assert wrapper.get_size() == 3
+    wrapper.reopen()
+    assert wrapper.get_size() == 1
+    wrapper.close()
+
+def test_size_counter_periodic_sync(filename_for_test):
+    """
+    Проверяем, что счетчик время от времени сверяется с файловой системой: каждые SIZE_SYNC_WRITES записей, а при файловой блокировке - еще и по времени. Так учитываются записи других процессов.
+    """
+    wrapper = FileDependencyWrapper([filename_for_test], lock_type='thread')
+    wrapper.SIZE_SYNC_WRITES = 2
+    wrapper.write('kek')
+    wrapper.flush()
+
+    with open(filename_for_test, 'a') as file:
+        file.write('other process')
+
+    assert wrapper.get_size() == 3
+    wrapper.write('kek')
+    wrapper.flush()
+    assert wrapper.get_size() == 6 + len('other process')
+    wrapper.close()
+
+    wrapper = FileDependencyWrapper([filename_for_test], lock_type='thread+file')
+    wrapper.SIZE_SYNC_INTERVAL = 0
+    size = wrapper.get_size()
+    with open(filename_for_test, 'a') as file:
+        file.write('lol')
+    wrapper.sync_size()
+    assert wrapper.get_size() == size + 3
+    wrapper.close()
+
+def test_size_of_file_object():
+    """
+    Проверяем, что для файловых объектов от пользователя размер всегда нулевой.
+    """
+    file = io.StringIO()
+    wrapper = FileDependencyWrapper([file], lock_type='thread')
+    wrapper.write('kek')
+    assert wrapper.get_size() == 0
+
+def test_move_file_returns_destination(filename_for_test, dirname_for_test):
+    """
+    Проверяем, что при ротации файл переименовывается, по исходному пути открывается новый, а если место назначения занято - к имени добавляется суффикс.
+    """
+    wrapper = FileDependencyWrapper([filename_for_test], lock_type='thread')
+    destination = os.path.join(dirname_for_test, 'rotated', 'kek.logs')
+
+    wrapper.write('lol\n')
+    assert wrapper.move_file(destination) == destination
+    wrapper.write('cheburek\n')
+    assert wrapper.move_file(destination) == os.path.join(dirname_for_test, 'rotated', 'kek_1.logs')
+    wrapper.close()
+
+    with open(destination) as file:
+        assert file.read() == 'lol\n'
+    with open(os.path.join(dirname_for_test, 'rotated', 'kek_1.logs')) as file:
+        assert file.read() == 'cheburek\n'
+    assert wrapper.get_size() == 0
+
+def test_rotation_by_another_wrapper(filename_for_test, dirname_for_test):
+    """
+    Имитируем два процесса, которые пишут в один файл.
+
+    Проверяем, что:
+    1. Если файл уже ротировал кто-то другой, повторной ротации не происходит, файл просто переоткрывается.
+    2. Тот, кто не пытался ротировать файл, замечает ротацию при очередной сверке размера и переоткрывает файл. До этого его записи попадают в ротированный файл и не теряются.
+    """
+    first = FileDependencyWrapper([filename_for_test], lock_type='thread+file')
+    second = FileDependencyWrapper([filename_for_test], lock_type='thread+file')
+    destination = os.path.join(dirname_for_test, 'rotated.logs')
+
+    first.write('1\n')
+    first.flush()
+    assert first.move_file(destination) == destination
+
+    second.write('2\n')
+    second.flush()
+    assert second.move_file(os.path.join(dirname_for_test, 'other.logs')) is None
+    second.write('3\n')
+    second.flush()
+
+    assert first.move_file(destination) == os.path.join(dirname_for_test, 'rotated_1.logs')
+    second.write('4\n')
+    second.flush()
+    second.sync_size()
+    second.write('5\n')
+    second.flush()
+
+    with open(destination) as file:
+        assert file.read() == '1\n2\n'
+    with open(os.path.join(dirname_for_test, 'rotated_1.logs')) as file:
+        assert file.read() == '3\n4\n'
+    with open(filename_for_test) as file:
+        assert file.read() == '5\n'
+    assert not os.path.exists(os.path.join(dirname_for_test, 'other.logs'))
+    first.close()
+    second.close()
+
+def test_atomic_append_mode(filename_for_test, dirname_for_test):
+    """
+    Проверяем режим атомарной дозаписи: файл открыт без буферизации, запись идет без блокировок, а после ротации старый файловый объект не закрывается явно.
+    """
+    wrapper = FileDependencyWrapper([filename_for_test], lock_type='thread', atomic_append=True)
+    assert wrapper.binary == True
+    assert isinstance(wrapper.file, io.FileIO)
+
+    wrapper.lock.thread_lock.lock.acquire()
+    wrapper.write('кек\n')
+    wrapper.write(b'lol\n')
+    wrapper.lock.thread_lock.lock.release()
+
+    with open(filename_for_test, 'r', encoding='utf-8') as file:
+        assert file.read() == 'кек\nlol\n'
+    assert wrapper.get_size() == len('кек\nlol\n'.encode('utf-8'))
+
+    old_file = wrapper.file
+    destination = os.path.join(dirname_for_test, 'rotated.logs')
+    assert wrapper.move_file(destination) == destination
+    assert old_file.closed == False
+    old_file.write(b'late\n')
+    wrapper.write('new\n')
+
+    with open(destination) as file:
+        assert file.read() == 'кек\nlol\nlate\n'
+    with open(filename_for_test) as file:
+        assert file.read() == 'new\n'
+    wrapper.close()
+
+def test_atomic_append_mode_without_path():
+    """
+    Проверяем, что режим атомарной дозаписи нельзя включить для файлового объекта.
+    """
+    with pytest.raises(ValueError):
+        FileDependencyWrapper([io.StringIO()], lock_type='thread', atomic_append=True)
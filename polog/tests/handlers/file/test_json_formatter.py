@@ -0,0 +1,185 @@
+import io
+import os
+import json
+import time
+import gzip
+import decimal
+import datetime
+
+import pytest
+import ujson
+import orjson
+
+from polog import JSONFormatter, jsonl_file_writer, file_writer, routing_file_writer
+from polog.core.log_item import LogItem
+from polog.core.stores.levels import Levels
+from polog.core.utils.raw_traceback import RawTraceback
+from polog.utils.json_vars import vars_to_dict, get_item
+
+
+def make_log(**fields):
+    log = LogItem()
+    log.set_data(fields)
+    return log
+
+def test_native_types():
+    """
+    Проверяем, что поля выводятся одной строкой компактного JSON с родными для JSON типами: время и время работы - числами, переменные и возвращаемое значение - вложенными объектами.
+    """
+    stamp = time.time()
+    log = make_log(level=1, auto=True, success=True, time=stamp, module='lol', function='kek', time_of_work=0.000123, input_variables=vars_to_dict(1, a='кек'), result=get_item(2), extra=[1, 2])
+    line = JSONFormatter()(log)
+
+    assert isinstance(line, bytes)
+    assert line.endswith(b'}\n')
+    assert line.count(b'\n') == 1
+    assert b' ' not in line
+    assert 'кек'.encode('utf-8') in line
+    assert json.loads(line) == {
+        'level': 1,
+        'auto': True,
+        'success': True,
+        'time': stamp,
+        'module': 'lol',
+        'function': 'kek',
+        'time_of_work': 0.000123,
+        'input_variables': {'args': [{'value': 1, 'type': 'int'}], 'kwargs': {'a': {'value': 'кек', 'type': 'str'}}},
+        'result': {'value': 2, 'type': 'int'},
+        'extra': [1, 2],
+    }
+
+def test_strings_are_not_decoded():
+    """
+    Проверяем, что строка в поле с переменными выводится как строка, без попытки разобрать ее как JSON.
+    """
+    log = make_log(level=1, input_variables='{"kek": 1}', message='hello')
+
+    assert json.loads(JSONFormatter()(log))['input_variables'] == '{"kek": 1}'
+
+def test_not_native_types():
+    """
+    Проверяем, что "сырой" трейсбек превращается в список строк, а прочие значения, которых нет в JSON, - в строки.
+    """
+    try:
+        raise ValueError
+    except ValueError as e:
+        traceback = RawTraceback.from_traceback(e.__traceback__)
+    log = make_log(level=1, traceback=traceback, lol=Levels, kek=(1, 2))
+    data = json.loads(JSONFormatter()(log))
+
+    assert data['traceback'] == traceback.format()
+    assert data['lol'] == str(Levels)
+    assert data['kek'] == '(1, 2)'
+
+@pytest.mark.parametrize('module', [json, ujson, orjson])
+def test_nested_not_native_types(module):
+    """
+    Проверяем, что вложенные значения, которых нет в JSON, приводятся к строкам, а лог не теряется.
+    """
+    dumps = JSONFormatter.get_dumps(module)
+    data = {'level': 1, 'input_variables': {'args': [{'value': {'when': datetime.date(2020, 1, 2), 'amount': decimal.Decimal('1.5')}, 'type': 'Model'}]}}
+
+    assert json.loads(dumps(data))['input_variables']['args'][0]['value'] == {'when': '2020-01-02', 'amount': '1.5'}
+
+def test_level_name():
+    """
+    Проверяем, что название уровня выводится, только если оно задано.
+    """
+    Levels.set('JSON_FORMATTER_LEVEL', 7777)
+
+    assert json.loads(JSONFormatter()(make_log(level=7777)))['level_name'] == 'JSON_FORMATTER_LEVEL'
+    assert 'level_name' not in json.loads(JSONFormatter()(make_log(level=7778)))
+
+@pytest.mark.parametrize('module', [json, ujson, orjson])
+def test_json_modules(module):
+    """
+    Проверяем, что для любого модуля сериализации получаются байты с компактным JSON.
+    """
+    dumps = JSONFormatter.get_dumps(module)
+    data = {'level': 1, 'message': 'кек', 'input_variables': {'args': [1, 2]}}
+
+    assert isinstance(dumps(data), bytes)
+    assert json.loads(dumps(data)) == data
+    assert b' ' not in dumps(data)
+
+def test_separator_and_dict():
+    """
+    Проверяем, что вместо лога можно передать словарь, а разделитель в конце строки настраивается.
+    """
+    assert JSONFormatter(separator='')({'message': 'hello'}) == b'{"message":"hello"}'
+    with pytest.raises(ValueError):
+        JSONFormatter(separator=1)
+
+def test_rendered_once():
+    """
+    Проверяем, что форматтеры с одинаковыми настройками используют общий кэш в объекте лога.
+    """
+    log = make_log(level=1, message='hello')
+
+    assert JSONFormatter()(log) is JSONFormatter()(log)
+    assert JSONFormatter(separator='\r\n')(log) == JSONFormatter()(log)[:-1] + b'\r\n'
+
+def test_jsonl_file_writer_with_buffering_and_rotation(filename_for_test, dirname_for_test):
+    """
+    Проверяем, что обработчик пишет логи в формате JSON Lines, в т. ч. с буферизацией и ротацией, и ни один лог не теряется.
+    """
+    destination = os.path.join(dirname_for_test, 'jsonl')
+    handler = jsonl_file_writer(filename_for_test, rotation=f'2 kb >> {destination}', buffer_size=512)
+    for index in range(200):
+        handler(make_log(level=1, auto=False, message=f'message {index}'))
+    handler.file.close()
+
+    rotated = [os.path.join(destination, x) for x in os.listdir(destination)]
+    assert rotated
+    result = []
+    for path in rotated + [filename_for_test]:
+        with open(path, 'r', encoding='utf-8') as file:
+            result.extend(json.loads(line) for line in file)
+    assert sorted(x['message'] for x in result) == sorted(f'message {index}' for index in range(200))
+
+def test_jsonl_file_writer_with_stream_compression(filename_for_test):
+    """
+    Проверяем, что логи в формате JSON Lines можно сжимать по мере записи.
+    """
+    handler = jsonl_file_writer(filename_for_test, stream_compression='gzip')
+    handler(make_log(level=1, auto=False, message='hello'))
+    handler.file.close()
+
+    with gzip.open(filename_for_test, 'rt', encoding='utf-8') as file:
+        assert [json.loads(x)['message'] for x in file] == ['hello']
+
+def test_jsonl_file_writer_with_text_file():
+    """
+    Проверяем, что в текстовый файловый объект логи записываются строками.
+    """
+    file = io.StringIO()
+    handler = jsonl_file_writer(file)
+    handler(make_log(level=1, auto=False, message='кек'))
+
+    assert json.loads(file.getvalue()) == {'level': 1, 'auto': False, 'message': 'кек'}
+
+def test_custom_formatter_in_jsonl_file_writer(filename_for_test):
+    """
+    Проверяем, что пользовательский форматтер заменяет JSON.
+    """
+    handler = jsonl_file_writer(filename_for_test, formatter=lambda log: 'kek\n')
+    handler(make_log(level=1, auto=False, message='hello'))
+    handler.file.close()
+
+    with open(filename_for_test, 'r') as file:
+        assert file.read() == 'kek\n'
+
+def test_json_formatter_in_other_handlers(filename_for_test, dirname_for_test):
+    """
+    Проверяем, что форматтер можно передать в обычный файловый обработчик и в обработчик с маршрутизацией.
+    """
+    handler = file_writer(filename_for_test, formatter=JSONFormatter())
+    handler(make_log(level=1, auto=False, message='hello'))
+    handler.file.close()
+    routing_handler = routing_file_writer(os.path.join(dirname_for_test, '{tenant}.jsonl'), formatter=JSONFormatter())
+    routing_handler(make_log(level=1, auto=False, message='hello', tenant='kek'))
+    routing_handler.close()
+
+    for path in (filename_for_test, os.path.join(dirname_for_test, 'kek.jsonl')):
+        with open(path, 'r', encoding='utf-8') as file:
+            assert json.loads(file.read())['message'] == 'hello'
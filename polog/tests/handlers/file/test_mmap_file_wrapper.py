@@ -0,0 +1,159 @@
+import io
+import os
+
+import pytest
+
+from polog import log as polog_log
+from polog.core.engine.engine import Engine
+from polog.handlers.file.mmap_file_wrapper import MmapFileWrapper
+from polog.handlers.file.segment_reader import SegmentReader
+
+
+def test_write_and_close(filename_for_test):
+    """
+    Проверяем, что пока файл открыт, он имеет размер сегмента, а при закрытии обрезается до реальной длины данных.
+    """
+    wrapper = MmapFileWrapper([filename_for_test], 'thread', 1024)
+    wrapper.write('кек\n')
+    wrapper.write(b'lol\n')
+    wrapper.flush()
+    wrapper.fsync()
+
+    assert os.stat(filename_for_test).st_size == 1024
+    assert wrapper.get_size() == len('кек\nlol\n'.encode('utf-8'))
+
+    wrapper.close()
+
+    with open(filename_for_test, 'r', encoding='utf-8') as file:
+        assert file.read() == 'кек\nlol\n'
+
+def test_write_lines(filename_for_test):
+    """
+    Проверяем, что несколько логов записываются разом.
+    """
+    wrapper = MmapFileWrapper([filename_for_test], 'thread', 1024)
+    wrapper.write_lines(['kek\n', b'lol\n'])
+    wrapper.write_lines([])
+    wrapper.close()
+
+    with open(filename_for_test, 'rb') as file:
+        assert file.read() == b'kek\nlol\n'
+
+def test_continue_after_crash(filename_for_test):
+    """
+    Проверяем, что после аварийного завершения (файл не был обрезан, в конце остались нулевые байты) запись продолжается с того места, где кончаются данные.
+    """
+    with open(filename_for_test, 'wb') as file:
+        file.write(b'kek\n' + b'\0' * 100)
+
+    wrapper = MmapFileWrapper([filename_for_test], 'thread', 1024)
+    assert wrapper.get_size() == 4
+    wrapper.write('lol\n')
+    wrapper.close()
+
+    with open(filename_for_test, 'rb') as file:
+        assert file.read() == b'kek\nlol\n'
+
+def test_grow_when_log_does_not_fit(filename_for_test):
+    """
+    Проверяем, что лог, который не помещается в остаток сегмента, записывается целиком, а сегмент после этого считается заполненным.
+    """
+    wrapper = MmapFileWrapper([filename_for_test], 'thread', 10)
+    wrapper.write('kek\n')
+    assert not wrapper.is_full()
+
+    wrapper.write('x' * 25 + '\n')
+    assert wrapper.is_full()
+    assert wrapper.capacity == 30
+    assert os.stat(filename_for_test).st_size == 30
+
+    wrapper.close()
+
+    with open(filename_for_test, 'r') as file:
+        assert file.read() == 'kek\n' + 'x' * 25 + '\n'
+
+def test_move_file(filename_for_test, dirname_for_test):
+    """
+    Проверяем, что при ротации файл обрезается до реальной длины данных и перемещается, а по исходному пути открывается новый сегмент. Если файл с таким именем уже есть, к имени добавляется суффикс.
+    """
+    destination = os.path.join(dirname_for_test, 'rotated', 'file.logs')
+    wrapper = MmapFileWrapper([filename_for_test], 'thread', 1024)
+
+    wrapper.write('kek\n')
+    assert wrapper.move_file(destination) == destination
+    wrapper.write('lol\n')
+    assert wrapper.move_file(destination) == os.path.join(dirname_for_test, 'rotated', 'file_1.logs')
+    wrapper.write('cheburek\n')
+    assert wrapper.get_size() == 9
+    wrapper.close()
+
+    with open(destination, 'rb') as file:
+        assert file.read() == b'kek\n'
+    with open(os.path.join(dirname_for_test, 'rotated', 'file_1.logs'), 'rb') as file:
+        assert file.read() == b'lol\n'
+    with open(filename_for_test, 'rb') as file:
+        assert file.read() == b'cheburek\n'
+
+def test_reopen(filename_for_test):
+    """
+    Проверяем, что при переоткрытии данные сохраняются, а запись продолжается с конца.
+    """
+    wrapper = MmapFileWrapper([filename_for_test], 'thread', 1024)
+    wrapper.write('kek\n')
+    wrapper.reopen()
+    wrapper.write('lol\n')
+    wrapper.close()
+
+    assert SegmentReader(filename_for_test).read() == ['kek', 'lol']
+
+def test_release_on_engine_stop(filename_for_test):
+    """
+    Проверяем, что после остановки (перезагрузки) движка файл обрезан до реальной длины данных, а логи, пришедшие позже (например, если функция из модуля atexit сработала раньше, чем движок дописал свою очередь), не теряются: файл открывается снова.
+    """
+    polog_log('the engine must be started')
+    wrapper = MmapFileWrapper([filename_for_test], 'thread', 1024)
+    wrapper.write('kek\n')
+
+    assert wrapper.stop_callback in Engine().stop_callbacks
+
+    Engine().reload()
+    assert os.stat(filename_for_test).st_size == len('kek\n')
+
+    wrapper.stop_callback()
+    wrapper.write('lol\n')
+    Engine().reload()
+
+    with open(filename_for_test, 'rb') as file:
+        assert file.read() == b'kek\nlol\n'
+    wrapper.close()
+
+def test_write_after_close(filename_for_test):
+    """
+    Проверяем, что при закрытии обертки ее функции убираются из движка, а запись в закрытый файл поднимает исключение.
+    """
+    wrapper = MmapFileWrapper([filename_for_test], 'thread', 1024)
+    wrapper.write('kek\n')
+    wrapper.close()
+
+    assert wrapper.stop_callback not in Engine().stop_callbacks
+    with pytest.raises(ValueError):
+        wrapper.write('lol\n')
+    with open(filename_for_test, 'rb') as file:
+        assert file.read() == b'kek\n'
+
+@pytest.mark.parametrize('arguments', [
+    ([], 'thread', 1024),
+    ([io.StringIO()], 'thread', 1024),
+    (['file.log'], 'file', 1024),
+    (['file.log'], 'thread+file', 1024),
+    (['file.log'], 'thread', 0),
+    (['file.log'], 'thread', -1),
+    (['file.log'], 'thread', True),
+    (['file.log'], 'thread', 1.5),
+])
+def test_wrong_arguments(arguments):
+    """
+    Проверяем, что режим отображения в память нельзя включить для файлового объекта или stdout, с файловой блокировкой или с неправильным размером сегмента.
+    """
+    with pytest.raises(ValueError):
+        MmapFileWrapper(*arguments)
@@ -0,0 +1,78 @@
+import pytest
+
+from polog import TemplateFormatter
+from polog.core.stores.levels import Levels
+from polog.core.log_item import LogItem
+from polog.handlers.file.path_template import PathTemplate
+
+
+def make_log(**fields):
+    log = LogItem()
+    log.set_data(fields)
+    return log
+
+def test_simple_path():
+    """
+    Проверяем подстановку полей в путь. Разделитель строк в конец пути не добавляется, отсутствующие поля заменяются заглушкой.
+    """
+    template = PathTemplate('logs/{service_name}/{level}[[/{tenant}]].log')
+
+    assert template(make_log(service_name='base', level=10)) == 'logs/base/10.log'
+    assert template(make_log(service_name='base', level=10, tenant='kek')) == 'logs/base/10/kek.log'
+    assert template(make_log(level=10)) == 'logs/unknown/10.log'
+
+@pytest.mark.parametrize('value, expected', [
+    ('kek', 'kek'),
+    ('k/e/k', 'k_e_k'),
+    ('k\\e\\k', 'k_e_k'),
+    ('../../etc/passwd', '.._.._etc_passwd'),
+    ('..', '__'),
+    ('.', '_'),
+    ('...', '___'),
+    ('.kek', '.kek'),
+    ('k\0k', 'k_k'),
+    ('', 'unknown'),
+])
+def test_sanitize_values(value, expected):
+    """
+    Проверяем, что значения полей не могут добавить в путь директории или подняться на уровень выше.
+    """
+    assert PathTemplate.sanitize(value) == expected
+    assert PathTemplate('logs/{tenant}.log')(make_log(tenant=value)) == f'logs/{expected}.log'
+
+def test_sanitize_formatted_values():
+    """
+    Проверяем, что значение обезвреживается уже после применения спецификации формата, а разделители директорий в самом шаблоне остаются.
+    """
+    template = PathTemplate('logs/{tenant:/>6}/{number:05d}.log')
+
+    assert template(make_log(tenant='kek', number=12)) == 'logs/___kek/00012.log'
+
+def test_cache_key_differs_from_template_formatter():
+    """
+    Проверяем, что путь и строка лога с одинаковыми шаблонами кэшируются в объекте лога отдельно.
+    """
+    log = make_log(tenant='kek')
+    assert TemplateFormatter('{tenant}')(log) == 'kek\n'
+    assert PathTemplate('{tenant}')(log) == 'kek'
+
+def test_raw_values():
+    """
+    Проверяем, что в путь подставляются "сырые" значения полей, а не их человекочитаемые представления из стандартного форматтера. Уровень подставляется названием, если оно есть.
+    """
+    Levels.set('PATH_TEMPLATE_LEVEL', 7779)
+    template = PathTemplate('logs/{level}/{function}/{auto}.log')
+
+    assert template(make_log(level=7779, function='kek', module='__main__', auto=True)) == 'logs/PATH_TEMPLATE_LEVEL/kek/True.log'
+    assert template(make_log(level=7780, auto=False)) == 'logs/7780/unknown/False.log'
+
+def test_missing_and_empty_values():
+    """
+    Проверяем, что вместо отсутствующих и пустых значений подставляется заглушка (в т. ч. со спецификацией формата), так что в пути не появляются пустые директории и скрытые файлы, а условная секция с пустым полем не выводится.
+    """
+    template = PathTemplate('logs/{service}/{level}[[/{tenant}]].log')
+
+    assert template(make_log(service='', level=10, tenant='')) == 'logs/unknown/10.log'
+    assert PathTemplate('logs/{tenant}.log')(make_log()) == 'logs/unknown.log'
+    assert PathTemplate('logs/{tenant:>8}.log')(make_log(tenant='')) == 'logs/ unknown.log'
+    assert PathTemplate('logs/{tenant:%Y}.log')(make_log()) == 'logs/unknown.log'
@@ -0,0 +1,232 @@
+import os
+import time
+import atexit
+
+import pytest
+
+from polog import routing_file_writer
+from polog.core.log_item import LogItem
+from polog.core.engine.engine import Engine
+
+
+def make_log(**fields):
+    log = LogItem()
+    log.set_data(fields)
+    return log
+
+def formatter(log):
+    return f'{log.get("message")}\n'
+
+def read(path):
+    with open(path, 'r') as file:
+        return file.read()
+
+def test_routing_by_fields(dirname_for_test):
+    """
+    Проверяем, что логи раскладываются по файлам в зависимости от значений полей, а директории из пути создаются автоматически.
+    """
+    handler = routing_file_writer(os.path.join(dirname_for_test, '{service}', '{tenant}.log'), formatter=formatter)
+    handler(make_log(service='base', tenant='kek', message='1'))
+    handler(make_log(service='base', tenant='lol', message='2'))
+    handler(make_log(service='other', tenant='kek', message='3'))
+    handler(make_log(service='base', tenant='kek', message='4'))
+    handler(make_log(service='base', tenant='../kek', message='5'))
+    handler.close()
+
+    assert read(os.path.join(dirname_for_test, 'base', 'kek.log')) == '1\n4\n'
+    assert read(os.path.join(dirname_for_test, 'base', 'lol.log')) == '2\n'
+    assert read(os.path.join(dirname_for_test, 'other', 'kek.log')) == '3\n'
+    assert read(os.path.join(dirname_for_test, 'base', '.._kek.log')) == '5\n'
+
+def test_max_open_files(dirname_for_test):
+    """
+    Проверяем, что открыто не больше max_open_files файлов: дольше всего не использованный закрывается, а при следующей записи открывается снова.
+    """
+    handler = routing_file_writer(os.path.join(dirname_for_test, '{tenant}.log'), formatter=formatter, max_open_files=2)
+    handler(make_log(tenant='a', message='1'))
+    handler(make_log(tenant='b', message='2'))
+    first = handler.routes[os.path.join(dirname_for_test, 'a.log')]
+    handler(make_log(tenant='a', message='3'))
+    handler(make_log(tenant='c', message='4'))
+
+    assert list(handler.routes) == [os.path.join(dirname_for_test, x) for x in ('a.log', 'c.log')]
+    assert not first.writer.file.closed
+
+    handler(make_log(tenant='b', message='5'))
+
+    assert list(handler.routes) == [os.path.join(dirname_for_test, x) for x in ('c.log', 'b.log')]
+    assert first.evicted and first.writer.file.closed
+
+    handler.close()
+
+    assert read(os.path.join(dirname_for_test, 'a.log')) == '1\n3\n'
+    assert read(os.path.join(dirname_for_test, 'b.log')) == '2\n5\n'
+    assert read(os.path.join(dirname_for_test, 'c.log')) == '4\n'
+
+def test_idle_timeout(dirname_for_test, monkeypatch):
+    """
+    Проверяем, что файлы, в которые долго не писали, закрываются.
+    """
+    monkeypatch.setattr(routing_file_writer, 'IDLE_CHECK_INTERVAL', 0)
+    handler = routing_file_writer(os.path.join(dirname_for_test, '{tenant}.log'), formatter=formatter, idle_timeout=0.05)
+    handler(make_log(tenant='a', message='1'))
+    route = handler.routes[os.path.join(dirname_for_test, 'a.log')]
+    time.sleep(0.1)
+    handler(make_log(tenant='b', message='2'))
+
+    assert list(handler.routes) == [os.path.join(dirname_for_test, 'b.log')]
+    assert route.writer.file.closed
+    handler.close()
+
+def test_route_in_use_is_closed_after_release(dirname_for_test):
+    """
+    Проверяем, что вытесненный маршрут, в который прямо сейчас пишут, закрывается только после окончания записи.
+    """
+    handler = routing_file_writer(os.path.join(dirname_for_test, '{tenant}.log'), formatter=formatter, max_open_files=1)
+    route = handler.acquire(os.path.join(dirname_for_test, 'a.log'))
+    handler(make_log(tenant='b', message='1'))
+
+    assert route.evicted
+    assert not route.writer.file.closed
+
+    route.writer.do('2\n')
+    handler.release(route)
+
+    assert route.writer.file.closed
+    handler.close()
+    assert read(os.path.join(dirname_for_test, 'a.log')) == '2\n'
+
+def test_shared_descriptor_between_handlers(dirname_for_test):
+    """
+    Проверяем, что обработчики, которые пишут в один и тот же файл, используют одну обертку над ним.
+    """
+    template = os.path.join(dirname_for_test, '{tenant}.log')
+    first = routing_file_writer(template, formatter=formatter)
+    second = routing_file_writer(template, formatter=formatter, buffer_size=1024)
+    first(make_log(tenant='a', message='1'))
+    second(make_log(tenant='a', message='2'))
+    path = os.path.join(dirname_for_test, 'a.log')
+
+    assert first.routes[path].writer.file.wrapped_file is second.routes[path].writer.file.wrapped_file.wrapped_file
+
+    first.close()
+    second.close()
+
+    assert read(path) == '1\n2\n'
+
+def test_shared_background_worker(dirname_for_test):
+    """
+    Проверяем, что ротаторы всех файлов одного обработчика используют общий фоновый поток.
+    """
+    handler = routing_file_writer(os.path.join(dirname_for_test, '{tenant}.log'), formatter=formatter, rotation=f'1 mb >> {os.path.join(dirname_for_test, "archive")}', compression='gzip')
+    handler(make_log(tenant='a', message='1'))
+    handler(make_log(tenant='b', message='2'))
+    workers = [route.writer.rotator.worker for route in handler.routes.values()]
+
+    assert workers[0] is not None
+    assert workers[0] is workers[1]
+    handler.close()
+
+@pytest.mark.parametrize('options', [
+    {'file_wrapper': None},
+    {'mmap_segment_size': 1024},
+    {'file': 'kek.log'},
+    {'kek': 'lol'},
+    {'max_open_files': 0},
+    {'max_open_files': 1.5},
+    {'idle_timeout': 0},
+    {'buffer_size': -1},
+    {'rotation': 1},
+])
+def test_wrong_options(options):
+    """
+    Проверяем, что неподдерживаемые и неправильные аргументы не принимаются.
+    """
+    with pytest.raises(ValueError):
+        routing_file_writer('{tenant}.log', **options)
+
+@pytest.mark.parametrize('template', ['', '  ', 1, None])
+def test_wrong_template(template):
+    """
+    Проверяем, что шаблон пути должен быть непустой строкой.
+    """
+    with pytest.raises(ValueError):
+        routing_file_writer(template)
+
+def test_reopening_does_not_leak_callbacks(dirname_for_test, monkeypatch):
+    """
+    Проверяем, что при многократном закрытии и повторном открытии файлов функции сброса буферов не копятся ни в движке, ни в модуле atexit.
+    """
+    registered = []
+    unregistered = []
+    monkeypatch.setattr(atexit, 'register', registered.append)
+    monkeypatch.setattr(atexit, 'unregister', unregistered.append)
+    callbacks_before = len(Engine().stop_callbacks)
+    handler = routing_file_writer(os.path.join(dirname_for_test, '{tenant}.log'), formatter=formatter, max_open_files=2, buffer_size=1024)
+    for index in range(100):
+        handler(make_log(tenant=str(index % 5), message=str(index)))
+
+    assert len(Engine().stop_callbacks) <= callbacks_before + 2
+    assert len(registered) - len(unregistered) <= 2
+
+    handler.close()
+
+    assert len(Engine().stop_callbacks) == callbacks_before
+    assert len(registered) > 2
+    assert set(registered) == set(unregistered)
+
+def test_rotation_helpers_are_created_once(dirname_for_test):
+    """
+    Проверяем, что при повторном открытии файлов компрессор и объект Retention для директории с ротированными файлами не создаются заново, а значит, директория не сканируется повторно.
+    """
+    handler = routing_file_writer(os.path.join(dirname_for_test, '{tenant}.log'), formatter=formatter, max_open_files=1, rotation=f'1 mb >> {os.path.join(dirname_for_test, "archive")}', compression='gzip', retention='10 files')
+    handler(make_log(tenant='a', message='1'))
+    first = handler.routes[os.path.join(dirname_for_test, 'a.log')].writer.rotator
+    handler(make_log(tenant='b', message='2'))
+    handler(make_log(tenant='a', message='3'))
+    second = handler.routes[os.path.join(dirname_for_test, 'a.log')].writer.rotator
+
+    assert first is not second
+    assert first.compressor is second.compressor
+    assert first.retention is second.retention
+    handler.close()
+
+def test_shared_rotator_between_handlers(dirname_for_test):
+    """
+    Проверяем, что обработчики с одинаковыми настройками ротации, которые пишут в один файл, используют и общий ротатор: записи обоих учитываются одним счетчиком, а файл не ротируется лишний раз.
+    """
+    template = os.path.join(dirname_for_test, '{tenant}.log')
+    archive = os.path.join(dirname_for_test, 'archive')
+    first = routing_file_writer(template, formatter=formatter, rotation=f'3 lines >> {archive}')
+    second = routing_file_writer(template, formatter=formatter, rotation=f'3 lines >> {archive}', buffer_size=1024)
+    for index in range(7):
+        (first if index % 2 else second)(make_log(tenant='a', message=str(index)))
+    path = os.path.join(dirname_for_test, 'a.log')
+
+    assert first.routes[path].writer.rotator is second.routes[path].writer.rotator
+
+    first.close()
+    second.close()
+
+    rotated = sorted(sorted(read(os.path.join(archive, name)).split()) for name in os.listdir(archive))
+    assert rotated == [['0', '1', '2'], ['3', '4', '5']]
+    assert read(path) == '6\n'
+
+def test_different_rotation_settings_are_not_shared(dirname_for_test):
+    """
+    Проверяем, что обработчики с разными настройками ротации не делят ни обертку над файлом, ни ротатор.
+    """
+    template = os.path.join(dirname_for_test, '{tenant}.log')
+    first = routing_file_writer(template, formatter=formatter, rotation=f'3 lines >> {os.path.join(dirname_for_test, "archive")}')
+    second = routing_file_writer(template, formatter=formatter, rotation=f'5 lines >> {os.path.join(dirname_for_test, "archive")}')
+    first(make_log(tenant='a', message='1'))
+    second(make_log(tenant='a', message='2'))
+    path = os.path.join(dirname_for_test, 'a.log')
+
+    assert first.routes[path].writer.file.wrapped_file is not second.routes[path].writer.file.wrapped_file
+    assert first.routes[path].writer.rotator is not second.routes[path].writer.rotator
+
+    first.close()
+    second.close()
+
+    assert read(path) == '1\n2\n'
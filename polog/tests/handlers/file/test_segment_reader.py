@@ -0,0 +1,52 @@
+import pytest
+
+from polog.handlers.file.segment_reader import SegmentReader
+
+
+@pytest.mark.parametrize('content, expected', [
+    (b'', []),
+    (b'\0' * 100, []),
+    (b'kek\nlol\n', ['kek', 'lol']),
+    (b'kek\nlol\n' + b'\0' * 100, ['kek', 'lol']),
+    (b'kek\nlol\nchebu', ['kek', 'lol']),
+    (b'kek\nlol\nchebu' + b'\0' * 100, ['kek', 'lol']),
+    (b'kek\nl\0\0\nchebu\n', ['kek']),
+    (b'kek\n' + b'\0' * 100 + b'lol\n' + b'\0' * 100, ['kek']),
+    ('кек\nлол\n'.encode('utf-8'), ['кек', 'лол']),
+])
+def test_read_torn_tail(filename_for_test, content, expected):
+    """
+    Проверяем, что читатель отбрасывает нулевой "хвост", недописанный последний лог и все, что следует за поврежденным логом.
+    """
+    with open(filename_for_test, 'wb') as file:
+        file.write(content)
+
+    assert SegmentReader(filename_for_test).read() == expected
+    assert list(SegmentReader(filename_for_test)) == expected
+
+def test_custom_separator(filename_for_test):
+    """
+    Проверяем, что логи разделяются по переданному разделителю.
+    """
+    with open(filename_for_test, 'wb') as file:
+        file.write(b'kek\nlol||cheburek||tail')
+
+    assert SegmentReader(filename_for_test, separator='||').read() == ['kek\nlol', 'cheburek']
+
+@pytest.mark.parametrize('separator', ['', None, b'\n'])
+def test_wrong_separator(separator):
+    """
+    Проверяем, что разделитель должен быть непустой строкой.
+    """
+    with pytest.raises(ValueError):
+        SegmentReader('file.log', separator=separator)
+
+def test_get_valid_length():
+    """
+    Проверяем, что длина данных считается без нулевых байт в конце, в т. ч. когда нулей больше, чем размер куска, которыми просматривается файл.
+    """
+    data = b'kek' + b'\0' * (SegmentReader.CHUNK_SIZE * 2 + 10)
+    assert SegmentReader.get_valid_length(data, len(data)) == 3
+    assert SegmentReader.get_valid_length(b'\0' * 10, 10) == 0
+    assert SegmentReader.get_valid_length(b'kek', 3) == 3
+    assert SegmentReader.get_valid_length(b'', 0) == 0
@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+from polog.handlers.file.shared_file_wrappers import SharedFileWrappers, SharedFileWrapper
+
+
+def test_one_wrapper_for_one_file(filename_for_test):
+    """
+    Проверяем, что для одного файла с одинаковыми настройками выдается одна и та же обертка, а файл закрывается, только когда ее освободили все пользователи.
+    """
+    first = SharedFileWrappers.acquire([filename_for_test], 'thread')
+    second = SharedFileWrappers.acquire([os.path.abspath(filename_for_test)], 'thread')
+    third = SharedFileWrappers.acquire([filename_for_test], None)
+
+    assert isinstance(first, SharedFileWrapper)
+    assert first.wrapped_file is second.wrapped_file
+    assert first.wrapped_file is not third.wrapped_file
+
+    first.write('kek\n')
+    second.write('lol\n')
+    first.close()
+    first.close()
+    assert not second.wrapped_file.file.closed
+
+    second.close()
+    assert first.wrapped_file.file.closed
+    third.close()
+
+    with open(filename_for_test, 'r') as file:
+        assert file.read() == 'kek\nlol\n'
+
+def test_new_wrapper_after_release(filename_for_test):
+    """
+    Проверяем, что после освобождения всеми пользователями файл при следующем запросе открывается заново.
+    """
+    first = SharedFileWrappers.acquire([filename_for_test], 'thread')
+    first.close()
+    second = SharedFileWrappers.acquire([filename_for_test], 'thread')
+
+    assert first.wrapped_file is not second.wrapped_file
+    assert not second.wrapped_file.file.closed
+    second.close()
+
+def test_only_paths(filename_for_test):
+    """
+    Проверяем, что общими могут быть только файлы, заданные путем.
+    """
+    with open(filename_for_test, 'w') as file:
+        with pytest.raises(ValueError):
+            SharedFileWrappers.acquire([file], 'thread')
+    with pytest.raises(ValueError):
+        SharedFileWrappers.acquire([], 'thread')
+
+def test_shared_rotator_and_group(filename_for_test):
+    """
+    Проверяем, что ротатор создается один раз на общую обертку, а обертки с разными группами не делятся.
+    """
+    first = SharedFileWrappers.acquire([filename_for_test], 'thread', group=('1 line',))
+    second = SharedFileWrappers.acquire([filename_for_test], 'thread', group=('1 line',))
+    third = SharedFileWrappers.acquire([filename_for_test], 'thread', group=('2 lines',))
+    created = []
+    create = lambda: created.append(object()) or created[-1]
+
+    assert first.wrapped_file is second.wrapped_file
+    assert first.wrapped_file is not third.wrapped_file
+    assert first.get_shared_rotator(create) is second.get_shared_rotator(create)
+    assert third.get_shared_rotator(create) is not first.get_shared_rotator(create)
+    assert len(created) == 2
+
+    for wrapper in (first, second, third):
+        wrapper.close()
@@ -0,0 +1,110 @@
+import time
+import datetime
+
+import pytest
+
+from polog import TemplateFormatter, file_writer
+from polog.core.log_item import LogItem
+from polog.handlers.file.base_formatter_fields_extractors import BaseFormatterFieldsExtractors as Extractors
+from polog.utils.json_vars import vars_to_dict, get_item
+
+
+def make_log(**fields):
+    log = LogItem()
+    log.set_data(fields)
+    return log
+
+def test_simple_template():
+    """
+    Проверяем подстановку полей, спецификации формата и разделитель.
+    """
+    formatter = TemplateFormatter('{message} | {lol:>5} | {kek!r}')
+
+    assert formatter(make_log(message='hello', lol='x', kek='y')) == "hello |     x | 'y'\n"
+    assert TemplateFormatter('{message}', separator='')(make_log(message='hello')) == 'hello'
+    assert TemplateFormatter('{message}')({'message': 'hello'}) == 'hello\n'
+
+def test_missing_fields():
+    """
+    Проверяем, что отсутствующие поля заменяются пустыми строками нужной ширины.
+    """
+    formatter = TemplateFormatter('{message}|{lol:>5}|{time:%H:%M}|')
+
+    assert formatter(make_log()) == '|     ||\n'
+
+def test_conditional_sections():
+    """
+    Проверяем, что условная секция выводится, только если в логе есть все поля из нее.
+    """
+    formatter = TemplateFormatter('{message}[[ | {lol} and {kek}]][[ (constant)]]')
+
+    assert formatter(make_log(message='hello', lol=1, kek=2)) == 'hello | 1 and 2 (constant)\n'
+    assert formatter(make_log(message='hello', lol=1)) == 'hello (constant)\n'
+
+def test_escaping():
+    """
+    Проверяем экранирование фигурных и квадратных скобок.
+    """
+    formatter = TemplateFormatter('{{message}} [[[{message}]]] \'"\\')
+
+    assert formatter(make_log(message='hello')) == '{message} [[hello]] \'"\\\n'
+
+@pytest.mark.parametrize('template', ['[[{message}', '{message}]]', '[[ [[{message}]] ]]', '{}', '{0}', '{message.lol}', '{message:{lol}}', '{message'])
+def test_wrong_templates(template):
+    """
+    Проверяем, что некорректные шаблоны отвергаются при создании форматтера.
+    """
+    with pytest.raises(ValueError):
+        TemplateFormatter(template)
+
+def test_unknown_conversion():
+    """
+    Проверяем, что неизвестная конверсия отвергается при создании форматтера, а в сообщении об ошибке упоминается поле.
+    """
+    with pytest.raises(ValueError, match='message'):
+        TemplateFormatter('{level} {message!x}')
+    with pytest.raises(ValueError, match='message'):
+        TemplateFormatter('[[{message!x}]]')
+
+    assert TemplateFormatter('{message!r} {message!a} {message!s}')(make_log(message='кек')) == "'кек' '\\u043a\\u0435\\u043a' кек\n"
+
+def test_wrong_arguments():
+    with pytest.raises(ValueError):
+        TemplateFormatter(1)
+    with pytest.raises(ValueError):
+        TemplateFormatter('{message}', separator=1)
+
+def test_human_readable_fields():
+    """
+    Проверяем, что поля со специальной обработкой выводятся так же, как в стандартном форматтере, но без префиксов.
+    """
+    stamp = time.time()
+    log = make_log(time=stamp, level=5, success=True, auto=True, module='lol', function='kek', input_variables=vars_to_dict(1, a='b'), result=get_item(2), exception_type='ValueError', exception_message='kek')
+    formatter = TemplateFormatter('{time:%Y} {success} {auto} {function} {input_variables} {result} {exception}')
+
+    assert formatter(log) == f'{datetime.datetime.fromtimestamp(stamp):%Y} SUCCESS AUTO {Extractors.function(log)[len("where: "):]} 1 (int), a = "b" (str) 2 (int) ValueError("kek")\n'
+
+def test_broken_format_falls_back_to_str():
+    """
+    Если значение не получается отформатировать по спецификации, подставляется его строковое представление.
+    """
+    assert TemplateFormatter('{message:%Y}')(make_log(message='hello')) == 'hello\n'
+
+def test_rendered_once_for_equal_templates():
+    """
+    Проверяем, что одинаковые шаблоны используют общий кэш в объекте лога.
+    """
+    log = make_log(message='hello')
+
+    assert TemplateFormatter('{message}')(log) is TemplateFormatter('{message}')(log)
+    assert TemplateFormatter('{message}!')(log) == 'hello!\n'
+
+def test_template_formatter_in_file_writer(filename_for_test):
+    """
+    Проверяем, что форматтер можно передать в файловый обработчик.
+    """
+    handler = file_writer(filename_for_test, formatter=TemplateFormatter('{level} {message}'))
+    handler(make_log(level=1, message='hello', auto=False))
+
+    with open(filename_for_test, 'r', encoding='utf-8') as file:
+        assert file.read().endswith(' hello\n')
@@ -1,6 +1,8 @@
 import io
 import os
 import sys
+import gzip
+import lzma
 import time
 import asyncio
 import platform
@@ -9,8 +11,9 @@ from multiprocessing import Process
 
 import pytest
 
-from polog import log, config
+from polog import log, config, SegmentReader
 from polog.handlers.file.writer import file_writer
+from polog.handlers.file.compressed_file_wrapper import CompressedFileWrapper
 from polog.core.utils.exception_escaping import exception_escaping
 
 
@@ -424,6 +427,163 @@ def test_lenth_of_one_line_traceback_in_file_writer(filename_for_test):
         string = [string for string in file.read().split('\n') if string][-1]
 
     assert "traceback: raise ValueError('kek_message') (\"" in string
-    assert '", line 419, in function)' in string
+    assert '", line 422, in function)' in string
 
     config.delete_handlers('test_lenth_of_one_line_traceback_in_file_writer')
+
+def write_lines_with_atomic_append(process_index, number_of_lines, filename_for_test, buffer_size):
+    """
+    Функция предназначена для запуска в отдельном процессе.
+
+    Она записывает в файл filename_for_test number_of_lines строк разной длины (от нескольких байт до десятков килобайт) в режиме атомарной дозаписи, без каких-либо блокировок.
+    """
+    handler = file_writer(filename_for_test, lock_type=None, atomic_append=True, buffer_size=buffer_size)
+    for index in range(number_of_lines):
+        filler = str(process_index) * ((index * 7919) % 20000)
+        handler.do(f'{process_index} {index} {len(filler)} {filler}\n')
+    handler.file.flush()
+
+@pytest.mark.skipif('windows' in platform.system().lower(), reason="O_APPEND writes are not atomic on windows")
+@pytest.mark.parametrize('buffer_size', [None, 64 * 1024])
+def test_atomic_append_interleaving_stress(filename_for_test, buffer_size):
+    """
+    Несколько процессов одновременно пишут в один файл строки разной длины в режиме атомарной дозаписи.
+
+    Проверяем, что ни одна строка не потерялась и не оказалась "разорвана" строками из других процессов.
+    """
+    number_of_lines = 300
+    number_of_processes = 8
+
+    processes = [Process(target=write_lines_with_atomic_append, args=(index, number_of_lines, filename_for_test, buffer_size)) for index in range(number_of_processes)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    with open(filename_for_test, 'r', encoding='utf-8') as file:
+        lines = file.read().split('\n')
+    assert lines[-1] == ''
+    lines = lines[:-1]
+    assert len(lines) == number_of_lines * number_of_processes
+
+    seen = set()
+    for line in lines:
+        process_index, index, length, filler = line.split(' ')
+        assert len(filler) == int(length)
+        assert filler == process_index * int(length)
+        seen.add((int(process_index), int(index)))
+    assert len(seen) == number_of_lines * number_of_processes
+
+def test_mmap_segments_rotation(filename_for_test, dirname_for_test):
+    """
+    Проверяем, что в режиме отображения в память заполненные сегменты ротируются даже без правил ротации, а ротированные файлы обрезаны до реальной длины данных.
+    """
+    destination = os.path.join(dirname_for_test, 'segments')
+    handler = file_writer(filename_for_test, rotation=f'>> {destination}', mmap_segment_size=100)
+    lines = [f'{index} {"x" * 20}\n' for index in range(21)]
+    for line in lines:
+        handler.do(line)
+    handler.file.close()
+
+    rotated = [os.path.join(destination, x) for x in os.listdir(destination)]
+    assert len(rotated) == 4
+    assert all(100 <= os.stat(x).st_size < 130 for x in rotated)
+
+    result = []
+    for path in sorted(rotated, key=lambda x: int(SegmentReader(x).read()[0].split(' ')[0])) + [filename_for_test]:
+        result.extend(SegmentReader(path).read())
+    assert result == [x[:-1] for x in lines]
+
+@pytest.mark.parametrize('options', [{'mmap_segment_size': 0}, {'mmap_segment_size': 1.5}, {'mmap_segment_size': True}, {'mmap_segment_size': 1024, 'atomic_append': True}])
+def test_wrong_mmap_options(filename_for_test, options):
+    """
+    Проверяем, что неправильный размер сегмента и сочетание с режимом атомарной дозаписи не принимаются.
+    """
+    with pytest.raises(ValueError):
+        file_writer(filename_for_test, **options)
+
+@pytest.mark.parametrize('method, extension, opener', [('gzip', '.gz', gzip.open), ('lzma', '.xz', lzma.open)])
+def test_stream_compression_with_size_rotation(filename_for_test, dirname_for_test, method, extension, opener):
+    """
+    Проверяем, что при сжатии по мере записи ротация по размеру учитывает сжатые байты, ротированные файлы получают расширение сжатого файла, и ни один лог не теряется.
+    """
+    destination = os.path.join(dirname_for_test, 'compressed')
+    handler = file_writer(filename_for_test, rotation=f'2 kb >> {destination}', stream_compression=method, buffer_size=1024)
+    lines = [f'{index} {"kek" * 30}\n' for index in range(1000)]
+    for line in lines:
+        handler.do(line)
+    handler.file.close()
+
+    rotated = [os.path.join(destination, x) for x in os.listdir(destination)]
+    assert rotated
+    assert all(x.endswith(f'.logs{extension}') for x in rotated)
+    assert sum(os.stat(x).st_size for x in rotated) < len(''.join(lines)) // 5
+
+    result = []
+    for path in rotated + [filename_for_test]:
+        with opener(path, 'rt') as file:
+            result.extend(file.read().splitlines(keepends=True))
+    assert sorted(result) == sorted(lines)
+
+@pytest.mark.parametrize('options', [{'stream_compression': 'bz2'}, {'stream_compression': 'gzip', 'mmap_segment_size': 1024}, {'stream_compression': 'gzip', 'rotation': '1 mb', 'compression': 'gzip'}])
+def test_wrong_stream_compression_options(filename_for_test, options):
+    """
+    Проверяем, что неизвестный метод сжатия, а также сочетания со сжатием ротированных файлов и с режимом отображения в память не принимаются.
+    """
+    with pytest.raises(ValueError):
+        file_writer(filename_for_test, **options)
+
+def test_stream_compression_enables_buffering(filename_for_test):
+    """
+    Проверяем, что при сжатии по мере записи буферизация включается, даже если размер буфера не указан.
+    """
+    handler = file_writer(filename_for_test, stream_compression='gzip')
+    assert handler.file.buffer_size == CompressedFileWrapper.DEFAULT_BUFFER_SIZE
+    assert handler.forced_flush == False
+    handler.do('kek\n')
+    handler.file.close()
+
+    with gzip.open(filename_for_test, 'rb') as file:
+        assert file.read() == b'kek\n'
+
+def write_lines_with_rotation_and_compression(process_index, number_of_lines, filename_for_test, dirname_for_test):
+    """
+    Функция предназначена для запуска в отдельном процессе.
+
+    Она записывает в файл filename_for_test number_of_lines строк с ротацией по размеру и сжатием ротированных файлов, после чего ждет, пока фоновый поток сожмет все, что ротировал этот процесс.
+    """
+    handler = file_writer(filename_for_test, rotation=f'20 kb >> {dirname_for_test}', compression='gzip', lock_type='thread+file')
+    for index in range(number_of_lines):
+        handler.do(f'{process_index} {index} {"kek" * 10}\n')
+    handler.file.close()
+    handler.rotator.worker.wait(60)
+
+@pytest.mark.skipif('windows' in platform.system().lower(), reason="file locks don't work on windows")
+def test_multiprocessing_rotation_with_compression(filename_for_test, dirname_for_test):
+    """
+    Несколько процессов пишут в один файл с ротацией и сжатием ротированных файлов.
+
+    Процессы, которые не выполняли ротацию, какое-то время продолжают писать в уже ротированный файл. Проверяем, что он не сжимается (и не удаляется) раньше, чем они его отпустят, и ни одна строка не теряется.
+    """
+    number_of_lines = 3000
+    number_of_processes = 3
+    destination = os.path.join(dirname_for_test, 'compressed')
+
+    processes = [Process(target=write_lines_with_rotation_and_compression, args=(index, number_of_lines, filename_for_test, destination)) for index in range(number_of_processes)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    lines = []
+    with open(filename_for_test, 'r', encoding='utf-8') as file:
+        lines.extend(file.read().splitlines())
+    for name in os.listdir(destination):
+        if name.endswith('.gz'):
+            with gzip.open(os.path.join(destination, name), 'rt', encoding='utf-8') as file:
+                lines.extend(file.read().splitlines())
+        elif name.endswith('.logs'):
+            with open(os.path.join(destination, name), 'r', encoding='utf-8') as file:
+                lines.extend(file.read().splitlines())
+
+    assert sorted(lines) == sorted(f'{process_index} {index} {"kek" * 10}' for process_index in range(number_of_processes) for index in range(number_of_lines))
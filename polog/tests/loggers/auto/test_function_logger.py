@@ -5,12 +5,13 @@ from datetime import datetime
 
 import pytest
 
-from polog import log, flog, config, field
+from polog import log, flog, config, field, message
 from polog.loggers.auto.function_logger import FunctionLogger
 from polog.core.stores.settings.settings_store import SettingsStore
 from polog.data_structures.trees.named_tree.tree import NamedTree
-from polog.utils.json_vars import json_one_variable
+from polog.utils.json_vars import json_one_variable, get_item
 from polog.core.log_item import LogItem
+from polog.core.utils.raw_traceback import RawTraceback
 from polog.core.utils.exception_escaping import exception_escaping
 
 
@@ -277,7 +278,7 @@ def test_log_exception_info():
     assert data['time_of_work'] == 0.5
     assert data['level'] == 7
     assert data['success'] == False
-    assert len(data['traceback']) > 0
+    assert isinstance(data['traceback'], RawTraceback)
     assert len(data['local_variables']) > 0
     assert data.get('message') is None
     assert data.get('input_variables') is None
@@ -302,7 +303,7 @@ def test_log_normal_info():
     assert data.get('input_variables') is None
     assert data.get('function') is None
     assert data.get('module') is None
-    assert data.get('result') == json_one_variable('kek')
+    assert data.get('result') == get_item('kek')
 
 def test_project_tree_of_handlers_from_global_scope_of_names(handler):
     """
@@ -1069,3 +1070,225 @@ def test_set_arguments_not_allowed_types():
         @log(is_method='True')
         def function():
             pass
+
+def test_slower_than_skips_fast_calls(handler):
+    """
+    Проверяем, что успешные вызовы быстрее порога slower_than не логируются, а более медленные - логируются.
+    """
+    @log(slower_than=0.05)
+    def fast_function():
+        return 1
+
+    @log(slower_than=0.05)
+    def slow_function():
+        time.sleep(0.06)
+        return 2
+
+    config.set(level=1)
+
+    fast_function()
+    assert handler.last is None
+
+    slow_function()
+    assert handler.last is not None
+    assert handler.last['function'] == slow_function.__name__
+    assert handler.last['time_of_work'] >= 0.05
+
+def test_slower_than_does_not_affect_errors(handler):
+    """
+    Проверяем, что порог slower_than не влияет на логирование исключений.
+    """
+    @log(slower_than=100)
+    def function():
+        raise ValueError
+
+    config.set(level=1)
+
+    with pytest.raises(ValueError):
+        function()
+
+    assert handler.last is not None
+    assert handler.last['success'] == False
+
+def test_slower_than_fast_call_does_not_leak_message(handler):
+    """
+    Проверяем, что сообщение, переданное через message() внутри "быстрой" функции, не попадает в лог внешней функции.
+    """
+    @log(slower_than=100)
+    def inner_function():
+        message('inner message')
+
+    @log
+    def outer_function():
+        inner_function()
+
+    config.set(level=1)
+
+    outer_function()
+
+    assert len(handler.all) == 1
+    assert handler.last['function'] == outer_function.__name__
+    assert handler.last.get('message') is None
+
+def test_slower_than_global_settings_and_levels(handler):
+    """
+    Проверяем приоритеты порогов: декоратор > порог для уровня > глобальный порог.
+    """
+    @log(level=7)
+    def function_with_level():
+        return 1
+
+    @log
+    def function_without_level():
+        return 1
+
+    @log(level=7, slower_than=0)
+    def function_with_local_threshold():
+        return 1
+
+    config.set(level=1)
+
+    try:
+        config.set(slower_than=100)
+        function_without_level()
+        function_with_level()
+        assert handler.last is None
+
+        function_with_local_threshold()
+        assert handler.last['function'] == function_with_local_threshold.__name__
+        handler.clean()
+
+        config.set(slower_than_by_levels={7: 0})
+        function_with_level()
+        assert handler.last['function'] == function_with_level.__name__
+        handler.clean()
+
+        function_without_level()
+        assert handler.last is None
+    finally:
+        config.set(slower_than=None, slower_than_by_levels={})
+
+def test_slower_than_wrong_values():
+    """
+    Проверяем, что в качестве порога slower_than нельзя передать что-то, кроме неотрицательного числа.
+    """
+    with pytest.raises(ValueError):
+        @log(slower_than=-1)
+        def function():
+            pass
+
+    with pytest.raises(ValueError):
+        @log(slower_than='1')
+        def function():
+            pass
+
+    with pytest.raises(ValueError):
+        config.set(slower_than=-1)
+
+    with pytest.raises(ValueError):
+        config.set(slower_than_by_levels={1: -1})
+
+def test_time_is_stored_as_timestamp(handler):
+    """
+    Проверяем, что в логе поле 'time' хранится как метка времени (float), а при чтении через [] превращается в datetime.
+    """
+    @log
+    def function():
+        time.sleep(0.001)
+
+    config.set(level=1)
+
+    before = time.time()
+    function()
+    after = time.time()
+
+    assert isinstance(handler.last.get_raw('time'), float)
+    assert before <= handler.last.get_raw('time') <= after
+    assert handler.last['time'] == datetime.fromtimestamp(handler.last.get_raw('time'))
+    assert 0.001 <= handler.last['time_of_work'] <= after - before
+
+def test_get_time_of_work():
+    """
+    Проверяем, что длительность считается в секундах как для наносекундных целых показаний счетчика, так и для секунд в виде float.
+    """
+    assert FunctionLogger.get_time_of_work(3000000000, 1000000000) == 2
+    assert FunctionLogger.get_time_of_work(1.0, 0.5) == 0.5
+
+def test_profile_fields(handler):
+    """
+    Проверяем, что при profile=True в лог добавляется процессорное время, а для корутин - еще и время исполнения и ожидания.
+    """
+    @log(profile=True)
+    def function():
+        time.sleep(0.01)
+
+    @log(profile=True)
+    async def coroutine_function():
+        await asyncio.sleep(0.01)
+
+    @log
+    def function_without_profiling():
+        pass
+
+    config.set(level=1)
+
+    function()
+    assert handler.last['cpu_time'] < handler.last['time_of_work']
+    assert 'awaiting_time' not in handler.last
+
+    asyncio.run(coroutine_function())
+    assert handler.last['awaiting_time'] >= 0.005
+    assert 'running_time' in handler.last
+    assert 'cpu_time' in handler.last
+
+    function_without_profiling()
+    assert 'cpu_time' not in handler.last
+
+    with pytest.raises(ValueError):
+        @log(profile=1)
+        def function():
+            pass
+
+def test_async_function_with_wrong_arguments(handler):
+    """
+    Проверяем, что при вызове корутинной функции с неправильными аргументами пробрасывается исходный TypeError, а ошибка логируется.
+    """
+    config.set(pool_size=0, level=1)
+
+    @log
+    async def function(a):
+        return a
+
+    with pytest.raises(TypeError):
+        asyncio.run(function(1, 2))
+
+    assert handler.last['exception_type'] == 'TypeError'
+    assert handler.last['success'] == False
+
+def test_errors_before_call_are_not_hidden(handler, monkeypatch):
+    """
+    Проверяем, что ошибка, возникшая до вызова функции (например, при создании профилировщика), пробрасывается как есть, а не подменяется UnboundLocalError.
+    """
+    config.set(pool_size=0, level=1)
+
+    class BrokenProfiler:
+        def __init__(self, args_dict):
+            raise RuntimeError('kek')
+
+    monkeypatch.setattr('polog.loggers.auto.function_logger.CallProfiler', BrokenProfiler)
+
+    @log(profile=True)
+    def function():
+        pass
+
+    @log(profile=True)
+    async def coroutine_function():
+        pass
+
+    with pytest.raises(RuntimeError):
+        function()
+    assert handler.last['exception_type'] == 'RuntimeError'
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(coroutine_function())
+    assert handler.last['exception_type'] == 'RuntimeError'
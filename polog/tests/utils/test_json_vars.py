@@ -1,14 +1,29 @@
 import json
+import enum
+import uuid
+import datetime
+import dataclasses
 
 import pytest
 
-from polog.utils.json_vars import json_vars, get_item
+from polog import config
+from polog.core.log_item import LogItem
+from polog.utils.json_vars import json_vars, get_item, vars_to_dict
 
 
 class NotBaseType:
     def __repr__(self):
         return 'hello'
 
+class NotBaseTypeWithLongRepr:
+    def __repr__(self):
+        return 'a' * 100
+
+class ObjectWithShape:
+    shape = (10, 2)
+    def __len__(self):
+        return 10
+
 def test_base():
     """
     Проверка базовой функциональности json_vars().
@@ -43,3 +58,127 @@ def test_get_item_non_base_types():
     Проверка, что get_item() корректно отрабатывает с типами данных, НЕ стандартными для формата json.
     """
     assert get_item(NotBaseType()) == {'value': 'hello', 'type': 'NotBaseType'}
+
+def test_long_string_is_truncated():
+    """
+    Проверяем, что слишком длинные строки обрезаются, а в результат добавляется метка обрезки и исходная длина.
+    """
+    config.set(max_variable_length=5)
+    try:
+        assert get_item('hello world') == {'value': 'hello', 'type': 'str', 'truncated': True, 'length': 11}
+        assert get_item('hello') == {'value': 'hello', 'type': 'str'}
+        assert get_item(NotBaseTypeWithLongRepr()) == {'value': 'aaaaa', 'type': 'NotBaseTypeWithLongRepr', 'truncated': True, 'length': 100}
+    finally:
+        config.set(max_variable_length=10000)
+
+def test_big_container_is_summarized():
+    """
+    Проверяем, что большие контейнеры не приводятся к строке, а описываются кратко.
+    """
+    config.set(max_container_length=3)
+    try:
+        assert get_item(b'12345') == {'value': '<bytes of length 5>', 'type': 'bytes', 'summarized': True, 'length': 5}
+        assert get_item([1, 2, 3]) == {'value': [1, 2, 3], 'type': 'list'}
+        assert get_item(ObjectWithShape()) == {'value': '<ObjectWithShape of shape (10, 2)>', 'type': 'ObjectWithShape', 'summarized': True, 'length': 10, 'shape': [10, 2]}
+    finally:
+        config.set(max_container_length=1000)
+
+def test_number_of_variables_is_limited():
+    """
+    Проверяем, что количество сериализуемых переменных ограничено, а количество отброшенных сохраняется.
+    """
+    config.set(max_variables=2)
+    try:
+        assert json.loads(json_vars(1, 2, 3, a=4)) == {'args': [{'value': 1, 'type': 'int'}, {'value': 2, 'type': 'int'}], 'omitted_args': 1, 'omitted_kwargs': 1}
+        assert json.loads(json_vars(1, a=2, b=3)) == {'args': [{'value': 1, 'type': 'int'}], 'kwargs': {'a': {'value': 2, 'type': 'int'}}, 'omitted_kwargs': 1}
+        assert json.loads(json_vars(1, a=2)) == {'args': [{'value': 1, 'type': 'int'}], 'kwargs': {'a': {'value': 2, 'type': 'int'}}}
+    finally:
+        config.set(max_variables=100)
+
+def test_builtin_serializers():
+    """
+    Проверяем встроенные компактные сериализаторы.
+    """
+    class Color(enum.Enum):
+        RED = 1
+
+    @dataclasses.dataclass
+    class Point:
+        x: int
+        y: list
+
+    identifier = uuid.uuid4()
+    moment = datetime.datetime(2021, 10, 21, 11, 24, 51)
+
+    assert get_item(Color.RED) == {'value': 'RED', 'type': 'Color'}
+    assert get_item(identifier) == {'value': str(identifier), 'type': 'UUID'}
+    assert get_item(moment) == {'value': '2021-10-21T11:24:51', 'type': 'datetime'}
+    assert get_item(datetime.timedelta(seconds=2)) == {'value': 2.0, 'type': 'timedelta'}
+    assert get_item(b'kek') == {'value': 'kek', 'type': 'bytes'}
+    assert get_item((1, 'a', None)) == {'value': [1, 'a', None], 'type': 'tuple'}
+    assert get_item({1: [2]}) == {'value': {'1': '[2]'}, 'type': 'dict'}
+    assert get_item(Point(1, [2])) == {'value': {'x': 1, 'y': '[2]'}, 'type': 'Point'}
+    assert get_item([Point(1, [])]) == {'value': [str(Point(1, []))], 'type': 'list'}
+
+def test_custom_serializer():
+    """
+    Проверяем регистрацию своего сериализатора: он применяется и к наследникам типа, а после удаления перестает применяться.
+    """
+    class Model:
+        def __init__(self, pk):
+            self.pk = pk
+        def __str__(self):
+            return f'<Model {self.pk}>'
+
+    class SubModel(Model):
+        pass
+
+    config.set_serializer(Model, lambda model: model.pk)
+    try:
+        assert get_item(Model(5)) == {'value': 5, 'type': 'Model'}
+        assert get_item(SubModel(6)) == {'value': 6, 'type': 'SubModel'}
+        assert json.loads(json_vars(user=Model(7))) == {'kwargs': {'user': {'value': 7, 'type': 'Model'}}}
+    finally:
+        config.delete_serializer(Model)
+
+    assert get_item(Model(5)) == {'value': '<Model 5>', 'type': 'Model'}
+
+    with pytest.raises(KeyError):
+        config.delete_serializer(Model)
+    with pytest.raises(ValueError):
+        config.set_serializer('kek', lambda x: x)
+    with pytest.raises(ValueError):
+        config.set_serializer(Model, 'kek')
+
+def test_broken_serializer_falls_back_to_str():
+    """
+    Проверяем, что если сериализатор упал с исключением, объект приводится к строке.
+    """
+    class Broken:
+        def __str__(self):
+            return 'broken'
+
+    config.set_serializer(Broken, lambda x: 1 / 0)
+    try:
+        assert get_item(Broken()) == {'value': 'broken', 'type': 'Broken'}
+    finally:
+        config.delete_serializer(Broken)
+
+def test_custom_serializer_result_is_normalized():
+    """
+    Проверяем, что значения, недопустимые в JSON, внутри результата пользовательского сериализатора приводятся к строкам, и лог с такой переменной можно сериализовать.
+    """
+    class Model:
+        pass
+
+    config.set_serializer(Model, lambda model: {'id': 5, 'when': datetime.date(2020, 1, 2), 'tags': ('a', {1: NotBaseType()})})
+    try:
+        expected = {'id': 5, 'when': '2020-01-02', 'tags': ['a', {'1': 'hello'}]}
+        assert get_item(Model()) == {'value': expected, 'type': 'Model'}
+
+        log = LogItem()
+        log.set_data({'level': 1, 'input_variables': vars_to_dict(Model())})
+        assert json.loads(log['input_variables']) == {'args': [{'value': expected, 'type': 'Model'}]}
+        assert 'when' in str(log)
+    finally:
+        config.delete_serializer(Model)
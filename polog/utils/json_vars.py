@@ -1,35 +1,242 @@
+import enum
+import uuid
+import decimal
+import datetime
+import dataclasses
+
 from polog.core.stores.settings.settings_store import SettingsStore
+from polog.core.stores.serializers import Serializers
+from polog.core.utils.json_backend import get_json_backend
 
 
-# Простые типы, имеющие соответствия в стандарте json. Если передается объект другого типа, он приводится к str.
+# Простые типы, имеющие соответствия в стандарте json. Если передается объект другого типа, он сериализуется через реестр сериализаторов (см. Serializers), а при отсутствии подходящего сериализатора приводится к str.
 BASE_JSON_TYPES = (bool, int, float, str)
+# Глубина вложенности, до которой раскрываются структуры, возвращенные пользовательскими сериализаторами (см. normalize()). Все, что глубже, приводится к str.
+MAX_NORMALIZATION_DEPTH = 16
 store = SettingsStore()
 
 def get_item(item):
-    for one in BASE_JSON_TYPES:
-        if isinstance(item, one):
-            return {'value': item, 'type': one.__name__}
-    return {'value': str(item), 'type': type(item).__name__}
+    """
+    Сериализуем одну переменную в словарь вида {'value': ..., 'type': ...}.
 
-def json_vars(*args, **kwargs):
+    Сериализатор для объекта ищется в реестре по его типу (см. Serializers). Если подходящего сериализатора нет, объект приводится к str.
+
+    Чтобы затраты на один лог оставались предсказуемыми, размер результата ограничивается настройками:
+    1. 'max_container_length' - объекты, длина которых (len()) превышает порог, вообще не сериализуются. Вместо этого сохраняется короткое описание: тип, длина и, если есть, форма (атрибут shape, как у массивов numpy или таблиц pandas). В словарь добавляются ключи 'summarized' (True) и 'length'.
+    2. 'max_variable_length' - строковое представление длиннее порога обрезается. В словарь добавляются ключи 'truncated' (True) и 'length' (исходная длина строки).
+    """
+    item_type = type(item)
+    serializer, type_name = Serializers.get(item_type)
+    if type_name is None:
+        type_name = item_type.__name__
+    if serializer is as_is:
+        if isinstance(item, str):
+            return cut_string(item, type_name)
+        return {'value': item, 'type': type_name}
+    summary = get_summary(item, type_name)
+    if summary is not None:
+        return summary
+    value = serialize(item, serializer)
+    if isinstance(value, str):
+        return cut_string(value, type_name)
+    return {'value': value, 'type': type_name}
+
+def serialize(item, serializer):
+    """
+    Применяем к объекту сериализатор. Если сериализатора нет или он упал с исключением, объект приводится к str.
+
+    Встроенные сериализаторы всегда возвращают значения, допустимые в JSON. Пользовательский же сериализатор может вернуть что угодно (например, словарь с датой внутри), поэтому его результат дополнительно приводится к допустимому виду (см. normalize()).
+    """
+    if serializer is not None:
+        try:
+            value = serializer(item)
+        except Exception:
+            return str(item)
+        if serializer in BUILTIN_SERIALIZERS:
+            return value
+        return normalize(value)
+    return str(item)
+
+def normalize(value, depth=0):
+    """
+    Рекурсивно приводим значение к виду, допустимому в JSON: словари и последовательности раскрываются (ключи словарей приводятся к строкам), простые типы остаются как есть, все остальное (а также все, что вложено глубже MAX_NORMALIZATION_DEPTH уровней) приводится к str.
+    """
+    if value is None or type(value) in BASE_JSON_TYPES:
+        return value
+    if depth < MAX_NORMALIZATION_DEPTH:
+        if isinstance(value, dict):
+            return {str(key): normalize(item, depth + 1) for key, item in value.items()}
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return [normalize(item, depth + 1) for item in value]
+    if isinstance(value, BASE_JSON_TYPES):
+        return value
+    return str(value)
+
+def get_nested_value(item):
+    """
+    Сериализация элемента контейнера.
+
+    Вложенность не раскрывается дальше одного уровня: вложенные контейнеры (и объекты без сериализатора) приводятся к строке, а длинные строки обрезаются без дополнительных меток - со знаком '...' на конце.
+    """
+    serializer, type_name = Serializers.get(type(item))
+    if serializer is as_is or item is None:
+        value = item
+    elif serializer is None or serializer in CONTAINER_SERIALIZERS:
+        summary = get_summary(item, type(item).__name__)
+        value = summary['value'] if summary is not None else str(item)
+    else:
+        value = serialize(item, serializer)
+    if isinstance(value, str):
+        limit = store['max_variable_length']
+        if limit is not None and len(value) > limit:
+            value = f'{value[:limit]}...'
+    return value
+
+def cut_string(value, type_name):
     """
-    Преобразуем любые аргументы в json-объект. Каждый элемент в json-объекте сопровождается названием типа данных. Это полезно в случаях, когда тип данных не соответствует стандартным для json. Все нестандартные объекты приводятся к типу str.
+    Обрезаем строковое представление переменной, если оно длиннее порога из настройки 'max_variable_length'.
+    """
+    limit = store['max_variable_length']
+    if limit is None or len(value) <= limit:
+        return {'value': value, 'type': type_name}
+    return {'value': value[:limit], 'type': type_name, 'truncated': True, 'length': len(value)}
+
+def get_summary(item, type_name):
+    """
+    Получаем краткое описание большого контейнера вместо его полного строкового представления.
+    Если объект не является контейнером или он недостаточно велик (см. настройку 'max_container_length'), возвращается None.
+    """
+    limit = store['max_container_length']
+    if limit is None:
+        return None
+    try:
+        length = len(item)
+    except Exception:
+        return None
+    if not isinstance(length, int) or length <= limit:
+        return None
+    result = {'type': type_name, 'summarized': True, 'length': length}
+    shape = getattr(item, 'shape', None)
+    if isinstance(shape, tuple):
+        result['shape'] = list(shape)
+        result['value'] = f'<{type_name} of shape {shape}>'
+    else:
+        result['value'] = f'<{type_name} of length {length}>'
+    return result
+
+def vars_to_dict(*args, **kwargs):
+    """
+    Сериализуем любые аргументы в словарь из объектов, допустимых в JSON, но не превращаем его в строку. Если аргументов нет, возвращается None.
+
+    Каждый элемент сопровождается названием типа данных. Это полезно в случаях, когда тип данных не соответствует стандартным для json. Нестандартные объекты сериализуются через реестр сериализаторов (см. get_item()).
     Функция не поддерживает глубокую рекурсию.
+
+    Общее количество сериализуемых переменных ограничивается настройкой 'max_variables'. Сначала берутся позиционные аргументы, затем именованные. Количество отброшенных переменных сохраняется в ключах 'omitted_args' и 'omitted_kwargs'.
+
+    Именно в таком виде переменные хранятся внутри объектов лога (см. LogItem). Строка JSON создается из словаря лениво, только если какой-то обработчик действительно ее запросил.
     """
-    json = store['json_module']
     if not (len(args) + len(kwargs)):
         return None
+    result = {}
+    limit = store['max_variables']
+    if limit is not None and len(args) + len(kwargs) > limit:
+        if len(args) > limit:
+            result['omitted_args'] = len(args) - limit
+            args = args[:limit]
+        limit -= len(args)
+        if len(kwargs) > limit:
+            result['omitted_kwargs'] = len(kwargs) - limit
+            kwargs = dict(list(kwargs.items())[:limit])
     args = [get_item(x) for x in args]
     kwargs = {key: get_item(value) for key, value in kwargs.items()}
-    result = {}
     if len(args):
         result['args'] = args
     if len(kwargs):
         result['kwargs'] = kwargs
+    return result
+
+def json_vars(*args, **kwargs):
+    """
+    Преобразуем любые аргументы в json-объект. Структура объекта описана в vars_to_dict().
+    """
+    result = vars_to_dict(*args, **kwargs)
+    if result is None:
+        return None
+    json = get_json_backend(store['json_module'])
     return json.dumps(result)
 
 def json_one_variable(variable):
-    json = store['json_module']
+    json = get_json_backend(store['json_module'])
     variable = get_item(variable)
     result = json.dumps(variable)
     return result
+
+
+# Встроенные сериализаторы.
+
+def as_is(item):
+    """
+    Сериализатор для типов, которые есть в JSON: значение сохраняется без изменений.
+    """
+    return item
+
+def serialize_sequence(item):
+    """
+    Списки, кортежи и множества сохраняются как списки JSON.
+    """
+    return [get_nested_value(x) for x in item]
+
+def serialize_dict(item):
+    """
+    Словари сохраняются как объекты JSON, ключи приводятся к строкам.
+    """
+    return {str(key): get_nested_value(value) for key, value in item.items()}
+
+def serialize_dataclass(item):
+    """
+    Датаклассы сохраняются как объекты JSON с полями датакласса.
+    """
+    return {field.name: get_nested_value(getattr(item, field.name)) for field in dataclasses.fields(item)}
+
+def serialize_bytes(item):
+    """
+    Байтовые строки декодируются как UTF-8. Байты, которые декодировать не получилось, записываются в виде escape-последовательностей.
+    """
+    return bytes(item).decode('utf-8', errors='backslashreplace')
+
+def serialize_enum(item):
+    """
+    Для членов перечислений сохраняется имя.
+    """
+    return item.name
+
+def serialize_isoformat(item):
+    """
+    Даты и время сохраняются в формате ISO 8601.
+    """
+    return item.isoformat()
+
+def serialize_timedelta(item):
+    """
+    Промежутки времени сохраняются как число секунд.
+    """
+    return item.total_seconds()
+
+CONTAINER_SERIALIZERS = (serialize_sequence, serialize_dict, serialize_dataclass)
+# Встроенные сериализаторы, результат которых не нужно дополнительно проверять (см. serialize()).
+BUILTIN_SERIALIZERS = frozenset((*CONTAINER_SERIALIZERS, serialize_bytes, serialize_enum, serialize_isoformat, serialize_timedelta, str))
+
+for _type in BASE_JSON_TYPES:
+    Serializers.set(_type, as_is, type_name=_type.__name__)
+for _type in (list, tuple, set, frozenset):
+    Serializers.set(_type, serialize_sequence)
+Serializers.set(dict, serialize_dict)
+for _type in (bytes, bytearray, memoryview):
+    Serializers.set(_type, serialize_bytes)
+Serializers.set(enum.Enum, serialize_enum)
+for _type in (datetime.datetime, datetime.date, datetime.time):
+    Serializers.set(_type, serialize_isoformat)
+Serializers.set(datetime.timedelta, serialize_timedelta)
+Serializers.set(uuid.UUID, str)
+Serializers.set(decimal.Decimal, str)
+Serializers.set_for_predicate(dataclasses.is_dataclass, serialize_dataclass)